@@ -4951,11 +4951,16 @@ class Application(ApplicationBase, TranslationMixin, ApplicationMediaMixin,
         """
         Set the 'version' property on each form as follows to the current app version if the form is new
         or has changed since the last build. Otherwise set it to the version from the last build.
+
+        The compiled forms of the last build are kept for the forms that have not changed
+        so that they can be reused as build files instead of being compiled again.
         """
         def _hash(val):
             return hashlib.md5(val).hexdigest()
 
         previous_version = self.get_previous_version()
+        self._previous_build = previous_version
+        self._unchanged_form_files = {}
         if previous_version:
             force_new_version = self.build_profiles != previous_version.build_profiles
             for form_stuff in self.get_forms(bare=False):
@@ -4979,6 +4984,8 @@ class Application(ApplicationBase, TranslationMixin, ApplicationMediaMixin,
                         my_hash = _hash(self.fetch_xform(form=form))
                         if previous_hash != my_hash:
                             form.version = None
+                        else:
+                            self._unchanged_form_files[filename] = previous_source
                 else:
                     form.version = None
 
@@ -5218,6 +5225,10 @@ class Application(ApplicationBase, TranslationMixin, ApplicationMediaMixin,
             if not exclude_form(form_stuff['form']):
                 filename = prefix + self.get_form_filename(**form_stuff)
                 form = form_stuff['form']
+                previous_file = self._get_unchanged_form_file(form_stuff, filename)
+                if previous_file is not None:
+                    files[filename] = previous_file
+                    continue
                 try:
                     files[filename] = self.fetch_xform(form=form, build_profile_id=build_profile_id)
                 except XFormValidationFailed:
@@ -5227,6 +5238,24 @@ class Application(ApplicationBase, TranslationMixin, ApplicationMediaMixin,
                     raise XFormException(_('Error in form "{}": {}').format(trans(form.name), six.text_type(e)))
         return files
 
+    def _get_unchanged_form_file(self, form_stuff, filename):
+        """
+        Returns the compiled form from the last build if ``set_form_versions`` found that
+        the form has not changed since then, otherwise None.
+        """
+        unchanged_form_files = getattr(self, '_unchanged_form_files', {})
+        default_filename = 'files/%s' % self.get_form_filename(**form_stuff)
+        if default_filename not in unchanged_form_files:
+            return None
+        if 'files/%s' % filename == default_filename:
+            return unchanged_form_files[default_filename]
+        # build profiles are compiled from the same form but the last build
+        # only has the files of the profiles that have been downloaded
+        try:
+            return self._previous_build.fetch_attachment('files/%s' % filename, return_bytes=True)
+        except ResourceNotFound:
+            return None
+
     @time_method()
     @memoized
     def create_all_files(self, build_profile_id=None):
@@ -5286,21 +5315,62 @@ class Application(ApplicationBase, TranslationMixin, ApplicationMediaMixin,
         except IndexError:
             raise ModuleNotFoundException()
 
+    def _get_unique_id_index(self, rebuild=False):
+        """
+        Returns ``(module_indices, form_locations)``, dicts of module unique_id -> module index
+        and form unique_id -> (module index, form index).
+
+        The index is built lazily and is not updated when modules or forms are changed, so
+        lookups must check the result and rebuild the index if it is out of date.
+        """
+        if rebuild or getattr(self, '_unique_id_index', None) is None:
+            module_indices = {}
+            form_locations = {}
+            for m_index, module in enumerate(self.modules):
+                if module.unique_id:
+                    module_indices.setdefault(module.unique_id, m_index)
+                for f_index, form in enumerate(module.forms):
+                    if form.unique_id:
+                        form_locations.setdefault(form.unique_id, (m_index, f_index))
+            self._unique_id_index = (module_indices, form_locations)
+        return self._unique_id_index
+
+    def _find_module_index(self, unique_id):
+        def is_valid(m_index):
+            return m_index < len(self.modules) and self.modules[m_index].unique_id == unique_id
+
+        m_index = self._get_unique_id_index()[0].get(unique_id)
+        if m_index is None or not is_valid(m_index):
+            m_index = self._get_unique_id_index(rebuild=True)[0].get(unique_id)
+        return m_index
+
+    def _find_form_location(self, unique_id):
+        def is_valid(location):
+            m_index, f_index = location
+            return (
+                m_index < len(self.modules)
+                and f_index < len(self.modules[m_index].forms)
+                and self.modules[m_index].forms[f_index].unique_id == unique_id
+            )
+
+        location = self._get_unique_id_index()[1].get(unique_id)
+        if location is None or not is_valid(location):
+            location = self._get_unique_id_index(rebuild=True)[1].get(unique_id)
+        return location
+
     def get_module_by_unique_id(self, unique_id, error=''):
-        def matches(module):
-            return module.get_or_create_unique_id() == unique_id
-        for obj in self.get_modules():
-            if matches(obj):
-                return obj
+        m_index = self._find_module_index(unique_id) if unique_id else None
+        if m_index is not None:
+            return self.modules[m_index].with_id(m_index, self)
         if not error:
             error = _("Could not find module with ID='{unique_id}' in app '{app_name}'.").format(
                 app_name=self.name, unique_id=unique_id)
         raise ModuleNotFoundException(error)
 
     def get_module_index(self, unique_id):
-        for index, module in enumerate(self.get_modules()):
-            if module.unique_id == unique_id:
-                return index
+        m_index = self._find_module_index(unique_id) if unique_id else None
+        if m_index is not None:
+            return m_index
         error = _("Could not find module with ID='{unique_id}' in app '{app_name}'.").format(
             app_name=self.name, unique_id=unique_id)
         raise ModuleNotFoundException(error)
@@ -5320,21 +5390,25 @@ class Application(ApplicationBase, TranslationMixin, ApplicationMediaMixin,
                 }
 
     def get_form(self, form_unique_id, bare=True):
-        def matches(form):
-            return form.get_unique_id() == form_unique_id
-        for obj in self.get_forms(bare):
-            if matches(obj if bare else obj['form']):
-                return obj
-        raise FormNotFoundException(
-            ("Form in app '%s' with unique id '%s' not found"
-             % (self.id, form_unique_id)))
+        location = self._find_form_location(form_unique_id) if form_unique_id else None
+        if location is None:
+            raise FormNotFoundException(
+                ("Form in app '%s' with unique id '%s' not found"
+                 % (self.id, form_unique_id)))
+        m_index, f_index = location
+        module = self.modules[m_index].with_id(m_index, self)
+        form = module.forms[f_index].with_id(f_index, module)
+        return form if bare else {
+            'type': 'module_form',
+            'module': module,
+            'form': form
+        }
 
     def get_form_location(self, form_unique_id):
-        for m_index, module in enumerate(self.get_modules()):
-            for f_index, form in enumerate(module.get_forms()):
-                if form_unique_id == form.unique_id:
-                    return m_index, f_index
-        raise KeyError("Form in app '%s' with unique id '%s' not found" % (self.id, form_unique_id))
+        location = self._find_form_location(form_unique_id) if form_unique_id else None
+        if location is None:
+            raise KeyError("Form in app '%s' with unique id '%s' not found" % (self.id, form_unique_id))
+        return location
 
     @classmethod
     def new_app(cls, domain, name, lang="en"):
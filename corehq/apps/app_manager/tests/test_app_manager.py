@@ -12,8 +12,9 @@ import codecs
 from django.test import TestCase, SimpleTestCase
 
 from corehq.apps.app_manager.dbaccessors import get_app, get_built_app_ids_for_app_id
+from corehq.apps.app_manager.exceptions import FormNotFoundException, ModuleNotFoundException
 from corehq.apps.app_manager.models import Application, DetailColumn, import_app, APP_V1, ApplicationBase, Module, \
-    ReportModule, ReportAppConfig
+    ReportModule, ReportAppConfig, Form
 from corehq.apps.app_manager.tasks import make_async_build, prune_auto_generated_builds
 from corehq.apps.app_manager.tests.util import add_build, patch_default_builds
 from corehq.apps.app_manager.util import add_odk_profile_after_build, purge_report_from_mobile_ucr
@@ -333,3 +334,37 @@ class TestReportModule(SimpleTestCase):
             purge_report_from_mobile_ucr(report_config)
 
         self.assertEqual(len(app.modules[0].report_configs), 1)
+
+
+class TestUniqueIdLookups(SimpleTestCase):
+
+    def setUp(self):
+        self.app = Application.new_app('domain', "App")
+        for m in range(2):
+            self.app.add_module(Module(unique_id='module{}'.format(m), forms=[
+                Form(unique_id='form{}{}'.format(m, f)) for f in range(2)
+            ]))
+
+    def test_lookups(self):
+        self.assertEqual(self.app.get_module_by_unique_id('module1').id, 1)
+        self.assertEqual(self.app.get_module_index('module1'), 1)
+        form = self.app.get_form('form10')
+        self.assertEqual((form.get_module().id, form.id), (1, 0))
+        self.assertEqual(self.app.get_form_location('form10'), (1, 0))
+        form_stuff = self.app.get_form('form01', bare=False)
+        self.assertEqual((form_stuff['module'].unique_id, form_stuff['form'].id), ('module0', 1))
+
+    def test_lookups_after_changes(self):
+        self.app.get_form('form11')
+        self.app.rearrange_modules(0, 1)
+        self.app.get_module(1).forms.pop(0)
+        self.app.get_module(0).forms.append(Form(unique_id='form12'))
+
+        self.assertEqual(self.app.get_module_index('module0'), 1)
+        self.assertEqual(self.app.get_form_location('form11'), (0, 1))
+        self.assertEqual(self.app.get_form_location('form12'), (0, 2))
+        self.assertEqual(self.app.get_form_location('form01'), (1, 0))
+        with self.assertRaises(FormNotFoundException):
+            self.app.get_form('form00')
+        with self.assertRaises(ModuleNotFoundException):
+            self.app.get_module_by_unique_id('module2')
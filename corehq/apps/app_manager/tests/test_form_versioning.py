@@ -108,6 +108,42 @@ class FormVersioningTest(TestCase):
         self.assertEqual(self.get_form_versions(xxx_build1), [1, 1])
         self.assertEqual(self.get_form_versions(xxx_build2), [2, 1])
 
+    @patch_default_builds
+    @patch('corehq.apps.app_manager.models.validate_xform', return_value=None)
+    def test_unchanged_forms_are_not_compiled_again(self, mock):
+        add_build(version='2.7.0', build_number=20655)
+        domain = 'form-versioning-test'
+
+        app = Application.new_app(domain, 'Foo')
+        app.modules.append(Module(forms=[Form(), Form()]))
+        app.build_spec = BuildSpec.from_string('2.7.0/latest')
+        app.get_module(0).get_form(0).source = BLANK_TEMPLATE.format(xmlns='xmlns-0.0')
+        app.get_module(0).get_form(1).source = BLANK_TEMPLATE.format(xmlns='xmlns-1')
+        app.save()
+
+        build1 = app.make_build()
+        build1.save()
+
+        app.get_module(0).get_form(0).source = BLANK_TEMPLATE.format(xmlns='xmlns-0.1')
+        app.save()
+
+        with patch.object(Application, 'fetch_xform', autospec=True,
+                          side_effect=Application.fetch_xform) as fetch_xform:
+            build2 = app.make_build()
+            build2.save()
+
+        changed_form_id = app.get_module(0).get_form(0).unique_id
+        unchanged_form_id = app.get_module(0).get_form(1).unique_id
+        compiled_form_ids = [call[1]['form'].unique_id for call in fetch_xform.call_args_list]
+        # once to compare with the last build and once more for the build file
+        self.assertEqual(compiled_form_ids.count(changed_form_id), 2)
+        self.assertEqual(compiled_form_ids.count(unchanged_form_id), 1)
+        self.assertEqual(
+            build2.fetch_attachment('files/modules-0/forms-1.xml', return_bytes=True),
+            build1.fetch_attachment('files/modules-0/forms-1.xml', return_bytes=True),
+        )
+        self.assertEqual(self.get_form_versions(build2), [2, 1])
+
     @staticmethod
     def get_form_versions(build):
         from lxml import etree
@@ -18,6 +18,9 @@ from pillowtop.feed.interface import ChangeFeed, Change, ChangeMeta
 from six.moves import range
 
 MIN_TIMEOUT = 500
+# when iterating forever, milliseconds to wait for a message before yielding None,
+# so that callers get a chance to stop iterating on a quiet topic
+HEARTBEAT_TIMEOUT = 5000
 
 
 @six.python_2_unicode_compatible
@@ -56,8 +59,11 @@ class KafkaChangeFeed(ChangeFeed):
     def iter_changes(self, since, forever):
         """
         Since must be a dictionary of topic partition offsets.
+
+        When iterating forever, ``None`` is yielded whenever no message arrives
+        within ``HEARTBEAT_TIMEOUT`` milliseconds.
         """
-        timeout = float('inf') if forever else MIN_TIMEOUT
+        timeout = HEARTBEAT_TIMEOUT if forever else MIN_TIMEOUT
         start_from_latest = since is None
         reset = 'largest' if start_from_latest else 'smallest'
         self._init_consumer(timeout, auto_offset_reset=reset)
@@ -82,13 +88,15 @@ class KafkaChangeFeed(ChangeFeed):
             for topic_partition, offset in since.items():
                 self.consumer.seek(TopicPartition(topic_partition[0], topic_partition[1]), int(offset))
 
-        try:
+        while True:
+            # iteration stops when no message arrives within the consumer timeout
             for message in self.consumer:
                 self._processed_topic_offsets[(message.topic, message.partition)] = message.offset
                 yield change_from_kafka_message(message)
-        except StopIteration:
-            assert not forever, 'Kafka pillow should not timeout when waiting forever!'
-            # no need to do anything since this is just telling us we've reached the end of the feed
+            if not forever:
+                # we've reached the end of the feed
+                return
+            yield None
 
     def get_current_checkpoint_offsets(self):
         # the way kafka works, the checkpoint should increment by 1 because
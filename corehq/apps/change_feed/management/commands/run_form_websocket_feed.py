@@ -46,7 +46,7 @@ class Command(BaseCommand):
         last_domain = None
         change_feed = KafkaChangeFeed(topics=[topics.FORM], client_id='form-feed')
         for change in change_feed.iter_changes(since=since, forever=True):
-            if not change.deleted:
+            if change and not change.deleted:
                 # this is just helpful for demos to find domain transitions
                 if change.metadata.domain != last_domain:
                     last_domain = change.metadata.domain
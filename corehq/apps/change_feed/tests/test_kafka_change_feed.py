@@ -4,6 +4,7 @@ from copy import deepcopy
 import uuid
 
 from django.test import SimpleTestCase, TestCase
+from mock import patch
 from corehq.apps.change_feed import topics
 from corehq.apps.change_feed.consumer.feed import KafkaChangeFeed, KafkaCheckpointEventHandler
 from corehq.apps.change_feed.exceptions import UnavailableKafkaOffset
@@ -30,6 +31,15 @@ class KafkaChangeFeedTest(SimpleTestCase):
         for unexpected in unexpected_metas:
             self.assertTrue(unexpected.document_id not in found_change_ids)
 
+    @patch('corehq.apps.change_feed.consumer.feed.HEARTBEAT_TIMEOUT', 100)
+    def test_heartbeat_when_iterating_forever(self):
+        feed = KafkaChangeFeed(topics=[topics.FORM], client_id='test-kafka-feed')
+        changes = feed.iter_changes(since=feed.get_latest_offsets(), forever=True)
+        self.assertIsNone(next(changes))
+        meta = publish_stub_change(topics.FORM)
+        change = next(change for change in changes if change)
+        self.assertEqual(change.id, meta.document_id)
+
     def test_expired_checkpoint_iteration_strict(self):
         feed = KafkaChangeFeed(topics=[topics.FORM, topics.CASE], client_id='test-kafka-feed', strict=True)
         first_available_offsets = get_multi_topic_first_available_offsets([topics.FORM, topics.CASE])
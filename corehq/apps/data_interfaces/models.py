@@ -61,7 +61,8 @@ from dimagi.utils.modules import to_function
 from django.conf import settings
 from django.contrib.postgres.fields import JSONField
 from django.db import models, transaction
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.expressions import RawSQL
 from corehq.apps.hqcase.utils import update_case
 from corehq.form_processor.models import CommCareCaseSQL, CommCareCaseIndexSQL
 from django.utils.translation import ugettext_lazy
@@ -488,8 +489,54 @@ class AutomaticUpdateRule(models.Model):
             return cls._get_case_ids_from_es(domain, case_type, boundary_date=boundary_date)
 
     @classmethod
-    def _get_case_ids_from_postgres(cls, domain, case_type, boundary_date=None, db=None):
-        q_expression = Q(
+    def get_case_ids_for_rules(cls, domain, case_type, rules, now, db=None):
+        """
+        Same as get_case_ids, but for domains using the SQL backend the rule criteria
+        that can be checked in the database are used to leave out the cases that
+        none of the rules can match.
+        """
+        boundary_date = cls.get_boundary_date(rules, now)
+        if should_use_sql_backend(domain):
+            sql_filter = cls.get_sql_filter_for_rules(rules, now)
+            if sql_filter:
+                q_expression, annotations = sql_filter
+                return cls._get_case_ids_from_postgres(domain, case_type, boundary_date=boundary_date, db=db,
+                    q_expression=q_expression, annotations=annotations)
+
+        return cls.get_case_ids(domain, case_type, boundary_date=boundary_date, db=db)
+
+    @classmethod
+    def get_sql_filter_for_rules(cls, rules, now):
+        """
+        Returns a tuple of (Q object, annotations) for the CommCareCaseSQL cases that any
+        of the rules could match, or None if all cases have to be checked.
+
+        Cases that don't match a rule are only left out if the rule's actions
+        don't do anything for cases that don't match.
+        """
+        q_expression = None
+        annotations = {}
+        for rule in rules:
+            if not rule.can_skip_cases_that_do_not_match():
+                return None
+
+            sql_filter = rule.get_sql_filter(now)
+            if not sql_filter:
+                return None
+
+            rule_q_expression, rule_annotations = sql_filter
+            q_expression = rule_q_expression if q_expression is None else (q_expression | rule_q_expression)
+            annotations.update(rule_annotations)
+
+        if q_expression is None:
+            return None
+
+        return q_expression, annotations
+
+    @classmethod
+    def _get_case_ids_from_postgres(cls, domain, case_type, boundary_date=None, db=None,
+            q_expression=None, annotations=None):
+        base_q_expression = Q(
             domain=domain,
             type=case_type,
             closed=False,
@@ -497,13 +544,20 @@ class AutomaticUpdateRule(models.Model):
         )
 
         if boundary_date:
-            q_expression = q_expression & Q(server_modified_on__lte=boundary_date)
+            base_q_expression = base_q_expression & Q(server_modified_on__lte=boundary_date)
+
+        if q_expression:
+            base_q_expression = base_q_expression & q_expression
 
         if db:
-            for c_id in CommCareCaseSQL.objects.using(db).filter(q_expression).values_list('case_id', flat=True):
+            query = CommCareCaseSQL.objects.using(db)
+            if annotations:
+                query = query.annotate(**annotations)
+            for c_id in query.filter(base_q_expression).values_list('case_id', flat=True):
                 yield c_id
         else:
-            for c_id in run_query_across_partitioned_databases(CommCareCaseSQL, q_expression, values=['case_id']):
+            for c_id in run_query_across_partitioned_databases(CommCareCaseSQL, base_q_expression,
+                    values=['case_id'], annotate=annotations):
                 yield c_id
 
     @classmethod
@@ -587,6 +641,38 @@ class AutomaticUpdateRule(models.Model):
         else:
             return self.run_actions_when_case_does_not_match(case)
 
+    def get_sql_filter(self, now):
+        """
+        Returns a tuple of (Q object, annotations) that a CommCareCaseSQL case must match for
+        criteria_match to be True, or None if there is nothing to filter on.
+
+        Only criteria that can be checked in the database are included, so this can include
+        cases that criteria_match is False for. It must not leave out any case that it is True for.
+        """
+        q_expression = Q()
+        annotations = {}
+        if self.filter_on_server_modified:
+            q_expression &= Q(server_modified_on__lte=now - timedelta(days=self.server_modified_boundary))
+
+        for criteria in self.memoized_criteria:
+            sql_filter = criteria.definition.get_sql_filter('rule_criteria_{}'.format(criteria.pk))
+            if sql_filter:
+                criteria_q_expression, criteria_annotations = sql_filter
+                q_expression &= criteria_q_expression
+                annotations.update(criteria_annotations)
+
+        if not q_expression:
+            return None
+
+        return q_expression, annotations
+
+    def can_skip_cases_that_do_not_match(self):
+        return all(
+            type(action.definition).when_case_does_not_match ==
+            CaseRuleActionDefinition.when_case_does_not_match
+            for action in self.memoized_actions
+        )
+
     def criteria_match(self, case, now):
         if case.is_deleted or case.closed:
             return False
@@ -740,6 +826,14 @@ class CaseRuleCriteriaDefinition(models.Model):
     def matches(self, case, now):
         raise NotImplementedError()
 
+    def get_sql_filter(self, alias):
+        """
+        Returns a tuple of (Q object, annotations) that a CommCareCaseSQL case must match
+        for this criteria to match it, or None if it can't be checked in the database.
+        Annotation names should start with alias so that they are unique in the query.
+        """
+        return None
+
 
 class MatchPropertyDefinition(CaseRuleCriteriaDefinition):
     # True when today < (the date in property_name + property_value days)
@@ -858,6 +952,31 @@ class MatchPropertyDefinition(CaseRuleCriteriaDefinition):
 
         return False
 
+    def get_sql_filter(self, alias):
+        if (
+            '/' in self.property_name or
+            self.property_name == '_id' or
+            self.property_name in [field.name for field in CommCareCaseSQL._meta.fields]
+        ):
+            # the property is not (only) looked up in case_json
+            return None
+
+        annotations = {
+            alias: RawSQL('"case_json"::jsonb ->> %s', (self.property_name,), output_field=models.TextField())
+        }
+        if self.match_type == self.MATCH_EQUAL and self.property_value is not None:
+            return Q(**{alias: self.property_value}), annotations
+        elif self.match_type in (
+            self.MATCH_DAYS_BEFORE,
+            self.MATCH_DAYS_AFTER,
+            self.MATCH_HAS_VALUE,
+            self.MATCH_REGEX,
+        ):
+            # these never match a missing or null property
+            return Q(**{'{}__isnull'.format(alias): False}), annotations
+
+        return None
+
     def matches(self, case, now):
         return {
             self.MATCH_DAYS_BEFORE: self.check_days_before,
@@ -897,6 +1016,15 @@ class ClosedParentDefinition(CaseRuleCriteriaDefinition):
     # the couch backend.
     relationship_id = models.PositiveSmallIntegerField(default=CommCareCaseIndexSQL.CHILD)
 
+    def get_sql_filter(self, alias):
+        indices = CommCareCaseIndexSQL.objects.filter(case_id=OuterRef('case_id'))
+        if self.identifier:
+            indices = indices.filter(identifier=self.identifier)
+        if self.relationship_id:
+            indices = indices.filter(relationship_id=self.relationship_id)
+        # whether the parent is closed is not checked, since it may be in another database
+        return Q(**{alias: True}), {alias: Exists(indices)}
+
     def matches(self, case, now):
         if isinstance(case, CommCareCase):
             relationship = CommCareCase.convert_sql_relationship_id_to_couch_relationship(self.relationship_id)
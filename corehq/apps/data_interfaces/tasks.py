@@ -11,6 +11,7 @@ from corehq.apps.data_interfaces.models import (
     CaseRuleSubmission)
 from corehq.apps.domain_migration_flags.api import any_migrations_in_progress
 from corehq.apps.domain.models import Domain
+from corehq import toggles
 from corehq.util.decorators import serial_task
 from datetime import datetime, timedelta
 
@@ -150,8 +151,11 @@ def run_case_update_rules_for_domain_and_db(domain, now, run_id, db=None):
     rules_by_case_type = AutomaticUpdateRule.organize_rules_by_case_type(all_rules)
 
     for case_type, rules in six.iteritems(rules_by_case_type):
-        boundary_date = AutomaticUpdateRule.get_boundary_date(rules, now)
-        case_ids = list(AutomaticUpdateRule.get_case_ids(domain, case_type, boundary_date, db=db))
+        if toggles.SQL_CASE_RULE_CRITERIA.enabled(domain):
+            case_ids = list(AutomaticUpdateRule.get_case_ids_for_rules(domain, case_type, rules, now, db=db))
+        else:
+            boundary_date = AutomaticUpdateRule.get_boundary_date(rules, now)
+            case_ids = list(AutomaticUpdateRule.get_case_ids(domain, case_type, boundary_date, db=db))
 
         for case in CaseAccessors(domain).iter_cases(case_ids):
             migration_in_progress, last_migration_check_time = check_data_migration_in_progress(domain,
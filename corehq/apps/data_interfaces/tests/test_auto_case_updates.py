@@ -29,7 +29,8 @@ from corehq.form_processor.backends.sql.dbaccessors import CaseAccessorSQL
 from corehq.form_processor.interfaces.dbaccessors import CaseAccessors, FormAccessors
 from corehq.form_processor.tests.utils import (
     run_with_all_backends,
-    set_case_property_directly
+    set_case_property_directly,
+    use_sql_backend,
 )
 from corehq.form_processor.utils.general import should_use_sql_backend
 from corehq.form_processor.signals import sql_case_post_save
@@ -1092,6 +1093,69 @@ class CaseRuleEndToEndTests(BaseCaseRuleTest):
                 self.assertLastRuleRun(1)
 
 
+@use_sql_backend
+class CaseRuleSqlFilterTest(BaseCaseRuleTest):
+
+    def _get_case_ids(self, rules):
+        return set(AutomaticUpdateRule.get_case_ids_for_rules(self.domain, 'person', rules, datetime.utcnow()))
+
+    def test_get_case_ids_for_rules(self):
+        rule = _create_empty_rule(self.domain)
+        rule.add_criteria(
+            MatchPropertyDefinition,
+            property_name='result',
+            property_value='negative',
+            match_type=MatchPropertyDefinition.MATCH_EQUAL,
+        )
+        rule.add_action(UpdateCaseDefinition, close_case=True)
+
+        with _with_case(self.domain, 'person', datetime.utcnow()) as negative_case, \
+                _with_case(self.domain, 'person', datetime.utcnow()) as positive_case, \
+                _with_case(self.domain, 'person', datetime.utcnow()) as other_case:
+            hqcase.utils.update_case(self.domain, negative_case.case_id, case_properties={'result': 'negative'})
+            hqcase.utils.update_case(self.domain, positive_case.case_id, case_properties={'result': 'positive'})
+
+            self.assertEqual(self._get_case_ids([rule]), {negative_case.case_id})
+
+            # cases that match any of the rules are included
+            other_rule = _create_empty_rule(self.domain)
+            other_rule.add_criteria(
+                MatchPropertyDefinition,
+                property_name='result',
+                match_type=MatchPropertyDefinition.MATCH_HAS_VALUE,
+            )
+            other_rule.add_action(UpdateCaseDefinition, close_case=True)
+            self.assertEqual(
+                self._get_case_ids([rule, other_rule]),
+                {negative_case.case_id, positive_case.case_id}
+            )
+
+            # criteria that can't be checked in the database match all cases
+            custom_rule = _create_empty_rule(self.domain)
+            custom_rule.add_criteria(CustomMatchDefinition, name='CUSTOM_CRITERIA_TEST')
+            custom_rule.add_action(UpdateCaseDefinition, close_case=True)
+            self.assertEqual(
+                self._get_case_ids([rule, custom_rule]),
+                {negative_case.case_id, positive_case.case_id, other_case.case_id}
+            )
+
+    def test_actions_for_cases_that_do_not_match(self):
+        rule = _create_empty_rule(self.domain)
+        rule.add_criteria(
+            MatchPropertyDefinition,
+            property_name='result',
+            property_value='negative',
+            match_type=MatchPropertyDefinition.MATCH_EQUAL,
+        )
+        rule.add_action(UpdateCaseDefinition, close_case=True)
+        self.assertIsNotNone(AutomaticUpdateRule.get_sql_filter_for_rules([rule], datetime.utcnow()))
+
+        # schedule instances are deleted for cases that don't match
+        rule.add_action(CreateScheduleInstanceActionDefinition)
+        rule = AutomaticUpdateRule.objects.get(pk=rule.pk)
+        self.assertIsNone(AutomaticUpdateRule.get_sql_filter_for_rules([rule], datetime.utcnow()))
+
+
 class TestParentCaseReferences(BaseCaseRuleTest):
 
     def test_closed_parent_criteria(self):
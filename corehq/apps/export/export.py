@@ -4,7 +4,7 @@ from __future__ import unicode_literals
 import contextlib
 import time
 import sys
-from collections import Counter
+from collections import Counter, OrderedDict
 
 import datetime
 
@@ -53,9 +53,16 @@ class ExportFile(object):
         self.file.close()
 
 
+# Number of rows buffered per table before they are passed to the couchexport.ExportWriter
+ROW_BUFFER_SIZE = 1000
+
+
 class _ExportWriter(object):
     """
     An object that provides a friendlier interface to couchexport.ExportWriters.
+
+    Rows are buffered per table and handed to the couchexport.ExportWriter
+    in blocks of ROW_BUFFER_SIZE rows.
     """
 
     def __init__(self, writer, temp_path):
@@ -63,6 +70,7 @@ class _ExportWriter(object):
         self.writer = writer
         self.format = writer.format
         self.path = temp_path
+        self.row_buffers = OrderedDict()
 
     @contextlib.contextmanager
     def open(self, export_instances):
@@ -104,6 +112,7 @@ class _ExportWriter(object):
             self.writer.open(headers, file, table_titles=table_titles, archive_basepath=name)
             try:
                 yield
+                self.flush()
             finally:
                 self.writer.close()
 
@@ -114,11 +123,37 @@ class _ExportWriter(object):
         :param table: A TableConfiguration
         :param row: An ExportRow
         """
-        return self.writer.write([
-            (table, [FormattedRow(data=row.data, hyperlink_column_indices=row.hyperlink_column_indices)])
-        ])
+        self.write_rows(table, [row])
+
+    def write_rows(self, table, rows):
+        """
+        Write the given rows to the given table of the export.
+        _Writer must be opened first.
+        :param table: A TableConfiguration
+        :param rows: A list of ExportRows
+        """
+        buffer = self.row_buffers.setdefault(table, [])
+        buffer.extend(
+            FormattedRow(data=row.data, hyperlink_column_indices=row.hyperlink_column_indices)
+            for row in rows
+        )
+        if len(buffer) >= ROW_BUFFER_SIZE:
+            self._flush_table(table)
+
+    def flush(self):
+        """
+        Write all buffered rows to the couchexport.ExportWriter
+        """
+        for table in list(self.row_buffers):
+            self._flush_table(table)
+
+    def _flush_table(self, table):
+        rows = self.row_buffers.pop(table, None)
+        if rows:
+            self.writer.write_rows(table, rows)
 
     def get_preview(self):
+        self.flush()
         return self.writer.get_preview()
 
 
@@ -132,6 +167,7 @@ class _PaginatedExportWriter(object):
         # An instance of a couchexport.ExportWriter
         self.writer = writer
         self.file_handle = None
+        self.row_buffers = OrderedDict()
 
     @contextlib.contextmanager
     def open(self, export_instances):
@@ -153,6 +189,7 @@ class _PaginatedExportWriter(object):
             )
             try:
                 yield
+                self.flush()
             finally:
                 self.writer.close()
 
@@ -258,16 +295,45 @@ class _PaginatedExportWriter(object):
         :param table: A TableConfiguration
         :param row: An ExportRow
         """
-        if self.rows_written[table] >= MAX_EXPORTABLE_ROWS * (self.pages[table] + 1):
-            self.pages[table] += 1
-            self.writer.add_table(
-                self._paged_table_index(table),
-                self._get_paginated_headers()[self._paged_table_index(table)][0],
-                table_title=self._get_paginated_table_titles()[self._paged_table_index(table)],
-            )
+        self.write_rows(table, [row])
 
-        self.writer.write([(self._paged_table_index(table), [FormattedRow(data=row.data)])])
-        self.rows_written[table] += 1
+    def write_rows(self, table, rows):
+        """
+        Write the given rows to the given table of the export.
+        Will automatically open a new table and write to that if it
+        has exceeded the number of rows written in the first table.
+        :param table: A TableConfiguration
+        :param rows: A list of ExportRows
+        """
+        buffer = self.row_buffers.setdefault(table, [])
+        for row in rows:
+            if self.rows_written[table] >= MAX_EXPORTABLE_ROWS * (self.pages[table] + 1):
+                self._flush_table(table)
+                self.pages[table] += 1
+                self.writer.add_table(
+                    self._paged_table_index(table),
+                    self._get_paginated_headers()[self._paged_table_index(table)][0],
+                    table_title=self._get_paginated_table_titles()[self._paged_table_index(table)],
+                )
+                buffer = self.row_buffers.setdefault(table, [])
+
+            buffer.append(FormattedRow(data=row.data))
+            self.rows_written[table] += 1
+
+        if len(buffer) >= ROW_BUFFER_SIZE:
+            self._flush_table(table)
+
+    def flush(self):
+        """
+        Write all buffered rows to the couchexport.ExportWriter
+        """
+        for table in list(self.row_buffers):
+            self._flush_table(table)
+
+    def _flush_table(self, table):
+        rows = self.row_buffers.pop(table, None)
+        if rows:
+            self.writer.write_rows(self._paged_table_index(table), rows)
 
 
 def get_export_writer(export_instances, temp_path, allow_pagination=True):
@@ -352,18 +418,20 @@ def write_export_instance(writer, export_instance, documents, progress_tracker=N
     compute_total = 0
     write_total = 0
     track_load = load_counter(export_instance.type, "export", export_instance.domain)
+    row_plans = [
+        (table, table.get_row_plan(
+            split_columns=export_instance.split_multiselects,
+            transform_dates=export_instance.transform_dates,
+        ))
+        for table in export_instance.selected_tables
+    ]
 
     for row_number, doc in enumerate(documents):
         total_bytes += sys.getsizeof(doc)
-        for table in export_instance.selected_tables:
+        for table, row_plan in row_plans:
             compute_start = _time_in_milliseconds()
             try:
-                rows = table.get_rows(
-                    doc,
-                    row_number,
-                    split_columns=export_instance.split_multiselects,
-                    transform_dates=export_instance.transform_dates,
-                )
+                rows = row_plan.get_rows(doc, row_number)
             except Exception as e:
                 notify_exception(None, "Error exporting doc", details={
                     'domain': export_instance.domain,
@@ -376,10 +444,8 @@ def write_export_instance(writer, export_instance, documents, progress_tracker=N
             compute_total += _time_in_milliseconds() - compute_start
 
             write_start = _time_in_milliseconds()
-            for row in rows:
-                # It might be bad to write one row at a time when you can do more (from a performance perspective)
-                # Regardless, we should handle the batching of rows in the _Writer class, not here.
-                writer.write(table, row)
+            # the _Writer buffers the rows and writes them in blocks
+            writer.write_rows(table, rows)
             write_total += _time_in_milliseconds() - write_start
 
             total_rows += len(rows)
@@ -0,0 +1,94 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from corehq.apps.export.dbaccessors import get_properly_wrapped_export_instance
+from corehq.apps.export.export import get_export_documents
+
+
+def get_rows_per_cell(table, document, row_number, split_columns=False, transform_dates=False):
+    """
+    Generate the rows for a document by calling ExportColumn.get_value for every cell.
+    This is how rows were generated before TableConfiguration.get_row_plan and is
+    used as the reference output.
+    """
+    document_id = document.get('_id')
+    domain = document.get('domain')
+    rows = []
+    for doc, row_index in table._get_sub_documents(document, row_number, document_id=document_id):
+        row_data = []
+        for column in table.selected_columns:
+            val = column.get_value(
+                domain,
+                document_id,
+                doc,
+                table.path,
+                row_index=row_index,
+                split_column=split_columns,
+                transform_dates=transform_dates,
+            )
+            if isinstance(val, list):
+                row_data.extend(val)
+            else:
+                row_data.append(val)
+        rows.append(row_data)
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the time taken to compute export rows per cell and with a compiled "
+        "row plan, and check that both produce the same output."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('export_id')
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=1000,
+            help='Number of documents to compute rows for.'
+        )
+
+    def handle(self, export_id, **options):
+        export_instance = get_properly_wrapped_export_instance(export_id)
+        filters = export_instance.get_filters() or []
+        documents = list(islice(get_export_documents(export_instance, filters), options['limit']))
+        split_columns = export_instance.split_multiselects
+        transform_dates = export_instance.transform_dates
+        tables = export_instance.selected_tables
+
+        start = time.time()
+        expected = [
+            get_rows_per_cell(table, doc, row_number, split_columns, transform_dates)
+            for row_number, doc in enumerate(documents)
+            for table in tables
+        ]
+        per_cell_duration = time.time() - start
+
+        start = time.time()
+        row_plans = [
+            table.get_row_plan(split_columns=split_columns, transform_dates=transform_dates)
+            for table in tables
+        ]
+        actual = [
+            [row.data for row in row_plan.get_rows(doc, row_number)]
+            for row_number, doc in enumerate(documents)
+            for row_plan in row_plans
+        ]
+        row_plan_duration = time.time() - start
+
+        if actual != expected:
+            raise CommandError("Row plan output does not match per-cell output")
+
+        self.stdout.write("Documents:  {}".format(len(documents)))
+        self.stdout.write("Columns:    {}".format(sum(len(table.selected_columns) for table in tables)))
+        self.stdout.write("Per cell:   {:.3f}s".format(per_cell_duration))
+        self.stdout.write("Row plan:   {:.3f}s".format(row_plan_duration))
+        if row_plan_duration:
+            self.stdout.write("Speedup:    {:.2f}x".format(per_cell_duration / row_plan_duration))
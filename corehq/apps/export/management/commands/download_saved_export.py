@@ -7,6 +7,8 @@ from django.conf import settings
 from django.core.management.base import BaseCommand
 
 from corehq.apps.export.dbaccessors import get_properly_wrapped_export_instance
+from corehq.apps.export.models.new import DAILY_SAVED_EXPORT_ATTACHMENT_NAME
+from corehq.blobs import get_blob_db
 from corehq.util.files import safe_filename
 from io import open
 
@@ -20,10 +22,15 @@ def download_saved_export(export_id, dest_dir=None):
         safe_filename(export_instance.name.encode('ascii', 'replace') or 'Export'),
         datetime.utcnow().isoformat()
     )
-    payload = export_instance.get_payload(stream=True)
     print("Downloading Export to {}".format(export_archive_path))
     with open(export_archive_path, 'wb') as download:
-        shutil.copyfileobj(payload, download)
+        if DAILY_SAVED_EXPORT_ATTACHMENT_NAME in export_instance.external_blobs:
+            # large exports download faster in parallel parts
+            key = export_instance.external_blobs[DAILY_SAVED_EXPORT_ATTACHMENT_NAME].key
+            get_blob_db().get_to_file(key, download)
+        else:
+            payload = export_instance.get_payload(stream=True)
+            shutil.copyfileobj(payload, download)
     print("Download Finished!")
 
 
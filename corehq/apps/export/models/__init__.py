@@ -13,6 +13,7 @@ from .new import (
     UserDefinedExportColumn,
     StockFormExportColumn,
     ExportRow,
+    ExportRowPlan,
     ExportInstance,
     FormExportInstance,
     FormExportInstanceDefaults,
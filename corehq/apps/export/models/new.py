@@ -277,55 +277,90 @@ class ExportColumn(DocumentSchema):
         path = [x.name for x in self.item.path[len(base_path):]]
         return self._transform(NestedDictGetter(path)(doc), doc, transform_dates)
 
+    def get_value_function(self, base_path, split_column=False, transform_dates=False):
+        """
+        Return a function with the signature ``f(domain, doc_id, doc, row_index)``
+        that is equivalent to calling ``get_value`` with the remaining arguments fixed.
+
+        For plain columns the path lookup and the transforms are resolved once here
+        instead of once per cell. Subclasses that override ``get_value`` fall back
+        to calling it for every cell unless they override this method as well.
+        """
+        if type(self) is ExportColumn:
+            return self._get_base_value_function(base_path, transform_dates)
+
+        def _get_value(domain, doc_id, doc, row_index):
+            return self.get_value(
+                domain,
+                doc_id,
+                doc,
+                base_path,
+                transform_dates=transform_dates,
+                row_index=row_index,
+                split_column=split_column,
+            )
+        return _get_value
+
+    def _get_base_value_function(self, base_path, transform_dates):
+        """
+        Compiled equivalent of ``ExportColumn.get_value``
+        """
+        assert base_path == self.item.path[:len(base_path)], "ExportItem's path doesn't start with the base_path"
+        getter = NestedDictGetter([x.name for x in self.item.path[len(base_path):]])
+        transform = self._get_transform_function(transform_dates)
+
+        def _get_value(domain, doc_id, doc, row_index):
+            return transform(getter(doc), doc)
+        return _get_value
+
     def _transform(self, value, doc, transform_dates):
         """
         Transform the given value with the transform specified in self.item.transform.
         Also transform dates if the transform_dates flag is true.
         """
+        return self._get_transform_function(transform_dates)(value, doc)
 
-        # When XML elements have additional attributes in them, the text node is
-        # put inside of the #text key. For example:
-        #
-        # <element id="123">value</element>  -> {'#text': 'value', 'id':'123'}
-        #
-        # Whereas elements without additional attributes just take on the string value:
-        #
-        # <element>value</element>  -> 'value'
-        #
-        # This line ensures that we grab the actual value instead of the dictionary
-        if isinstance(value, dict):
-            if '#text' in value:
-                value = value.get('#text')
-            else:
-                return EMPTY_VALUE
-
-        if transform_dates:
-            value = couch_to_excel_datetime(value, doc)
-        if self.item.transform:
-            value = TRANSFORM_FUNCTIONS[self.item.transform](value, doc)
-        if self.deid_transform:
-            try:
-                value = DEID_TRANSFORM_FUNCTIONS[self.deid_transform](value, doc)
-            except ValueError:
-                # Unable to convert the string to a date
-                pass
-        if value is None:
-            value = MISSING_VALUE
-
-        if isinstance(value, list):
-            def _serialize(str_or_dict):
-                """
-                Serialize old data for scalar questions that were previously a repeat
-
-                This is a total edge case. See https://manage.dimagi.com/default.asp?280549.
-                """
-                if isinstance(str_or_dict, dict):
-                    return ','.join('{}={}'.format(k, v) for k, v in str_or_dict.items())
+    def _get_transform_function(self, transform_dates):
+        """
+        Return a function ``f(value, doc)`` that applies the transforms of this column
+        """
+        item_transform = TRANSFORM_FUNCTIONS[self.item.transform] if self.item.transform else None
+        deid_transform = DEID_TRANSFORM_FUNCTIONS[self.deid_transform] if self.deid_transform else None
+
+        def _transform(value, doc):
+            # When XML elements have additional attributes in them, the text node is
+            # put inside of the #text key. For example:
+            #
+            # <element id="123">value</element>  -> {'#text': 'value', 'id':'123'}
+            #
+            # Whereas elements without additional attributes just take on the string value:
+            #
+            # <element>value</element>  -> 'value'
+            #
+            # This line ensures that we grab the actual value instead of the dictionary
+            if isinstance(value, dict):
+                if '#text' in value:
+                    value = value.get('#text')
                 else:
-                    return str_or_dict
-
-            value = ' '.join(_serialize(elem) for elem in value)
-        return value
+                    return EMPTY_VALUE
+
+            if transform_dates:
+                value = couch_to_excel_datetime(value, doc)
+            if item_transform:
+                value = item_transform(value, doc)
+            if deid_transform:
+                try:
+                    value = deid_transform(value, doc)
+                except ValueError:
+                    # Unable to convert the string to a date
+                    pass
+            if value is None:
+                value = MISSING_VALUE
+
+            if isinstance(value, list):
+                value = ' '.join(_serialize_list_item(elem) for elem in value)
+            return value
+        return _transform
 
     @staticmethod
     def create_default_from_export_item(table_path, item, app_ids_and_versions, auto_select=True):
@@ -439,6 +474,18 @@ class ExportColumn(DocumentSchema):
             return super(ExportColumn, cls).wrap(data)
 
 
+def _serialize_list_item(str_or_dict):
+    """
+    Serialize old data for scalar questions that were previously a repeat
+
+    This is a total edge case. See https://manage.dimagi.com/default.asp?280549.
+    """
+    if isinstance(str_or_dict, dict):
+        return ','.join('{}={}'.format(k, v) for k, v in str_or_dict.items())
+    else:
+        return str_or_dict
+
+
 class DocRow(namedtuple("DocRow", ["doc", "row"])):
     """
     DocRow represents a document and its row index.
@@ -487,39 +534,20 @@ class TableConfiguration(DocumentSchema):
         :param document: dictionary representation of a form submission or case
         :param row_number: number indicating this documents index in the sequence of all documents in the export
         :return: List of ExportRows
-        """
-        document_id = document.get('_id')
 
-        sub_documents = self._get_sub_documents(document, row_number, document_id=document_id)
-
-        domain = document.get('domain')
-
-        assert domain is not None, 'Form or Case must be associated with domain'
-        assert document_id is not None, 'Form or Case must have an id'
-
-        rows = []
-        for doc_row in sub_documents:
-            doc, row_index = doc_row.doc, doc_row.row
+        When generating rows for many documents, use get_row_plan() instead
+        so that the columns are only compiled once.
+        """
+        return self.get_row_plan(
+            split_columns=split_columns,
+            transform_dates=transform_dates,
+        ).get_rows(document, row_number)
 
-            row_data = []
-            for col in self.selected_columns:
-                val = col.get_value(
-                    domain,
-                    document_id,
-                    doc,
-                    self.path,
-                    row_index=row_index,
-                    split_column=split_columns,
-                    transform_dates=transform_dates,
-                )
-                if isinstance(val, list):
-                    row_data.extend(val)
-                else:
-                    row_data.append(val)
-            rows.append(ExportRow(
-                data=row_data, hyperlink_column_indices=self.get_hyperlink_column_indices(split_columns)
-            ))
-        return rows
+    def get_row_plan(self, split_columns=False, transform_dates=False):
+        """
+        Return an ExportRowPlan that generates the same rows as get_rows()
+        """
+        return ExportRowPlan(self, split_columns=split_columns, transform_dates=transform_dates)
 
     def get_column(self, item_path, item_doc_type, column_transform):
         """
@@ -597,6 +625,53 @@ class TableConfiguration(DocumentSchema):
         return TableConfiguration._get_sub_documents_helper(document_id, path[1:], new_docs)
 
 
+class ExportRowPlan(object):
+    """
+    A TableConfiguration compiled for a fixed set of export options.
+
+    The selected columns, their path lookups and transforms, and the hyperlink
+    column indices are resolved once when the plan is created, leaving one flat
+    function call per column for every row that is generated.
+    """
+
+    def __init__(self, table, split_columns=False, transform_dates=False):
+        self.table = table
+        self.value_functions = [
+            column.get_value_function(table.path, split_column=split_columns, transform_dates=transform_dates)
+            for column in table.selected_columns
+        ]
+        self.hyperlink_column_indices = table.get_hyperlink_column_indices(split_columns)
+
+    def get_rows(self, document, row_number):
+        """
+        Return a list of ExportRows generated for the given document.
+        :param document: dictionary representation of a form submission or case
+        :param row_number: number indicating this documents index in the sequence of all documents in the export
+        :return: List of ExportRows
+        """
+        document_id = document.get('_id')
+
+        sub_documents = self.table._get_sub_documents(document, row_number, document_id=document_id)
+
+        domain = document.get('domain')
+
+        assert domain is not None, 'Form or Case must be associated with domain'
+        assert document_id is not None, 'Form or Case must have an id'
+
+        value_functions = self.value_functions
+        rows = []
+        for doc, row_index in sub_documents:
+            row_data = []
+            for get_value in value_functions:
+                val = get_value(domain, document_id, doc, row_index)
+                if isinstance(val, list):
+                    row_data.extend(val)
+                else:
+                    row_data.append(val)
+            rows.append(ExportRow(data=row_data, hyperlink_column_indices=self.hyperlink_column_indices))
+        return rows
+
+
 class DatePeriod(DocumentSchema):
     period_type = StringProperty(required=True)
     days = IntegerProperty()
@@ -2415,23 +2490,36 @@ class SplitExportColumn(ExportColumn):
         value = super(SplitExportColumn, self).get_value(domain, doc_id, doc, base_path, **kwargs)
         if not split_column:
             return value
+        return self._split_value(value, [option.value for option in self.item.options])
 
+    def get_value_function(self, base_path, split_column=False, transform_dates=False):
+        get_base_value = self._get_base_value_function(base_path, transform_dates)
+        if not split_column:
+            return get_base_value
+
+        option_values = [option.value for option in self.item.options]
+
+        def _get_value(domain, doc_id, doc, row_index):
+            return self._split_value(get_base_value(domain, doc_id, doc, row_index), option_values)
+        return _get_value
+
+    def _split_value(self, value, option_values):
         if value == MISSING_VALUE:
-            value = [MISSING_VALUE] * len(self.item.options)
+            value = [MISSING_VALUE] * len(option_values)
             if not self.ignore_unspecified_options:
                 value.append(MISSING_VALUE)
             return value
 
         if not isinstance(value, six.string_types):
             unspecified_options = [] if self.ignore_unspecified_options else [value]
-            return [EMPTY_VALUE] * len(self.item.options) + unspecified_options
+            return [EMPTY_VALUE] * len(option_values) + unspecified_options
         else:
             soft_assert_type_text(value)
 
         selected = OrderedDict((x, 1) for x in value.split(" "))
         row = []
-        for option in self.item.options:
-            row.append(selected.pop(option.value, EMPTY_VALUE))
+        for option_value in option_values:
+            row.append(selected.pop(option_value, EMPTY_VALUE))
         if not self.ignore_unspecified_options:
             row.append(" ".join(selected))
         return row
@@ -180,6 +180,41 @@ class WriterTest(SimpleTestCase):
         })
         self.assertTrue(export_save.called)
 
+    @patch('corehq.apps.export.models.FormExportInstance.save')
+    @patch('corehq.apps.export.export.MAX_EXPORTABLE_ROWS', 3)
+    @patch('corehq.apps.export.export.ROW_BUFFER_SIZE', 2)
+    @flag_enabled('PAGINATED_EXPORTS')
+    def test_paginated_table_buffered(self, export_save):
+        export_instance = FormExportInstance(
+            export_format=Format.JSON,
+            tables=[
+                TableConfiguration(
+                    label="My table",
+                    selected=True,
+                    columns=[
+                        ExportColumn(
+                            label="Q3",
+                            item=ScalarItem(
+                                path=[PathNode(name='form'), PathNode(name='q3')],
+                            ),
+                            selected=True
+                        ),
+                    ]
+                )
+            ]
+        )
+
+        assert_instance_gives_results(self.docs + self.docs, export_instance, {
+            'My table_000': {
+                'headers': ['Q3'],
+                'rows': [['baz'], ['bop'], ['baz']],
+            },
+            'My table_001': {
+                'headers': ['Q3'],
+                'rows': [['bop']],
+            }
+        })
+
     @patch('corehq.apps.export.models.FormExportInstance.save')
     def test_split_questions(self, export_save):
         """Ensure columns are split when `split_multiselects` is set to True"""
@@ -5,6 +5,9 @@ from django.test import SimpleTestCase
 from corehq.apps.export.const import USERNAME_TRANSFORM
 from corehq.apps.export.models import (
     DocRow,
+    MultipleChoiceItem,
+    Option,
+    SplitExportColumn,
     RowNumberColumn,
     PathNode,
     ExportRow,
@@ -338,3 +341,82 @@ class TableConfigurationGetRowsTest(SimpleTestCase):
         self.assertEqual(
             [row.data for row in table_configuration.get_rows(submission, 0)], []
         )
+
+
+class ExportRowPlanTest(SimpleTestCase):
+
+    def setUp(self):
+        self.table_configuration = TableConfiguration(
+            path=[PathNode(name="form", is_repeat=False), PathNode(name="repeat1", is_repeat=True)],
+            columns=[
+                RowNumberColumn(
+                    selected=True,
+                    repeat=1,
+                ),
+                ExportColumn(
+                    item=ScalarItem(
+                        path=[
+                            PathNode(name="form"),
+                            PathNode(name="repeat1", is_repeat=True),
+                            PathNode(name="q1")
+                        ],
+                    ),
+                    selected=True,
+                ),
+                SplitExportColumn(
+                    item=MultipleChoiceItem(
+                        path=[
+                            PathNode(name="form"),
+                            PathNode(name="repeat1", is_repeat=True),
+                            PathNode(name="mc")
+                        ],
+                        options=[Option(value='a'), Option(value='c')]
+                    ),
+                    selected=True,
+                ),
+            ]
+        )
+        self.submission = {
+            'domain': 'my-domain',
+            '_id': '1234',
+            'form': {
+                'repeat1': [
+                    {'q1': 'foo', 'mc': 'a b'},
+                    {'q1': {'#text': 'bar', 'id': '1'}},
+                ]
+            }
+        }
+
+    def _get_rows_per_cell(self, split_columns):
+        rows = []
+        for doc, row_index in self.table_configuration._get_sub_documents(self.submission, 0):
+            row_data = []
+            for column in self.table_configuration.selected_columns:
+                val = column.get_value(
+                    'my-domain', '1234', doc, self.table_configuration.path,
+                    row_index=row_index, split_column=split_columns,
+                )
+                if isinstance(val, list):
+                    row_data.extend(val)
+                else:
+                    row_data.append(val)
+            rows.append(row_data)
+        return rows
+
+    def test_matches_get_value(self):
+        for split_columns in (True, False):
+            row_plan = self.table_configuration.get_row_plan(split_columns=split_columns)
+            self.assertEqual(
+                [row.data for row in row_plan.get_rows(self.submission, 0)],
+                self._get_rows_per_cell(split_columns),
+            )
+
+    def test_split_columns(self):
+        row_plan = self.table_configuration.get_row_plan(split_columns=True)
+        self.assertEqual(
+            [row.data for row in row_plan.get_rows(self.submission, 0)],
+            [
+                ['0.0', 0, 0, 'foo', 1, '', 'b'],
+                ['0.1', 0, 1, 'bar', '---', '---', '---'],
+            ]
+        )
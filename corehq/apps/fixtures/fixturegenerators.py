@@ -7,14 +7,14 @@ from io import BytesIO
 import six
 from casexml.apps.phone.fixtures import FixtureProvider
 from casexml.apps.phone.utils import ITEMS_COMMENT_PREFIX
-from corehq.apps.fixtures.models import FixtureDataItem, FixtureDataType, FIXTURE_BUCKET
+from corehq.apps.fixtures.models import FixtureDataItem, FixtureDataType
 from corehq.apps.products.fixtures import product_fixture_generator_json
 from corehq.apps.programs.fixtures import program_fixture_generator_json
 from corehq.blobs import CODES, get_blob_db
 from corehq.blobs.models import BlobMeta
 from corehq.blobs.exceptions import NotFound
 
-from .utils import get_index_schema_node
+from .utils import get_fixture_cache_key, get_fixture_data_type_last_modified, get_index_schema_node
 
 # GLOBAL_USER_ID is expected to be a globally unique string that will never
 # change and can always be search-n-replaced in global fixture XML. The UUID
@@ -63,7 +63,7 @@ class ItemListsProvider(FixtureProvider):
         restore_user = restore_state.restore_user
         global_types = {}
         user_types = {}
-        for data_type in FixtureDataType.by_domain(restore_user.domain):
+        for data_type in self._get_data_types_to_sync(restore_state):
             if data_type.is_global:
                 global_types[data_type._id] = data_type
             else:
@@ -75,20 +75,62 @@ class ItemListsProvider(FixtureProvider):
             items.extend(self.get_user_items(user_types, restore_user))
         return items
 
+    def _get_data_types_to_sync(self, restore_state):
+        """
+        Get the lookup tables that need to be synced
+
+        Global tables that did not change since the last sync are left out,
+        and stay on the phone as they are. User tables are always synced
+        since the items a user owns depend on their groups and locations.
+        """
+        domain = restore_state.restore_user.domain
+        data_types = FixtureDataType.by_domain(domain)
+        last_sync = restore_state.last_sync_log
+        if not last_sync or not last_sync.date:
+            return data_types
+
+        return [
+            data_type for data_type in data_types
+            if not data_type.is_global
+            or get_fixture_data_type_last_modified(domain, data_type._id) >= last_sync.date
+        ]
+
     def get_global_items(self, global_types, restore_state):
+        """
+        Get the fixtures for global lookup tables
+
+        The serialized fixture for each table is cached with a placeholder
+        user id, which is replaced with the id of the restore user.
+        """
         restore_user = restore_state.restore_user
         user_id = restore_user.user_id
         domain = restore_user.domain
         db = get_blob_db()
-        if not restore_state.overwrite_cache:
-            global_id = GLOBAL_USER_ID.encode('utf-8')
-            b_user_id = user_id.encode('utf-8')
-            try:
-                data = db.get(key=FIXTURE_BUCKET + '/' + domain).read()
-                return [data.replace(global_id, b_user_id)] if data else []
-            except NotFound:
-                pass
-        global_items = self._get_global_items(global_types, domain, bypass_cache=restore_state.overwrite_cache)
+        global_id = GLOBAL_USER_ID.encode('utf-8')
+        b_user_id = user_id.encode('utf-8')
+        items = []
+        for data_type in sorted(global_types.values(), key=lambda data_type: data_type.tag):
+            if not restore_state.overwrite_cache:
+                try:
+                    data = db.get(key=get_fixture_cache_key(domain, data_type._id)).read()
+                    if data:
+                        items.append(data.replace(global_id, b_user_id))
+                    continue
+                except NotFound:
+                    pass
+            items.extend(self._get_global_items(data_type, domain, user_id, restore_state.overwrite_cache))
+        return items
+
+    def _get_global_items(self, data_type, domain, user_id, bypass_cache):
+        """
+        Get and cache the fixtures for a single global lookup table
+        """
+        db = get_blob_db()
+        items = []
+        for item in FixtureDataItem.by_data_type(domain, data_type._id, bypass_cache):
+            self._set_cached_type(item, data_type)
+            items.append(item)
+        global_items = self._get_fixtures({data_type._id: data_type}, {data_type: items}, GLOBAL_USER_ID)
         io = BytesIO()
         io.write(ITEMS_COMMENT_PREFIX)
         io.write(six.text_type(len(global_items)).encode('utf-8'))
@@ -102,27 +144,19 @@ class ItemListsProvider(FixtureProvider):
             kw = {"meta": db.metadb.get(
                 parent_id=domain,
                 type_code=CODES.fixture,
-                name="",
+                name=data_type._id,
             )}
         except BlobMeta.DoesNotExist:
             kw = {
                 "domain": domain,
                 "parent_id": domain,
                 "type_code": CODES.fixture,
-                "name": "",
-                "key": FIXTURE_BUCKET + '/' + domain,
+                "name": data_type._id,
+                "key": get_fixture_cache_key(domain, data_type._id),
             }
         db.put(io, **kw)
         return global_items
 
-    def _get_global_items(self, global_types, domain, bypass_cache):
-        items_by_type = defaultdict(list)
-        for item in FixtureDataItem.by_data_types(domain, global_types, bypass_cache):
-            data_type = global_types[item.data_type_id]
-            self._set_cached_type(item, data_type)
-            items_by_type[data_type].append(item)
-        return self._get_fixtures(global_types, items_by_type, GLOBAL_USER_ID)
-
     def get_user_items(self, user_types, restore_user):
         items_by_type = defaultdict(list)
         for item in restore_user.get_fixture_data_items():
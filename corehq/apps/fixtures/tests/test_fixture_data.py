@@ -1,11 +1,13 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
+from datetime import datetime
 from xml.etree import cElementTree as ElementTree
 
 import six
 from django.test import TestCase
 
 from casexml.apps.case.tests.util import check_xml_line_by_line
+from casexml.apps.phone.models import SyncLog
 from casexml.apps.phone.tests.utils import call_fixture_generator
 from corehq.apps.fixtures import fixturegenerators
 from corehq.apps.fixtures.dbaccessors import delete_all_fixture_data_types, \
@@ -13,6 +15,7 @@ from corehq.apps.fixtures.dbaccessors import delete_all_fixture_data_types, \
 from corehq.apps.fixtures.exceptions import FixtureVersionError
 from corehq.apps.fixtures.models import FixtureDataType, FixtureTypeField, \
     FixtureDataItem, FieldList, FixtureItemField, FixtureOwnership, FIXTURE_BUCKET
+from corehq.apps.fixtures.utils import clear_fixture_cache, get_fixture_cache_key
 from corehq.apps.users.dbaccessors.all_commcare_users import delete_all_users
 from corehq.apps.users.models import CommCareUser
 from corehq.blobs import get_blob_db
@@ -292,12 +295,33 @@ class FixtureDataTest(TestCase):
 
         fixtures = call_fixture_generator(fixturegenerators.item_lists, frank)
         self.assertEqual({item.attrib['user_id'] for item in fixtures}, {frank.user_id})
-        self.assertTrue(get_blob_db().exists(key=FIXTURE_BUCKET + '/' + self.domain))
+        self.assertTrue(get_blob_db().exists(key=get_fixture_cache_key(self.domain, sandwich._id)))
 
         fixtures = [ElementTree.fromstring(f) if isinstance(f, bytes) else f
             for f in call_fixture_generator(fixturegenerators.item_lists, sammy)]
         self.assertEqual({item.attrib['user_id'] for item in fixtures}, {sammy.user_id})
 
+    def test_unchanged_global_data_types_are_not_synced(self):
+        sandwich = self.make_data_type("sandwich", is_global=True)
+        self.make_data_item(sandwich, "7.39")
+        restore_user = self.user.to_ota_restore_user()
+        clear_fixture_cache(self.domain)
+
+        def synced_fixture_ids(last_sync):
+            fixtures = call_fixture_generator(fixturegenerators.item_lists, restore_user, last_sync=last_sync)
+            return [
+                (ElementTree.fromstring(f) if isinstance(f, bytes) else f).attrib['id']
+                for f in fixtures
+            ]
+
+        self.assertEqual(synced_fixture_ids(None), ['item-list:sandwich-index', 'item-list:district'])
+        last_sync = SyncLog(date=datetime.utcnow())
+        # user lookup tables are always synced
+        self.assertEqual(synced_fixture_ids(last_sync), ['item-list:district'])
+
+        clear_fixture_cache(self.domain, [sandwich._id])
+        self.assertEqual(synced_fixture_ids(last_sync), ['item-list:sandwich-index', 'item-list:district'])
+
     def make_data_type(self, name, is_global):
         data_type = FixtureDataType(
             domain=self.domain,
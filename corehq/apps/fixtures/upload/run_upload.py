@@ -197,7 +197,7 @@ def _run_fixture_upload(domain, workbook, replace=False, task=None):
                                                    transaction=transaction)
 
     clear_fixture_quickcache(domain, data_types)
-    clear_fixture_cache(domain)
+    clear_fixture_cache(domain, [data_type.get_id for data_type in data_types])
     return return_val
 
 
@@ -219,10 +219,6 @@ def clear_fixture_quickcache(domain, data_types):
 
     from corehq.apps.fixtures.dbaccessors import get_fixture_items_for_data_types
     get_fixture_items_for_data_types.clear(domain, type_ids)
-
-    # We always call get_fixture_items_for_data_types with a list of all global
-    # type ids when doing a restore (i.e. the cache key is a set of all global
-    # type ids) So when updating just a subset of types, we still need to clear
-    # the cache key that contains all types.
-    global_type_ids = {dt.get_id for dt in FixtureDataType.by_domain(domain) if dt.is_global}
-    get_fixture_items_for_data_types.clear(domain, global_type_ids)
+    # restores get the items of each global type separately
+    for type_id in type_ids:
+        get_fixture_items_for_data_types.clear(domain, {type_id})
@@ -1,11 +1,13 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 import re
+from datetime import datetime
 from xml.etree import cElementTree as ElementTree
 
 from celery.task import task
 from dimagi.utils.chunked import chunked
 from corehq.blobs import get_blob_db
+from dimagi.utils.couch.cache.cache_core import get_redis_client
 
 BAD_SLUG_PATTERN = r"([/\\<>\s])"
 
@@ -61,9 +63,64 @@ def get_index_schema_node(fixture_id, attrs_to_index):
     return node
 
 
-def clear_fixture_cache(domain):
+def get_fixture_cache_key(domain, data_type_id):
     from corehq.apps.fixtures.models import FIXTURE_BUCKET
-    get_blob_db().delete(key=FIXTURE_BUCKET + '/' + domain)
+    return '{}/{}/{}'.format(FIXTURE_BUCKET, domain, data_type_id)
+
+
+FIXTURE_LAST_MODIFIED_TIMEOUT = 60 * 24 * 60 * 60
+
+
+def _get_fixture_last_modified_key(domain, data_type_id):
+    return 'fixture-data-type-last-modified-{}-{}'.format(domain, data_type_id)
+
+
+def get_fixture_data_type_last_modified(domain, data_type_id):
+    """
+    The time a lookup table was last changed, as far as restores are concerned
+
+    This is set by `clear_fixture_cache` and read straight from redis, so
+    every process sees an edit as soon as it is made. If there is no value
+    (the table was never changed, or the key expired) the current time is
+    stored and returned, so the table is synced again rather than being
+    missed.
+    """
+    client = get_redis_client()
+    key = _get_fixture_last_modified_key(domain, data_type_id)
+    last_modified = client.get(key)
+    if last_modified is None:
+        client.set(key, datetime.utcnow(), timeout=FIXTURE_LAST_MODIFIED_TIMEOUT, nx=True)
+        last_modified = client.get(key)
+    return last_modified or datetime.utcnow()
+
+
+def set_fixture_data_type_last_modified(domain, data_type_ids):
+    client = get_redis_client()
+    now = datetime.utcnow()
+    for data_type_id in data_type_ids:
+        client.set(
+            _get_fixture_last_modified_key(domain, data_type_id),
+            now,
+            timeout=FIXTURE_LAST_MODIFIED_TIMEOUT,
+        )
+
+
+def clear_fixture_cache(domain, data_type_ids=None):
+    """
+    Clear the serialized lookup tables cached for restores
+
+    :param data_type_ids: ids of the lookup tables that changed.
+    Defaults to all lookup tables in the domain.
+    """
+    from corehq.apps.fixtures.models import FIXTURE_BUCKET, FixtureDataType
+    if data_type_ids is None:
+        data_type_ids = [data_type.get_id for data_type in FixtureDataType.by_domain(domain)]
+    db = get_blob_db()
+    for data_type_id in data_type_ids:
+        db.delete(key=get_fixture_cache_key(domain, data_type_id))
+    set_fixture_data_type_last_modified(domain, data_type_ids)
+    # all global lookup tables used to be cached together
+    db.delete(key=FIXTURE_BUCKET + '/' + domain)
 
 
 @task(queue='background_queue')
@@ -1,8 +1,8 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
-from django.db import models
-from django.db.models.expressions import Exists, F, Func, OuterRef, Value
+from django.db import connections, models
+from django.db.models.expressions import Exists, F, Func, OuterRef, Subquery, Value
 from django.db.models.query import Q, QuerySet, EmptyResultSet
 from django_cte import With
 
@@ -28,6 +28,21 @@ class array_length(Func):
     output_field = field
 
 
+class cardinality(Func):
+    # unlike array_length this is 0 (rather than NULL) for empty arrays
+    function = "cardinality"
+    output_field = field
+
+
+class unnest(Func):
+    function = "unnest"
+    output_field = field
+
+
+class ArraySubquery(Subquery):
+    template = "ARRAY(%(subquery)s)"
+
+
 class AdjListManager(models.Manager):
 
     def get_ancestors(self, node, ascending=False, include_self=False):
@@ -43,6 +58,9 @@ class AdjListManager(models.Manager):
         :param include_self:
         :returns: A `QuerySet` instance.
         """
+        if self.model.use_materialized_path():
+            return self._get_ancestors_by_path(node, ascending, include_self)
+
         if isinstance(node, Q):
             where = node
         elif include_self:
@@ -87,6 +105,9 @@ class AdjListManager(models.Manager):
         `include_self` argument will be ignored.
         :returns: A `QuerySet` instance.
         """
+        if self.model.use_materialized_path():
+            return self._get_descendants_by_path(node, include_self)
+
         ordering_col = self.model.ordering_col_attr
 
         discard_dups = False
@@ -157,6 +178,52 @@ class AdjListManager(models.Manager):
 
         return query.order_by(cte.col._cte_ordering)
 
+    def _get_ancestors_by_path(self, node, ascending, include_self):
+        path_col = self.model.materialized_path_attr
+        if isinstance(node, Q):
+            where = node
+            include_self = True
+        elif isinstance(node, QuerySet):
+            if _is_empty(node):
+                return self.none()
+            where = Q(id__in=node.order_by())
+        else:
+            where = Q(id=node.id)
+
+        ancestor_ids = self.filter(where).order_by().annotate(
+            _ancestor_id=unnest(F(path_col)),
+        ).values("_ancestor_id")
+        query = Q(id__in=ancestor_ids)
+        if include_self:
+            query |= where
+        return self.filter(query).annotate(
+            _depth=cardinality(F(path_col)),
+        ).order_by(("-" if ascending else "") + "_depth")
+
+    def _get_descendants_by_path(self, node, include_self):
+        path_col = self.model.materialized_path_attr
+        if isinstance(node, Q):
+            where = node
+            include_self = True
+        elif isinstance(node, QuerySet):
+            if _is_empty(node):
+                return self.none()
+            where = Q(id__in=node.order_by())
+        else:
+            where = Q(id=node.id)
+
+        if isinstance(node, (Q, QuerySet)):
+            node_ids = self.filter(where).order_by().values("id")
+            query = Q(**{path_col + "__overlap": ArraySubquery(SubQueryset(node_ids))})
+        else:
+            query = Q(**{path_col + "__contains": [node.id]})
+        if include_self:
+            query |= where
+        # unlike the recursive query, results are ordered breadth first
+        return self.filter(query).annotate(
+            _depth=cardinality(F(path_col)),
+        ).order_by("_depth", self.model.ordering_col_attr)
+
     def get_queryset_ancestors(self, queryset, include_self=False):
         return self.get_ancestors(queryset, include_self=include_self)
 
@@ -176,11 +243,69 @@ class AdjListModel(models.Model):
 
     ordering_col_attr = 'name'
 
+    # Name of an optional array field holding the ids of the ancestors
+    # of each node (root first), which is kept up to date by
+    # `set_materialized_path`. See `use_materialized_path`.
+    materialized_path_attr = None
+
     objects = AdjListManager()
 
     class Meta:
         abstract = True
 
+    @classmethod
+    def use_materialized_path(cls):
+        """Query ancestors and descendants with the materialized path
+
+        Otherwise they are queried with recursive CTEs. The materialized
+        path must be populated for all nodes before this is enabled.
+        """
+        return False
+
+    def set_materialized_path(self):
+        """Set the materialized path of this node before it is saved
+
+        If the node moved, the paths of its descendants are updated too,
+        so this should be called in the transaction that saves the node.
+        The path is left empty (NULL) if the path of the parent has not
+        been populated.
+        """
+        path_attr = self.materialized_path_attr
+        if path_attr is None:
+            return
+        manager = type(self)._base_manager
+        old_path = None
+        if self.pk is not None:
+            old = manager.filter(pk=self.pk).values_list("parent_id", path_attr).first()
+            if old is not None:
+                old_parent_id, old_path = old
+                if old_parent_id == self.parent_id and old_path is not None:
+                    # the value on this instance may be stale
+                    setattr(self, path_attr, old_path)
+                    return
+
+        if self.parent_id is None:
+            path = []
+        else:
+            parent_path = manager.filter(pk=self.parent_id).values_list(path_attr, flat=True).first()
+            path = None if parent_path is None else parent_path + [self.parent_id]
+        setattr(self, path_attr, path)
+
+        if old_path is not None and path is not None and old_path != path:
+            self._move_descendant_paths(path)
+
+    def _move_descendant_paths(self, path):
+        model = type(self)
+        path_col = model._meta.get_field(self.materialized_path_attr).column
+        with connections[model._base_manager.db].cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE {table} SET {path} = %s::integer[] || {path}[array_position({path}, %s):]
+                WHERE {path} @> %s::integer[]
+                """.format(table=model._meta.db_table, path=path_col),
+                [path, self.pk, [self.pk]]
+            )
+
     def get_ancestors(self, **kw):
         """
         Returns a Queryset of all ancestor locations of this location
@@ -1,9 +1,11 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import hashlib
 from collections import defaultdict
+from io import BytesIO
 from itertools import groupby
-from xml.etree.cElementTree import Element, SubElement
+from xml.etree.cElementTree import Element, SubElement, tostring
 
 from django.contrib.postgres.fields.array import ArrayField
 from django.db.models import IntegerField, Q
@@ -12,11 +14,13 @@ from django_cte.raw import raw_cte_sql
 import six
 
 from casexml.apps.phone.fixtures import FixtureProvider
+from casexml.apps.phone.utils import ITEMS_COMMENT_PREFIX
 from corehq import toggles
 from corehq.apps.app_manager.const import (
     DEFAULT_LOCATION_FIXTURE_OPTION, SYNC_FLAT_FIXTURES, SYNC_HIERARCHICAL_FIXTURE
 )
 from corehq.apps.custom_data_fields.dbaccessors import get_by_domain_and_type
+from corehq.apps.fixtures.fixturegenerators import GLOBAL_USER_ID
 from corehq.apps.fixtures.utils import get_index_schema_node
 from corehq.apps.locations.models import (
     LocationFixtureConfiguration,
@@ -24,6 +28,10 @@ from corehq.apps.locations.models import (
     LocationType,
     SQLLocation,
 )
+from dimagi.utils.couch.cache.cache_core import get_redis_default_cache
+
+LOCATION_FIXTURE_CACHE_KEY_PREFIX = 'ota-location-fixture'
+LOCATION_FIXTURE_CACHE_TIMEOUT = 12 * 60 * 60
 
 
 class LocationSet(object):
@@ -123,8 +131,72 @@ class LocationFixtureProvider(FixtureProvider):
             return []
 
         data_fields = _get_location_data_fields(restore_user.domain)
+        if toggles.LOCATION_FIXTURE_CACHE.enabled(restore_user.domain):
+            return [self._get_cached_fixture(restore_state, locations_queryset, data_fields)]
         return self.serializer.get_xml_nodes(self.id, restore_user, locations_queryset, data_fields)
 
+    def _get_cached_fixture(self, restore_state, locations_queryset, data_fields):
+        """
+        Get the serialized fixture from a cache that is shared by all users
+        who sync the same set of locations.
+
+        The fixture is cached with a placeholder user id, which is replaced
+        with the id of the restore user.
+        """
+        restore_user = restore_state.restore_user
+        cache = get_redis_default_cache()
+        cache_key = _get_location_fixture_cache_key(
+            self.id, restore_user.domain, locations_queryset, data_fields)
+        fixture = None if restore_state.overwrite_cache else cache.get(cache_key)
+        if fixture is None:
+            nodes = self.serializer.get_xml_nodes(self.id, restore_user, locations_queryset, data_fields)
+            fixture = _serialize_fixture_nodes(nodes)
+            cache.set(cache_key, fixture, timeout=LOCATION_FIXTURE_CACHE_TIMEOUT)
+        return fixture.replace(GLOBAL_USER_ID.encode('utf-8'), restore_user.user_id.encode('utf-8'))
+
+
+def _get_location_fixture_cache_key(fixture_id, domain, locations_queryset, data_fields):
+    """
+    The fixture only depends on the locations that are synced, the location
+    types and the location data fields, so entries are keyed on those along
+    with the latest modification of the locations and location types.
+    Location type ids are included since deleting a type doesn't change the
+    latest modification of the remaining ones.
+    Changing any of them changes the key, so entries never need to be invalidated.
+    """
+    location_ids = []
+    last_modified = None
+    for pk, modified in locations_queryset.prefetch_related(None).order_by().values_list('id', 'last_modified'):
+        location_ids.append(pk)
+        last_modified = max(last_modified, modified) if last_modified else modified
+    location_type_ids = []
+    types_last_modified = None
+    for pk, modified in LocationType.objects.filter(domain=domain).values_list('id', 'last_modified'):
+        location_type_ids.append(pk)
+        types_last_modified = max(types_last_modified, modified) if types_last_modified else modified
+    hashable_key = ','.join([six.text_type(part) for part in [
+        domain,
+        fixture_id,
+        '|'.join(six.text_type(pk) for pk in sorted(location_ids)),
+        '|'.join('{}:{}'.format(field.slug, bool(field.index_in_fixture)) for field in data_fields),
+        '|'.join(six.text_type(pk) for pk in sorted(location_type_ids)),
+        last_modified.isoformat() if last_modified else '',
+        types_last_modified.isoformat() if types_last_modified else '',
+    ]])
+    return '{}-{}'.format(LOCATION_FIXTURE_CACHE_KEY_PREFIX, hashlib.md5(hashable_key.encode('utf-8')).hexdigest())
+
+
+def _serialize_fixture_nodes(nodes):
+    io = BytesIO()
+    io.write(ITEMS_COMMENT_PREFIX)
+    io.write(six.text_type(len(nodes)).encode('utf-8'))
+    io.write(b'-->')
+    for node in nodes:
+        if 'user_id' in node.attrib:
+            node.attrib['user_id'] = GLOBAL_USER_ID
+        io.write(tostring(node, encoding='utf-8'))
+    return io.getvalue()
+
 
 class HierarchicalLocationSerializer(object):
 
@@ -0,0 +1,47 @@
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from corehq.apps.locations.models import SQLLocation
+
+
+class Command(BaseCommand):
+    help = ("Populate SQLLocation.ancestor_ids, which must be done for all "
+            "locations before enabling settings.USE_LOCATION_ANCESTOR_IDS")
+
+    def add_arguments(self, parser):
+        parser.add_argument('domains', nargs='*',
+                            help="Domains to populate. Defaults to all domains.")
+
+    def handle(self, domains, **options):
+        if not domains:
+            domains = (SQLLocation.objects
+                       .order_by('domain')
+                       .distinct('domain')
+                       .values_list('domain', flat=True))
+        for domain in domains:
+            count = populate_ancestor_ids(domain)
+            print("{}: updated {} locations".format(domain, count))
+
+
+def populate_ancestor_ids(domain):
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            WITH RECURSIVE tree AS (
+                SELECT id, ARRAY[]::integer[] AS ancestor_ids
+                FROM locations_sqllocation
+                WHERE domain = %(domain)s AND parent_id IS NULL
+              UNION ALL
+                SELECT loc.id, tree.ancestor_ids || tree.id
+                FROM locations_sqllocation loc
+                INNER JOIN tree ON loc.parent_id = tree.id
+            )
+            UPDATE locations_sqllocation SET ancestor_ids = tree.ancestor_ids
+            FROM tree
+            WHERE locations_sqllocation.id = tree.id
+                AND locations_sqllocation.ancestor_ids IS DISTINCT FROM tree.ancestor_ids
+        """, {'domain': domain})
+        return cursor.rowcount
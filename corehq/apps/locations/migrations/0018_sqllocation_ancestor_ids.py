@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.20 on 2019-03-18 10:12
+from __future__ import absolute_import, unicode_literals
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0017_locationrelation_last_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sqllocation',
+            name='ancestor_ids',
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.IntegerField(), null=True, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='sqllocation',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['ancestor_ids'], name='locations_s_ancesto_5ba91b_gin'),
+        ),
+    ]
@@ -9,6 +9,9 @@ import uuid
 from django_bulk_update.helper import bulk_update as bulk_update_helper
 
 import jsonfield
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models, transaction
 from django.db.models import Q
 from django_cte import CTEQuerySet
@@ -387,6 +390,9 @@ class SQLLocation(AdjListModel):
     latitude = models.DecimalField(max_digits=20, decimal_places=10, null=True, blank=True)
     longitude = models.DecimalField(max_digits=20, decimal_places=10, null=True, blank=True)
     parent = models.ForeignKey('self', null=True, blank=True, related_name='children', on_delete=models.CASCADE)
+    # ids of all ancestors, root first. NULL until populated with
+    # the populate_location_ancestor_ids management command.
+    ancestor_ids = ArrayField(models.IntegerField(), null=True)
 
     # Use getter and setter below to access this value
     # since stocks_all_products can cause an empty list to
@@ -405,6 +411,12 @@ class SQLLocation(AdjListModel):
     active_objects = OnlyUnarchivedLocationManager()
     inactive_objects = OnlyArchivedLocationManager()
 
+    materialized_path_attr = 'ancestor_ids'
+
+    @classmethod
+    def use_materialized_path(cls):
+        return settings.USE_LOCATION_ANCESTOR_IDS
+
     def get_ancestor_of_type(self, type_code):
         """
         Returns the ancestor of given location_type_code of the location
@@ -431,6 +443,7 @@ class SQLLocation(AdjListModel):
         with transaction.atomic():
             set_site_code_if_needed(self)
             sync_supply_point(self)
+            self.set_materialized_path()
             super(SQLLocation, self).save(*args, **kwargs)
 
         publish_location_saved(self.domain, self.location_id)
@@ -611,6 +624,7 @@ class SQLLocation(AdjListModel):
     class Meta(object):
         app_label = 'locations'
         unique_together = ('domain', 'site_code',)
+        indexes = [GinIndex(fields=['ancestor_ids'])]
 
     def __str__(self):
         return "{} ({})".format(self.name, self.domain)
@@ -22,6 +22,7 @@ from corehq.apps.commtrack.tests.util import bootstrap_domain
 from corehq.apps.users.models import CommCareUser
 
 from corehq.apps.app_manager.tests.util import TestXmlMixin, extract_xml_partial
+from corehq.apps.fixtures.fixturegenerators import GLOBAL_USER_ID
 from corehq.apps.users.dbaccessors.all_commcare_users import delete_all_users
 
 from .util import (
@@ -33,7 +34,8 @@ from .util import (
 )
 from ..fixtures import _location_to_fixture, LocationSet, should_sync_locations, location_fixture_generator, \
     flat_location_fixture_generator, should_sync_flat_fixture, should_sync_hierarchical_fixture, \
-    _get_location_data_fields, get_location_fixture_queryset, related_locations_fixture_generator
+    _get_location_data_fields, get_location_fixture_queryset, related_locations_fixture_generator, \
+    _get_location_fixture_cache_key
 from ..models import SQLLocation, LocationType, make_location, LocationFixtureConfiguration, LocationRelation
 import six
 
@@ -250,6 +252,37 @@ class LocationFixturesTest(LocationHierarchyTestCase, FixtureHasLocationsMixin):
                 flat=True,
             )
 
+    @flag_enabled('LOCATION_FIXTURE_CACHE')
+    def test_fixture_cache_is_shared_between_users(self):
+        self.user._couch_user.set_location(self.locations['Middlesex'])
+        other_user = create_restore_user(self.domain, 'other-user', '123')
+        self.addCleanup(other_user._couch_user.delete)
+        other_user._couch_user.set_location(self.locations['Middlesex'])
+
+        serializer = flat_location_fixture_generator.serializer
+        with mock.patch.object(serializer, 'get_xml_nodes', wraps=serializer.get_xml_nodes) as get_xml_nodes:
+            fixture, = call_fixture_generator(flat_location_fixture_generator, self.user)
+            other_fixture, = call_fixture_generator(flat_location_fixture_generator, other_user)
+
+        self.assertEqual(get_xml_nodes.call_count, 1)
+        self.assertNotIn(GLOBAL_USER_ID.encode('utf-8'), fixture)
+        self.assertEqual(
+            other_fixture,
+            fixture.replace(self.user.user_id.encode('utf-8'), other_user.user_id.encode('utf-8'))
+        )
+
+    def test_fixture_cache_key_changes_when_location_type_is_deleted(self):
+        location_type = LocationType.objects.create(domain=self.domain, name='unused', code='unused')
+        locations_queryset = SQLLocation.objects.filter(domain=self.domain)
+
+        def get_cache_key():
+            return _get_location_fixture_cache_key(
+                flat_location_fixture_generator.id, self.domain, locations_queryset, [])
+
+        cache_key = get_cache_key()
+        location_type.delete()
+        self.assertNotEqual(get_cache_key(), cache_key)
+
     def test_include_without_expanding(self):
         self.user._couch_user.set_location(self.locations['Boston'])
         location_type = self.locations['Boston'].location_type
@@ -2,6 +2,7 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 import pickle
 
+from ..management.commands.populate_location_ancestor_ids import populate_ancestor_ids
 from ..models import SQLLocation
 from .util import LocationHierarchyTestCase
 from corehq.apps.users.models import WebUser
@@ -94,6 +95,42 @@ class TestLocationQuerysetMethods(BaseTestLocationQuerysetMethods):
         pickle.dumps(locs)
 
 
+@override_settings(USE_LOCATION_ANCESTOR_IDS=True)
+class TestLocationQuerysetMethodsWithAncestorIds(TestLocationQuerysetMethods):
+    pass
+
+
+class TestLocationAncestorIds(BaseTestLocationQuerysetMethods):
+
+    def _get_ancestor_ids(self, name):
+        return SQLLocation.objects.get(domain=self.domain, name=name).ancestor_ids
+
+    def test_ancestor_ids_set_on_save(self):
+        self.assertEqual(self._get_ancestor_ids('Massachusetts'), [])
+        self.assertEqual(
+            self._get_ancestor_ids('Boston'),
+            [self.locations['Massachusetts'].id, self.locations['Suffolk'].id]
+        )
+
+    def test_move_updates_descendants(self):
+        suffolk = SQLLocation.objects.get(id=self.locations['Suffolk'].id)
+        suffolk.parent = self.locations['California']
+        suffolk.save()
+        self.assertEqual(self._get_ancestor_ids('Suffolk'), [self.locations['California'].id])
+        self.assertEqual(
+            self._get_ancestor_ids('Boston'),
+            [self.locations['California'].id, self.locations['Suffolk'].id]
+        )
+
+    def test_populate_ancestor_ids(self):
+        SQLLocation.objects.filter(domain=self.domain).update(ancestor_ids=None)
+        populate_ancestor_ids(self.domain)
+        self.assertEqual(
+            self._get_ancestor_ids('Cambridge'),
+            [self.locations['Massachusetts'].id, self.locations['Middlesex'].id]
+        )
+
+
 class TestLocationScopedQueryset(BaseTestLocationQuerysetMethods):
 
     @classmethod
@@ -2,8 +2,15 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 from corehq.apps.domain_migration_flags.api import any_migrations_in_progress
 from corehq.apps.sms.models import QueuedSMS
-from corehq.apps.sms.tasks import send_to_sms_queue
+from corehq.apps.sms.tasks import (
+    OUTBOUND_SMS_BATCH_SIZE,
+    get_outbound_sms_batch_key,
+    send_to_outbound_sms_batch_queue,
+    send_to_sms_queue,
+)
 from corehq.sql_db.util import handle_connection_failure
+from corehq.toggles import BATCH_OUTBOUND_SMS
+from collections import defaultdict
 from dimagi.utils.couch import get_redis_lock
 from dimagi.utils.logging import notify_exception
 from django.core.management.base import BaseCommand
@@ -38,17 +45,35 @@ class SMSEnqueuingOperation(BaseCommand):
 
     @handle_connection_failure()
     def create_tasks(self):
+        batches = defaultdict(list)
         for queued_sms in QueuedSMS.get_queued_sms():
             if queued_sms.domain and skip_domain(queued_sms.domain):
                 continue
 
-            self.enqueue(queued_sms)
+            batch_key = None
+            if queued_sms.domain and BATCH_OUTBOUND_SMS.enabled(queued_sms.domain):
+                batch_key = get_outbound_sms_batch_key(queued_sms)
+
+            if batch_key:
+                self.add_to_batch(batches, batch_key, queued_sms)
+            else:
+                self.enqueue(queued_sms)
+
+        for batch_key, queued_sms_pks in batches.items():
+            send_to_outbound_sms_batch_queue(batch_key, queued_sms_pks)
 
     def enqueue(self, queued_sms):
         enqueue_lock = self.get_enqueue_lock(queued_sms)
         if enqueue_lock.acquire(blocking=False):
             send_to_sms_queue(queued_sms)
 
+    def add_to_batch(self, batches, batch_key, queued_sms):
+        enqueue_lock = self.get_enqueue_lock(queued_sms)
+        if enqueue_lock.acquire(blocking=False):
+            batches[batch_key].append(queued_sms.pk)
+            if len(batches[batch_key]) >= OUTBOUND_SMS_BATCH_SIZE:
+                send_to_outbound_sms_batch_queue(batch_key, batches.pop(batch_key))
+
     def handle(self, **options):
         while True:
             try:
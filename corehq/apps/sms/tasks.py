@@ -21,7 +21,8 @@ from corehq.apps.sms.change_publishers import publish_sms_saved
 from corehq.apps.sms.mixin import (InvalidFormatException,
     PhoneNumberInUseException, apply_leniency)
 from corehq.apps.sms.models import (INCOMING, MigrationStatus, OUTGOING,
-    PhoneLoadBalancingMixin, PhoneNumber, QueuedSMS, SMS, DailyOutboundSMSLimitReached)
+    PhoneLoadBalancingMixin, PhoneNumber, QueuedSMS, SMS, DailyOutboundSMSLimitReached,
+    SQLMobileBackend)
 from corehq.apps.sms.util import is_contact_active
 from corehq.apps.smsbillables.exceptions import RetryBillableTaskException
 from corehq.apps.smsbillables.models import SmsBillable
@@ -32,11 +33,15 @@ from corehq.toggles import RETRY_SMS_INDEFINITELY, USE_SMS_WITH_INACTIVE_CONTACT
 from corehq.util.celery_utils import no_result_task
 from corehq.util.timezones.conversions import ServerTime
 from dimagi.utils.couch import CriticalSection, get_redis_client, get_redis_lock, release_lock
-from dimagi.utils.rate_limit import rate_limit
+from dimagi.utils.logging import notify_exception
+from dimagi.utils.rate_limit import rate_limit, TokenBucket
 
 
 MAX_TRIAL_SMS = 50
 
+# The maximum number of outbound SMS sent by one process_outbound_sms_batch task
+OUTBOUND_SMS_BATCH_SIZE = 100
+
 
 def remove_from_queue(queued_sms):
     with transaction.atomic():
@@ -202,10 +207,13 @@ def handle_outgoing(msg):
     if use_rate_limit:
         if use_load_balancing:
             redis_key = 'sms-rate-limit-backend-%s-phone-%s' % (backend.pk, orig_phone_number)
+            passes_rate_limit = rate_limit(redis_key, actions_allowed=sms_rate_limit, how_often=60)
         else:
-            redis_key = 'sms-rate-limit-backend-%s' % backend.pk
+            # Shared with process_outbound_sms_batch, so that the backend's
+            # limit holds across batched and unbatched sends
+            passes_rate_limit = get_outbound_sms_rate_limit_bucket(backend).take() == 1
 
-        if not rate_limit(redis_key, actions_allowed=sms_rate_limit, how_often=60):
+        if not passes_rate_limit:
             # Requeue the message and try it again shortly
             return True
 
@@ -215,6 +223,16 @@ def handle_outgoing(msg):
             # Requeue the message and try it again shortly
             return True
 
+    try:
+        send_outbound_sms(msg, backend, orig_phone_number=orig_phone_number)
+    finally:
+        if max_simultaneous_connections:
+            release_lock(connection_slot_lock, True)
+
+    return False
+
+
+def send_outbound_sms(msg, backend, orig_phone_number=None):
     if passes_trial_check(msg):
         result = send_message_via_backend(
             msg,
@@ -222,9 +240,6 @@ def handle_outgoing(msg):
             orig_phone_number=orig_phone_number
         )
 
-    if max_simultaneous_connections:
-        release_lock(connection_slot_lock, True)
-
     if msg.error:
         remove_from_queue(msg)
     else:
@@ -234,8 +249,6 @@ def handle_outgoing(msg):
         else:
             handle_unsuccessful_processing_attempt(msg)
 
-    return False
-
 
 def handle_incoming(msg):
     try:
@@ -415,6 +428,180 @@ def send_to_sms_queue(queued_sms):
     process_sms.apply_async([queued_sms.pk], **options)
 
 
+def get_outbound_sms_batch_key(queued_sms):
+    """
+    Outbound SMS are sent in batches of messages with the same domain,
+    backend and connection slot, so that each batch needs to hold a single
+    connection slot while it sends its messages one after the other.
+
+    Returns None if the message can't be sent in a batch.
+    """
+    if queued_sms.direction != OUTGOING:
+        return None
+
+    try:
+        backend = queued_sms.outbound_backend
+    except Exception:
+        # The backend is missing or misconfigured. process_sms handles
+        # the message like any other that fails to send.
+        return None
+
+    if isinstance(backend, PhoneLoadBalancingMixin):
+        # These are rate limited per originating phone number
+        return None
+
+    max_simultaneous_connections = backend.get_max_simultaneous_connections()
+    if max_simultaneous_connections:
+        slot = get_connection_slot_from_phone_number(queued_sms.phone_number, max_simultaneous_connections)
+    else:
+        slot = None
+
+    return (queued_sms.domain, backend.couch_id, slot)
+
+
+def send_to_outbound_sms_batch_queue(batch_key, queued_sms_pks, countdown=None):
+    domain, backend_id, slot = batch_key
+    options = {}
+    if domain in settings.CUSTOM_PROJECT_SMS_QUEUES:
+        options['queue'] = settings.CUSTOM_PROJECT_SMS_QUEUES[domain]
+    if countdown:
+        options['countdown'] = countdown
+
+    process_outbound_sms_batch.apply_async([batch_key, queued_sms_pks], **options)
+
+
+def get_outbound_sms_rate_limit_bucket(backend):
+    """
+    Returns a TokenBucket which allows the backend's rate limit of SMS
+    per minute, or None if the backend isn't rate limited.
+
+    Used for all outbound SMS through backends that don't load balance
+    between phone numbers, whether they are sent in batches or not.
+    """
+    sms_rate_limit = backend.get_sms_rate_limit()
+    if sms_rate_limit is None:
+        return None
+
+    return TokenBucket(
+        'sms-rate-limit-bucket-backend-%s' % backend.pk,
+        capacity=sms_rate_limit,
+        rate=sms_rate_limit / 60,
+    )
+
+
+def _outbound_sms_is_ready(msg, utcnow):
+    """
+    Runs the same checks as process_sms before an outbound message is sent,
+    removing the message from the queue or delaying it if it can't be sent now.
+
+    :return: The OutboundDailyCounter the message was counted against, or
+    None if the message should not be sent now
+    """
+    if message_is_stale(msg, utcnow):
+        msg.set_system_error(SMS.ERROR_MESSAGE_IS_STALE)
+        remove_from_queue(msg)
+        return None
+
+    if (
+        not isinstance(msg.processed, bool) or
+        msg.processed or
+        msg.error or
+        msg.datetime_to_process >= (utcnow + timedelta(seconds=10))
+    ):
+        return None
+
+    domain_object = Domain.get_by_name(msg.domain) if msg.domain else None
+    if domain_object and handle_domain_specific_delays(msg, domain_object, utcnow):
+        return None
+
+    if (
+        msg.domain and
+        msg.couch_recipient_doc_type and
+        msg.couch_recipient and
+        not is_contact_active(msg.domain, msg.couch_recipient_doc_type, msg.couch_recipient)
+    ):
+        msg.set_system_error(SMS.ERROR_CONTACT_IS_INACTIVE)
+        remove_from_queue(msg)
+        return None
+
+    outbound_counter = OutboundDailyCounter(domain_object)
+    if not outbound_counter.can_send_outbound_sms(msg):
+        return None
+
+    return outbound_counter
+
+
+@no_result_task(serializer='pickle', queue="sms_queue", acks_late=True)
+def process_outbound_sms_batch(batch_key, queued_sms_pks):
+    """
+    Sends a batch of outbound QueuedSMS with the same batch key (see
+    get_outbound_sms_batch_key) one after the other.
+
+    Instead of one task per message that requeues itself while the backend's
+    connection slot is taken or its rate limit is reached, the batch holds
+    the connection slot while it sends, takes tokens for the whole batch from
+    the backend's rate limit bucket at once, and is retried later with the
+    messages that couldn't be sent yet.
+    """
+    domain, backend_id, slot = batch_key
+    backend = SQLMobileBackend.load(backend_id, is_couch_id=True)
+
+    slot_lock = None
+    if slot is not None:
+        # Same key as get_connection_slot_lock, held for the whole batch
+        slot_lock = get_redis_lock(
+            'backend-%s-connection-slot-%s' % (backend.couch_id, slot),
+            timeout=settings.SMS_QUEUE_PROCESSING_LOCK_TIMEOUT * 60,
+            name="connection_slot",
+        )
+        if not slot_lock.acquire(blocking=False):
+            send_to_outbound_sms_batch_queue(batch_key, queued_sms_pks, countdown=10)
+            return
+
+    to_send = []
+    message_locks = []
+    try:
+        utcnow = get_utcnow()
+        for msg in QueuedSMS.objects.filter(pk__in=queued_sms_pks).order_by('datetime_to_process', 'pk'):
+            # Prevent more than one task from processing this SMS, just in case
+            # the message got enqueued twice.
+            message_lock = get_lock("sms-queue-processing-%s" % msg.pk)
+            if not message_lock.acquire(blocking=False):
+                continue
+            message_locks.append(message_lock)
+
+            outbound_counter = _outbound_sms_is_ready(msg, utcnow)
+            if outbound_counter:
+                to_send.append((msg, outbound_counter))
+
+        rate_limit_bucket = get_outbound_sms_rate_limit_bucket(backend)
+        if rate_limit_bucket:
+            allowed = rate_limit_bucket.take(len(to_send))
+            to_send, to_retry = to_send[:allowed], to_send[allowed:]
+            if to_retry:
+                for msg, outbound_counter in to_retry:
+                    outbound_counter.decrement()
+                retry_countdown = max(1, int(math.ceil(rate_limit_bucket.seconds_until(len(to_retry)))))
+                send_to_outbound_sms_batch_queue(
+                    batch_key,
+                    [msg.pk for msg, outbound_counter in to_retry],
+                    countdown=retry_countdown,
+                )
+
+        for msg, outbound_counter in to_send:
+            try:
+                send_outbound_sms(msg, backend)
+            except Exception:
+                # Don't let one message hold back the rest of the batch
+                notify_exception(None, message="Error sending outbound SMS %s in batch" % msg.pk)
+                outbound_counter.decrement()
+    finally:
+        for message_lock in message_locks:
+            release_lock(message_lock, True)
+        if slot_lock:
+            release_lock(slot_lock, True)
+
+
 @no_result_task(serializer='pickle', queue='background_queue', default_retry_delay=10 * 60,
                 max_retries=10, bind=True)
 def store_billable(self, msg):
@@ -3,7 +3,16 @@ from __future__ import unicode_literals
 from corehq.apps.domain.models import Domain
 from corehq.apps.sms.api import send_sms, incoming
 from corehq.apps.sms.models import SMS, QueuedSMS
-from corehq.apps.sms.tasks import process_sms, MAX_TRIAL_SMS, passes_trial_check
+from corehq.apps.sms.tasks import (
+    process_sms,
+    process_outbound_sms_batch,
+    get_outbound_sms_batch_key,
+    get_outbound_sms_rate_limit_bucket,
+    send_outbound_sms,
+    MAX_TRIAL_SMS,
+    OutboundDailyCounter,
+    passes_trial_check,
+)
 from corehq.apps.sms.tests.util import (
     BaseSMSTest,
     setup_default_sms_test_backend,
@@ -143,6 +152,69 @@ class QueueingTestCase(BaseSMSTest):
         self.assertEqual(process_sms_delay_mock.call_count, 0)
         self.assertBillableExists(couch_id)
 
+    @patch('corehq.messaging.smsbackends.test.models.SQLTestSMSBackend.get_sms_rate_limit', return_value=2)
+    @patch('corehq.apps.sms.tasks.send_to_outbound_sms_batch_queue')
+    def test_outgoing_batch(self, batch_queue_mock, rate_limit_mock, process_sms_delay_mock,
+            enqueue_directly_mock):
+        rate_limit_bucket = get_outbound_sms_rate_limit_bucket(self.backend)
+        get_redis_client().client.get_client().delete(rate_limit_bucket.key)
+        self.addCleanup(get_redis_client().client.get_client().delete, rate_limit_bucket.key)
+
+        for i in range(3):
+            send_sms(self.domain, None, '+999123', 'test outgoing %s' % i)
+        self.assertEqual(self.queued_sms_count, 3)
+
+        queued_sms = list(QueuedSMS.objects.order_by('datetime_to_process', 'pk'))
+        batch_key = get_outbound_sms_batch_key(queued_sms[0])
+        self.assertEqual(batch_key, (self.domain, self.backend.couch_id, None))
+
+        with patch_successful_send() as send_mock:
+            process_outbound_sms_batch(batch_key, [msg.pk for msg in queued_sms])
+
+        # the rate limit only allowed two messages to be sent
+        self.assertEqual(send_mock.call_count, 2)
+        self.assertEqual(self.reporting_sms_count, 2)
+        self.assertEqual(self.get_queued_sms().pk, queued_sms[2].pk)
+
+        self.assertEqual(batch_queue_mock.call_count, 1)
+        args, kwargs = batch_queue_mock.call_args
+        self.assertEqual(args, (batch_key, [queued_sms[2].pk]))
+        self.assertGreater(kwargs['countdown'], 0)
+        self.assertEqual(process_sms_delay_mock.call_count, 0)
+
+    @patch('corehq.apps.sms.tasks.notify_exception')
+    def test_outgoing_batch_continues_after_send_error(self, notify_exception_mock, process_sms_delay_mock,
+            enqueue_directly_mock):
+        for i in range(3):
+            send_sms(self.domain, None, '+999123', 'test outgoing %s' % i)
+        queued_sms = list(QueuedSMS.objects.order_by('datetime_to_process', 'pk'))
+        batch_key = get_outbound_sms_batch_key(queued_sms[0])
+
+        def fail_first_message(msg, backend):
+            if msg.pk == queued_sms[0].pk:
+                raise Exception("Failed")
+            send_outbound_sms(msg, backend)
+
+        with patch('corehq.apps.sms.tasks.send_outbound_sms', side_effect=fail_first_message), \
+                patch.object(OutboundDailyCounter, 'decrement', autospec=True) as decrement_mock, \
+                patch_successful_send() as send_mock:
+            process_outbound_sms_batch(batch_key, [msg.pk for msg in queued_sms])
+
+        self.assertEqual(send_mock.call_count, 2)
+        self.assertEqual(self.reporting_sms_count, 2)
+        self.assertEqual(self.get_queued_sms().pk, queued_sms[0].pk)
+        self.assertEqual(notify_exception_mock.call_count, 1)
+        # the failed message is no longer counted against the daily limit
+        self.assertEqual(decrement_mock.call_count, 1)
+
+    def test_outgoing_batch_key_without_backend(self, process_sms_delay_mock, enqueue_directly_mock):
+        send_sms(self.domain, None, '+999123', 'test outgoing')
+        queued_sms = self.get_queued_sms()
+        queued_sms.backend_id = 'deleted-backend'
+
+        # the message is left to process_sms instead of failing the enqueuing loop
+        self.assertIsNone(get_outbound_sms_batch_key(queued_sms))
+
     def test_outgoing_failure(self, process_sms_delay_mock, enqueue_directly_mock):
         timestamp = datetime(2016, 1, 1, 12, 0)
 
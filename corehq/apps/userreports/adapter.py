@@ -91,6 +91,15 @@ class IndicatorAdapter(object):
     def delete(self, doc):
         raise NotImplementedError
 
+    def doc_exists(self, doc):
+        raise NotImplementedError
+
+    def docs_exist(self, doc_ids):
+        """
+        Returns the subset of doc_ids that have rows in the data source
+        """
+        return {doc_id for doc_id in doc_ids if self.doc_exists({'_id': doc_id})}
+
     @property
     def run_asynchronous(self):
         return self.config.asynchronous
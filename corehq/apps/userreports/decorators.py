@@ -43,30 +43,63 @@ def catch_and_raise_exceptions(func):
     return _inner
 
 
-def ucr_context_cache(vary_on=()):
+def ucr_context_cache(vary_on=(), shared=False):
     """
     Decorator which caches calculations performed during a UCR EvaluationContext
     The decorated function or method must have a parameter called 'context'
     which will be used by this decorator to store the cache.
+
+    If ``shared`` is set the result is stored in the context's shared cache (if it
+    has one), so it must only depend on the ``vary_on`` arguments and the domain.
+    The decorated function gets ``is_cached`` and ``prime`` attributes which can be
+    used to check for and store values that were calculated elsewhere, e.g. in bulk:
+    ``fn.prime(value, *args, **kwargs)``.
     """
     def decorator(fn):
         assert 'context' in fn.__code__.co_varnames
         assert isinstance(vary_on, tuple)
 
-        @wraps(fn)
-        def _inner(*args, **kwargs):
+        def _get_cache_key(callargs):
             # shamelessly stolen from quickcache
-            callargs = inspect.getcallargs(fn, *args, **kwargs)
-            context = callargs['context']
             prefix = '{}.{}'.format(
                 fn.__name__[:40] + (fn.__name__[40:] and '..'),
                 hashlib.md5(inspect.getsource(fn).encode('utf-8')).hexdigest()[-8:]
             )
-            cache_key = (prefix,) + tuple(callargs[arg_name] for arg_name in vary_on)
+            return (prefix,) + tuple(callargs[arg_name] for arg_name in vary_on)
+
+        @wraps(fn)
+        def _inner(*args, **kwargs):
+            callargs = inspect.getcallargs(fn, *args, **kwargs)
+            context = callargs['context']
+            cache_key = _get_cache_key(callargs)
+            if shared:
+                if context.exists_in_shared_cache(cache_key):
+                    return context.get_shared_cache_value(cache_key)
+                res = fn(*args, **kwargs)
+                context.set_shared_cache_value(cache_key, res)
+                return res
             if context.exists_in_cache(cache_key):
                 return context.get_cache_value(cache_key)
             res = fn(*args, **kwargs)
             context.set_cache_value(cache_key, res)
             return res
+
+        def is_cached(*args, **kwargs):
+            callargs = inspect.getcallargs(fn, *args, **kwargs)
+            context = callargs['context']
+            if shared:
+                return context.exists_in_shared_cache(_get_cache_key(callargs))
+            return context.exists_in_cache(_get_cache_key(callargs))
+
+        def prime(value, *args, **kwargs):
+            callargs = inspect.getcallargs(fn, *args, **kwargs)
+            context = callargs['context']
+            if shared:
+                context.set_shared_cache_value(_get_cache_key(callargs), value)
+            else:
+                context.set_cache_value(_get_cache_key(callargs), value)
+
+        _inner.is_cached = is_cached
+        _inner.prime = prime
         return _inner
     return decorator
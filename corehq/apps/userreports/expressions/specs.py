@@ -23,6 +23,7 @@ from corehq.apps.userreports.specs import TypeProperty, EvaluationContext
 from corehq.apps.userreports.util import add_tabbed_text
 from corehq.form_processor.interfaces.processor import FormProcessorInterface
 from corehq.util.python_compatibility import soft_assert_type_text
+from couchforms.models import all_known_formlike_doc_types
 from dimagi.ext.jsonobject import JsonObject, StringProperty, ListProperty, DictProperty
 from pillowtop.dao.exceptions import DocumentNotFoundError
 from .utils import eval_statements
@@ -273,7 +274,7 @@ class RelatedDocExpressionSpec(JsonObject):
             return self.get_value(doc_id, context)
 
     @staticmethod
-    @ucr_context_cache(vary_on=('related_doc_type', 'doc_id',))
+    @ucr_context_cache(vary_on=('related_doc_type', 'doc_id',), shared=True)
     def _get_document(related_doc_type, doc_id, context):
         document_store = get_document_store_for_doc_type(context.root_doc['domain'], related_doc_type)
         try:
@@ -288,7 +289,39 @@ class RelatedDocExpressionSpec(JsonObject):
         assert context.root_doc['domain']
         doc = self._get_document(self.related_doc_type, doc_id, context)
         # explicitly use a new evaluation context since this is a new document
-        return self._value_expression(doc, EvaluationContext(doc, 0))
+        return self._value_expression(doc, EvaluationContext(doc, 0, shared_cache=context.shared_cache))
+
+    def prefetch(self, docs, shared_cache):
+        """
+        Fetch the related documents of ``docs`` in bulk and store them in ``shared_cache``
+        so that evaluating this expression for each doc does not need a query.
+        All of the docs must be from the same domain.
+        """
+        if not docs or self.related_doc_type in all_known_formlike_doc_types():
+            # get_document returns forms with their attachments, which
+            # iter_documents leaves out, so forms are not prefetched
+            return
+        context = EvaluationContext(docs[0], 0, shared_cache=shared_cache)
+        domain = context.root_doc['domain']
+        doc_ids = set()
+        for doc in docs:
+            doc_id = self._doc_id_expression(doc, EvaluationContext(doc, 0, shared_cache=shared_cache))
+            if (doc_id and isinstance(doc_id, six.string_types)
+                    and not self._get_document.is_cached(self.related_doc_type, doc_id, context)):
+                doc_ids.add(doc_id)
+        if not doc_ids:
+            return
+
+        document_store = get_document_store_for_doc_type(domain, self.related_doc_type)
+        for doc in document_store.iter_documents(list(doc_ids)):
+            doc_id = doc['_id']
+            doc_ids.discard(doc_id)
+            if doc.get('domain') != domain:
+                doc = None
+            self._get_document.prime(doc, self.related_doc_type, doc_id, context)
+        for doc_id in doc_ids:
+            # missing documents are cached as None, the same as a failed lookup
+            self._get_document.prime(None, self.related_doc_type, doc_id, context)
 
     def __str__(self):
         return "{}[{}]/{}".format(self.related_doc_type,
@@ -442,11 +475,41 @@ class SubcasesExpressionSpec(JsonObject):
         assert context.root_doc['domain']
         return self._get_subcases(case_id, context)
 
-    @ucr_context_cache(vary_on=('case_id',))
-    def _get_subcases(self, case_id, context):
+    @staticmethod
+    @ucr_context_cache(vary_on=('case_id',), shared=True)
+    def _get_subcases(case_id, context):
         domain = context.root_doc['domain']
         return [c.to_json() for c in CaseAccessors(domain).get_reverse_indexed_cases([case_id])]
 
+    def prefetch(self, docs, shared_cache):
+        """
+        Fetch the subcases of the cases referenced by ``docs`` in a single query
+        and store them in ``shared_cache``. All of the docs must be from the same domain.
+        """
+        if not docs or self.related_doc_type in all_known_formlike_doc_types():
+            # get_document returns forms with their attachments, which
+            # iter_documents leaves out, so forms are not prefetched
+            return
+        context = EvaluationContext(docs[0], 0, shared_cache=shared_cache)
+        domain = context.root_doc['domain']
+        case_ids = set()
+        for doc in docs:
+            case_id = self._case_id_expression(doc, EvaluationContext(doc, 0, shared_cache=shared_cache))
+            if (case_id and isinstance(case_id, six.string_types)
+                    and not self._get_subcases.is_cached(case_id, context)):
+                case_ids.add(case_id)
+        if not case_ids:
+            return
+
+        subcases_by_case_id = {case_id: [] for case_id in case_ids}
+        for subcase in CaseAccessors(domain).get_reverse_indexed_cases(list(case_ids)):
+            subcase_json = subcase.to_json()
+            referenced_ids = {index.referenced_id for index in subcase.indices}
+            for case_id in referenced_ids & case_ids:
+                subcases_by_case_id[case_id].append(subcase_json)
+        for case_id, subcases in six.iteritems(subcases_by_case_id):
+            self._get_subcases.prime(subcases, case_id, context)
+
     def __str__(self):
         return "get subcases for {}".format(str(self._case_id_expression))
 
@@ -463,18 +526,23 @@ class _GroupsExpressionSpec(JsonObject):
             return []
 
         assert context.root_doc['domain']
-        return self._get_groups(user_id, context)
+        return self._get_groups(self.type, user_id, context)
 
-    @ucr_context_cache(vary_on=('user_id',))
-    def _get_groups(self, user_id, context):
-        domain = context.root_doc['domain']
-        user = CommCareUser.get_by_user_id(user_id, domain)
+    @ucr_context_cache(vary_on=('group_type', 'user_id',), shared=True)
+    def _get_groups(self, group_type, user_id, context):
+        user = self._get_user(user_id, context)
         if not user:
             return []
 
         groups = self._get_groups_from_user(user)
         return [g.to_json() for g in groups]
 
+    @staticmethod
+    @ucr_context_cache(vary_on=('user_id',), shared=True)
+    def _get_user(user_id, context):
+        domain = context.root_doc['domain']
+        return CommCareUser.get_by_user_id(user_id, domain)
+
     def _get_groups_from_user(self, user):
         raise NotImplementedError
 
@@ -54,6 +54,7 @@ from corehq.apps.userreports.exceptions import (
     StaticDataSourceConfigurationNotFoundError,
     InvalidDataSourceType, DuplicateColumnIdError)
 from corehq.apps.userreports.expressions.factory import ExpressionFactory
+from corehq.apps.userreports.expressions.specs import NamedExpressionSpec
 from corehq.apps.userreports.filters.factory import FilterFactory
 from corehq.apps.userreports.indicators.factory import IndicatorFactory
 from corehq.apps.userreports.indicators import CompoundIndicator
@@ -106,6 +107,9 @@ class SQLSettings(DocumentSchema):
     partition_config = SchemaListProperty(SQLPartition)
     citus_config = SchemaProperty(CitusConfig)
     primary_key = ListProperty()
+    # Save rows with INSERT ... ON CONFLICT on the primary key instead of deleting
+    # and re-inserting all rows of a doc. Ignored for partitioned tables.
+    upsert_rows = BooleanProperty(default=False)
 
 
 class DataSourceBuildInformation(DocumentSchema):
@@ -351,6 +355,28 @@ class DataSourceConfiguration(CachedCouchDocumentMixin, Document, AbstractUCRDat
             return ExpressionFactory.from_spec(self.base_item_expression, context=self.get_factory_context())
         return None
 
+    @property
+    @memoized
+    def prefetch_expressions(self):
+        """
+        The expressions of the configured indicators that can fetch their related
+        documents for a chunk of root documents at once (i.e. that have a ``prefetch`` method).
+        Only expressions that are evaluated against the root document are included.
+        """
+        if self.base_item_expression:
+            return []
+
+        expressions = []
+        for indicator in self.configured_indicators:
+            if indicator.get('type') != 'expression':
+                continue
+            expression = ExpressionFactory.from_spec(indicator['expression'], self.get_factory_context())
+            while isinstance(expression, NamedExpressionSpec):
+                expression = self.named_expression_objects[expression.name]
+            if hasattr(expression, 'prefetch'):
+                expressions.append(expression)
+        return expressions
+
     @memoized
     def get_columns(self):
         return self.indicators.get_columns()
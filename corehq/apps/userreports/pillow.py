@@ -10,17 +10,18 @@ import six
 
 from corehq.apps.change_feed.consumer.feed import KafkaChangeFeed, KafkaCheckpointEventHandler
 from corehq.apps.change_feed.topics import LOCATION as LOCATION_TOPIC
-from corehq.apps.userreports.const import KAFKA_TOPICS
+from corehq.apps.userreports.const import KAFKA_TOPICS, FILTER_INTERPOLATION_DOC_TYPES
 from corehq.apps.userreports.data_source_providers import DynamicDataSourceProvider, StaticDataSourceProvider
 from corehq.apps.userreports.exceptions import (
     BadSpecError, TableRebuildError, StaleRebuildError, UserReportsWarning
 )
 from corehq.apps.userreports.models import AsyncIndicator
 from corehq.apps.userreports.rebuild import get_table_diffs, get_tables_rebuild_migrate, migrate_tables
-from corehq.apps.userreports.specs import EvaluationContext
+from corehq.apps.userreports.specs import EvaluationContext, SharedEvaluationCache
 from corehq.apps.userreports.sql import metadata
 from corehq.apps.userreports.tasks import rebuild_indicators
 from corehq.apps.userreports.util import get_indicator_adapter
+from corehq.pillows.utils import get_deleted_doc_types
 from corehq.sql_db.connections import connection_manager
 from corehq.util.datadog.gauges import datadog_histogram
 from corehq.util.soft_assert import soft_assert
@@ -37,6 +38,10 @@ from pillowtop.utils import ensure_matched_revisions, ensure_document_exists
 
 REBUILD_CHECK_INTERVAL = 60 * 60  # in seconds
 LONG_UCR_LOGGING_THRESHOLD = 0.5
+# max number of related docs and other expression results shared between the docs of a chunk
+CHUNK_EVALUATION_CACHE_SIZE = 5000
+# filter properties from FILTER_INTERPOLATION_DOC_TYPES whose value can change over the life of a doc
+MUTABLE_FILTER_PROPERTIES = {'type'}
 
 
 def time_ucr_process_change(method):
@@ -67,6 +72,47 @@ def _filter_by_hash(configs, ucr_division):
     return filtered_configs
 
 
+class DataSourceFilterIndex(object):
+    """
+    Index of a domain's adapters by the documents their data source filters apply to.
+
+    A data source's filter only matches documents of its ``referenced_doc_type`` and
+    its deleted filter only matches the deleted versions of that doc type, so adapters
+    for other doc types never need to look at a document. When the configured filter
+    restricts the case type or xmlns (see ``get_case_type_or_xmlns_filter``) the filter
+    is only evaluated for documents with one of those values. Since a case's type can
+    change, adapters ruled out by case type still check for stale rows.
+    """
+
+    def __init__(self, adapters):
+        self._entries_by_doc_type = defaultdict(list)
+        for adapter in adapters:
+            config = adapter.config
+            property_name = FILTER_INTERPOLATION_DOC_TYPES.get(config.referenced_doc_type)
+            values = config.get_case_type_or_xmlns_filter()
+            values = None if None in values else set(values)
+            self._entries_by_doc_type[config.referenced_doc_type].append(
+                (adapter, property_name, values, property_name in MUTABLE_FILTER_PROPERTIES)
+            )
+            for doc_type in get_deleted_doc_types(config.referenced_doc_type):
+                self._entries_by_doc_type[doc_type].append((adapter, None, set(), True))
+
+    def get_adapters(self, doc):
+        """
+        :returns: list of ``(adapter, may_match)`` tuples for the adapters that need to
+            process ``doc``. When ``may_match`` is False the data source filter is known
+            not to match, but the adapter may still have rows for the doc to delete.
+        """
+        adapters = []
+        entries = self._entries_by_doc_type.get(doc.get('doc_type'), [])
+        for adapter, property_name, values, check_excluded in entries:
+            if values is None or doc.get(property_name) in values:
+                adapters.append((adapter, True))
+            elif check_excluded:
+                adapters.append((adapter, False))
+        return adapters
+
+
 class ConfigurableReportTableManagerMixin(object):
 
     def __init__(self, data_source_providers, ucr_division=None,
@@ -127,6 +173,8 @@ class ConfigurableReportTableManagerMixin(object):
             pillow_logging.warning("UCR pillow has no configs to process")
 
         self.table_adapters_by_domain = defaultdict(list)
+        # DataSourceFilterIndex of each domain's adapters, built when first needed
+        self.adapter_indexes_by_domain = {}
 
         for config in configs:
             self.table_adapters_by_domain[config.domain].append(
@@ -198,6 +246,12 @@ class ConfigurableReportPillowProcessor(ConfigurableReportTableManagerMixin, Bul
         except UserReportsWarning:
             # remove it until the next bootstrap call
             self.table_adapters_by_domain[domain].remove(table)
+            self.adapter_indexes_by_domain.pop(domain, None)
+
+    def _get_adapter_index(self, domain):
+        if domain not in self.adapter_indexes_by_domain:
+            self.adapter_indexes_by_domain[domain] = DataSourceFilterIndex(self.table_adapters_by_domain[domain])
+        return self.adapter_indexes_by_domain[domain]
 
     def process_changes_chunk(self, changes):
         """
@@ -226,16 +280,27 @@ class ConfigurableReportPillowProcessor(ConfigurableReportTableManagerMixin, Bul
         adapters = list(self.table_adapters_by_domain[domain])
         changes_by_id = {change.id: change for change in changes_chunk}
         to_delete_by_adapter = defaultdict(list)
+        to_check_by_adapter = defaultdict(list)
         rows_to_save_by_adapter = defaultdict(list)
         async_configs_by_doc_id = defaultdict(list)
         to_update = {change for change in changes_chunk if not change.deleted}
         retry_changes, docs = self.get_docs_for_changes(to_update, domain)
         change_exceptions = []
+        adapter_index = self._get_adapter_index(domain)
+        adapter_matches_by_doc_id = {
+            doc['_id']: [
+                (adapter, may_match and adapter.config.filter(doc))
+                for adapter, may_match in adapter_index.get_adapters(doc)
+            ]
+            for doc in docs
+        }
+        shared_cache = SharedEvaluationCache(CHUNK_EVALUATION_CACHE_SIZE)
+        self._prefetch_related_docs(docs, adapter_matches_by_doc_id, shared_cache)
 
         for doc in docs:
-            eval_context = EvaluationContext(doc)
-            for adapter in adapters:
-                if adapter.config.filter(doc):
+            eval_context = EvaluationContext(doc, shared_cache=shared_cache)
+            for adapter, matches in adapter_matches_by_doc_id[doc['_id']]:
+                if matches:
                     if adapter.run_asynchronous:
                         async_configs_by_doc_id[doc['_id']].append(adapter.config._id)
                     else:
@@ -244,8 +309,18 @@ class ConfigurableReportPillowProcessor(ConfigurableReportTableManagerMixin, Bul
                         except Exception as e:
                             change_exceptions.append((changes_by_id[doc["_id"]], e))
                         eval_context.reset_iteration()
-                elif adapter.config.deleted_filter(doc) or adapter.doc_exists(doc):
+                elif adapter.config.deleted_filter(doc):
                     to_delete_by_adapter[adapter].append(doc['_id'])
+                else:
+                    # rows may be left over from when the doc did match the filter
+                    to_check_by_adapter[adapter].append(doc['_id'])
+
+        # bulk check for stale rows by adapter
+        for adapter, doc_ids in six.iteritems(to_check_by_adapter):
+            try:
+                to_delete_by_adapter[adapter].extend(adapter.docs_exist(doc_ids))
+            except Exception:
+                retry_changes.update([changes_by_id[doc_id] for doc_id in doc_ids])
 
         # bulk delete by adapter
         to_delete = [c.id for c in changes_chunk if c.deleted]
@@ -270,6 +345,28 @@ class ConfigurableReportPillowProcessor(ConfigurableReportTableManagerMixin, Bul
 
         return retry_changes, change_exceptions
 
+    @staticmethod
+    def _prefetch_related_docs(docs, adapter_matches_by_doc_id, shared_cache):
+        """
+        Fetch the documents referenced by the data sources' related doc expressions
+        for the whole chunk in bulk. Any failure here is ignored since the expressions
+        will fetch whatever is missing from the cache themselves.
+
+        :param adapter_matches_by_doc_id: ``{doc_id: [(adapter, matches_filter), ...]}``
+        """
+        docs_by_adapter = defaultdict(list)
+        for doc in docs:
+            for adapter, matches in adapter_matches_by_doc_id[doc['_id']]:
+                if matches and not adapter.run_asynchronous and adapter.config.prefetch_expressions:
+                    docs_by_adapter[adapter].append(doc)
+
+        for adapter, matching_docs in six.iteritems(docs_by_adapter):
+            try:
+                for expression in adapter.config.prefetch_expressions:
+                    expression.prefetch(matching_docs, shared_cache)
+            except Exception:
+                pillow_logging.exception("Error prefetching related docs for %s", adapter.config._id)
+
     @staticmethod
     def get_docs_for_changes(changes, domain):
         # break up by doctype
@@ -328,10 +425,8 @@ class ConfigurableReportPillowProcessor(ConfigurableReportTableManagerMixin, Bul
 
         with TimingContext() as timer:
             eval_context = EvaluationContext(doc)
-            # make copy to avoid modifying list during iteration
-            adapters = list(self.table_adapters_by_domain[domain])
-            for table in adapters:
-                if table.config.filter(doc):
+            for table, may_match in self._get_adapter_index(domain).get_adapters(doc):
+                if may_match and table.config.filter(doc):
                     if table.run_asynchronous:
                         async_tables.append(table.config._id)
                     else:
@@ -1,6 +1,6 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
 from dimagi.ext.jsonobject import StringProperty
 from datetime import datetime
 
@@ -21,18 +21,53 @@ class FactoryContext(namedtuple('FactoryContext', ('named_expressions', 'named_f
         return FactoryContext({}, {})
 
 
+class SharedEvaluationCache(object):
+    """
+    A bounded least recently used cache that is shared between the evaluation
+    contexts of all the documents in a chunk, so that related documents are only
+    fetched once per chunk rather than once per document.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._values = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def __len__(self):
+        return len(self._values)
+
+    def get(self, key, default=None):
+        if key not in self._values:
+            return default
+        value = self._values.pop(key)
+        self._values[key] = value
+        return value
+
+    def set(self, key, value):
+        self._values.pop(key, None)
+        self._values[key] = value
+        while len(self._values) > self.max_size:
+            self._values.popitem(last=False)
+
+
 class EvaluationContext(object):
     """
     An evaluation context. Necessary for repeats to pass both the row of the repeat as well
     as the root document and the iteration number.
+
+    Values that do not depend on the root document (e.g. related documents) can
+    also be stored in an optional ``SharedEvaluationCache`` that outlives the context.
     """
 
-    def __init__(self, root_doc, iteration=0):
+    def __init__(self, root_doc, iteration=0, shared_cache=None):
         self.root_doc = root_doc
         self.iteration = iteration
         self.inserted_timestamp = datetime.utcnow()
         self.cache = {}
         self.iteration_cache = {}
+        self.shared_cache = shared_cache
 
     def exists_in_cache(self, key):
         return key in self.cache or key in self.iteration_cache
@@ -52,6 +87,22 @@ class EvaluationContext(object):
     def set_iteration_cache_value(self, key, value):
         self.iteration_cache[key] = value
 
+    def exists_in_shared_cache(self, key):
+        if self.shared_cache is None:
+            return self.exists_in_cache(key)
+        return key in self.shared_cache
+
+    def get_shared_cache_value(self, key, default=None):
+        if self.shared_cache is None:
+            return self.get_cache_value(key, default)
+        return self.shared_cache.get(key, default)
+
+    def set_shared_cache_value(self, key, value):
+        if self.shared_cache is None:
+            self.set_cache_value(key, value)
+        else:
+            self.shared_cache.set(key, value)
+
     def increment_iteration(self):
         self.iteration_cache = {}
         self.iteration += 1
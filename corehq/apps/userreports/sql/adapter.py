@@ -3,12 +3,14 @@ from __future__ import unicode_literals
 
 import hashlib
 import logging
+from collections import OrderedDict
 
 import six
 import sqlalchemy
 from architect import install
 from django.utils.translation import ugettext as _
 from memoized import memoized
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import IntegrityError, ProgrammingError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.schema import Index, PrimaryKeyConstraint
@@ -192,6 +194,13 @@ class IndicatorSqlAdapter(IndicatorAdapter):
             {i.column.database_column_name.decode('utf-8'): i.value for i in row}
             for row in rows
         ]
+        sql_settings = self.config.sql_settings
+        if sql_settings.upsert_rows and not sql_settings.partition_config:
+            self._upsert_rows(formatted_rows)
+        else:
+            self._replace_rows(formatted_rows)
+
+    def _replace_rows(self, formatted_rows):
         doc_ids = set(row['doc_id'] for row in formatted_rows)
         table = self.get_table()
         delete = table.delete(table.c.doc_id.in_(doc_ids))
@@ -208,6 +217,45 @@ class IndicatorSqlAdapter(IndicatorAdapter):
             session.execute(delete)
             session.execute(insert)
 
+    def _upsert_rows(self, formatted_rows):
+        """
+        Inserts rows, only updating existing rows with the same primary key if
+        their values changed, and deletes the rows of the same docs that are no
+        longer generated (e.g. repeat iterations that were removed).
+        """
+        table = self.get_table()
+        pk_columns = self.config.pk_columns
+        # a row can only be upserted once per statement, so keep the last one for each key
+        rows_by_pk = OrderedDict(
+            (tuple(row[column] for column in pk_columns), row)
+            for row in formatted_rows
+        )
+        update_columns = [column.name for column in table.columns if column.name not in pk_columns]
+        # inserted_at changes on every save, so it doesn't count as a change to the row
+        compare_columns = [column for column in update_columns if column != 'inserted_at']
+
+        insert = postgresql.insert(table).values(list(rows_by_pk.values()))
+        if compare_columns:
+            insert = insert.on_conflict_do_update(
+                index_elements=pk_columns,
+                set_={column: insert.excluded[column] for column in update_columns},
+                where=sqlalchemy.tuple_(*[table.c[column] for column in compare_columns]).is_distinct_from(
+                    sqlalchemy.tuple_(*[insert.excluded[column] for column in compare_columns])
+                ),
+            )
+        else:
+            insert = insert.on_conflict_do_nothing(index_elements=pk_columns)
+
+        with self.session_helper.session_context() as session:
+            if list(pk_columns) != ['doc_id']:
+                doc_ids = set(row['doc_id'] for row in formatted_rows)
+                session.execute(table.delete().where(
+                    table.c.doc_id.in_(doc_ids)
+                ).where(
+                    sqlalchemy.tuple_(*[table.c[column] for column in pk_columns]).notin_(list(rows_by_pk))
+                ))
+            session.execute(insert)
+
     def bulk_save(self, docs):
         rows = []
         for doc in docs:
@@ -231,6 +279,14 @@ class IndicatorSqlAdapter(IndicatorAdapter):
             query = session.query(self.get_table()).filter_by(doc_id=doc['_id'])
             return session.query(query.exists()).scalar()
 
+    def docs_exist(self, doc_ids):
+        if not doc_ids:
+            return set()
+        table = self.get_table()
+        with self.session_helper.session_context() as session:
+            query = session.query(table.c.doc_id).filter(table.c.doc_id.in_(doc_ids)).distinct()
+            return {doc_id for doc_id, in query}
+
 
 class ErrorRaisingIndicatorSqlAdapter(IndicatorSqlAdapter):
 
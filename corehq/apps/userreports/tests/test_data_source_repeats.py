@@ -110,6 +110,31 @@ class RepeatDataSourceBuildTest(RepeatDataSourceTestMixin, TestCase):
             "The repeat data saved in the data source table did not match the expected data!"
         )
 
+    def test_upsert_rows(self):
+        self.config.sql_settings.upsert_rows = True
+        adapter = get_indicator_adapter(self.config)
+        adapter.rebuild_table()
+        self.addCleanup(adapter.drop_table)
+
+        now = datetime.datetime.now()
+        one_hour = datetime.timedelta(hours=1)
+        logs = [
+            {"start_time": now, "end_time": now + one_hour, "person": "al"},
+            {"start_time": now + one_hour, "end_time": now + (one_hour * 2), "person": "chris"},
+            {"start_time": now + (one_hour * 2), "end_time": now + (one_hour * 3), "person": "katie"},
+        ]
+        adapter.save(_test_doc(form={'time_logs': logs}))
+
+        # change one repeat iteration and remove another
+        logs = [logs[0], dict(logs[1], person="sam")]
+        adapter.save(_test_doc(form={'time_logs': logs}))
+
+        rows = adapter.get_query_object()
+        self.assertItemsEqual(
+            [(r.repeat_iteration, r.person) for r in rows],
+            [(0, "al"), (1, "sam")],
+        )
+
 
 def _test_doc(**extras):
     test_doc = {
@@ -20,7 +20,7 @@ from corehq.apps.userreports.expressions.specs import (
     PropertyPathGetterSpec,
 )
 from corehq.apps.userreports.expressions.specs import eval_statements
-from corehq.apps.userreports.specs import EvaluationContext, FactoryContext
+from corehq.apps.userreports.specs import EvaluationContext, FactoryContext, SharedEvaluationCache
 from corehq.apps.users.models import CommCareUser
 from corehq.apps.groups.models import Group
 from corehq.form_processor.interfaces.dbaccessors import FormAccessors
@@ -919,6 +919,18 @@ class RelatedDocExpressionTest(SimpleTestCase):
         self.database.mock_docs.clear()
         self.assertEqual('foo', self.expression(my_doc, context))
 
+    def test_shared_caching(self):
+        self.test_simple_lookup()
+
+        shared_cache = SharedEvaluationCache(10)
+        my_doc = self.database.get('my-id')
+        self.assertEqual('foo', self.expression(my_doc, EvaluationContext(my_doc, 0, shared_cache=shared_cache)))
+
+        self.database.mock_docs.clear()
+        other_doc = {'domain': 'test-domain', 'parent_id': 'related-id'}
+        context = EvaluationContext(other_doc, 0, shared_cache=shared_cache)
+        self.assertEqual('foo', self.expression(other_doc, context))
+
 
 class RelatedDocExpressionDbTest(TestCase):
     domain = 'related-doc-db-test-domain'
@@ -946,6 +958,28 @@ class RelatedDocExpressionDbTest(TestCase):
         doc = self._get_doc(user_id)
         self.assertEqual(user_id, expression(doc, EvaluationContext(doc, 0)))
 
+    @run_with_all_backends
+    def test_prefetch(self):
+        case_id = uuid.uuid4().hex
+        create_and_save_a_case(domain=self.domain, case_id=case_id, case_name='related doc test case')
+        expression = self._get_expression('CommCareCase')
+        docs = [self._get_doc(case_id), self._get_doc('missing-case-id'), self._get_doc(case_id)]
+        shared_cache = SharedEvaluationCache(10)
+        expression.prefetch(docs, shared_cache)
+        self.assertEqual(len(shared_cache), 2)
+
+        context = EvaluationContext(docs[0], 0, shared_cache=shared_cache)
+        self.assertTrue(expression._get_document.is_cached('CommCareCase', case_id, context))
+        self.assertEqual(case_id, expression(docs[0], context))
+        self.assertIsNone(expression(docs[1], EvaluationContext(docs[1], 0, shared_cache=shared_cache)))
+
+    def test_prefetch_skips_forms(self):
+        # forms are looked up with their attachments, which a bulk fetch leaves out
+        expression = self._get_expression('XFormInstance')
+        shared_cache = SharedEvaluationCache(10)
+        expression.prefetch([self._get_doc(uuid.uuid4().hex)], shared_cache)
+        self.assertEqual(len(shared_cache), 0)
+
     @staticmethod
     def _get_expression(doc_type):
         return ExpressionFactory.from_spec({
@@ -1450,6 +1484,36 @@ class TestEvaluationContext(SimpleTestCase):
         fn_that_should_be_cached(3, context)
         self.assertEqual(counter.call_count, 3)
 
+    def test_shared_cached_function(self):
+        counter = MagicMock()
+
+        @ucr_context_cache(vary_on=('arg1',), shared=True)
+        def fn_that_should_be_cached(arg1, context):
+            counter()
+
+        shared_cache = SharedEvaluationCache(10)
+        fn_that_should_be_cached(2, EvaluationContext({}, shared_cache=shared_cache))
+        self.assertEqual(counter.call_count, 1)
+        fn_that_should_be_cached(2, EvaluationContext({}, shared_cache=shared_cache))
+        self.assertEqual(counter.call_count, 1)
+        fn_that_should_be_cached(2, EvaluationContext({}))
+        self.assertEqual(counter.call_count, 2)
+
+        fn_that_should_be_cached.prime('primed', 3, EvaluationContext({}, shared_cache=shared_cache))
+        self.assertTrue(fn_that_should_be_cached.is_cached(3, EvaluationContext({}, shared_cache=shared_cache)))
+
+    def test_shared_cache_is_bounded(self):
+        shared_cache = SharedEvaluationCache(2)
+        shared_cache.set('k1', 'v1')
+        shared_cache.set('k2', 'v2')
+        self.assertEqual(shared_cache.get('k1'), 'v1')
+        shared_cache.set('k3', 'v3')
+        # k2 was the least recently used
+        self.assertNotIn('k2', shared_cache)
+        self.assertEqual(shared_cache.get('k1'), 'v1')
+        self.assertEqual(shared_cache.get('k3'), 'v3')
+        self.assertEqual(len(shared_cache), 2)
+
 
 class SplitStringExpressionTest(SimpleTestCase):
 
@@ -21,7 +21,8 @@ from corehq.apps.userreports.exceptions import StaleRebuildError
 from corehq.apps.userreports.models import DataSourceConfiguration, AsyncIndicator
 from corehq.apps.userreports.pillow import REBUILD_CHECK_INTERVAL, \
     ConfigurableReportTableManagerMixin, \
-    ConfigurableReportPillowProcessor
+    ConfigurableReportPillowProcessor, \
+    DataSourceFilterIndex
 from corehq.apps.userreports.tasks import rebuild_indicators, queue_async_indicators
 from corehq.apps.userreports.tests.utils import get_sample_data_source, get_sample_doc_and_indicators, \
     doc_to_change, get_data_source_with_related_doc_type
@@ -92,6 +93,13 @@ class ChunkedUCRProcessorTest(TestCase):
         self.assertFalse(processor_patch.called)
         self._delete_cases(cases)
 
+    def test_docs_exist(self):
+        cases = self._create_and_process_changes()
+        case_ids = {case.case_id for case in cases}
+        self.assertEqual(self.adapter.docs_exist(list(case_ids) + ['missing-id']), case_ids)
+        self.assertEqual(self.adapter.docs_exist([]), set())
+        self._delete_cases(cases)
+
     @mock.patch('corehq.apps.userreports.specs.datetime')
     def _create_cases(self, datetime_mock, docs=[]):
         datetime_mock.utcnow.return_value = self.fake_time_now
@@ -687,6 +695,70 @@ class IndicatorConfigFilterTest(SimpleTestCase):
             self.assertTrue(self.config.deleted_filter(document), 'Failing dog: %s' % document)
 
 
+class DataSourceFilterIndexTest(SimpleTestCase):
+
+    def setUp(self):
+        self.case_config = get_sample_data_source()
+        self.form_config = DataSourceConfiguration(
+            domain='user-reports',
+            referenced_doc_type='XFormInstance',
+            table_id='forms',
+            configured_filter={
+                "type": "boolean_expression",
+                "expression": {"type": "property_name", "property_name": "xmlns"},
+                "operator": "in",
+                "property_value": ["xmlns-a", "xmlns-b"],
+            },
+            configured_indicators=[],
+        )
+        self.unfiltered_config = DataSourceConfiguration(
+            domain='user-reports',
+            referenced_doc_type='CommCareCase',
+            table_id='all_cases',
+            configured_indicators=[],
+        )
+        self.case_adapter = mock.MagicMock(config=self.case_config)
+        self.form_adapter = mock.MagicMock(config=self.form_config)
+        self.unfiltered_adapter = mock.MagicMock(config=self.unfiltered_config)
+        self.index = DataSourceFilterIndex([self.case_adapter, self.form_adapter, self.unfiltered_adapter])
+
+    def test_matching_case(self):
+        self.assertEqual(
+            self.index.get_adapters(dict(doc_type='CommCareCase', domain='user-reports', type='ticket')),
+            [(self.case_adapter, True), (self.unfiltered_adapter, True)]
+        )
+
+    def test_other_case_type(self):
+        # the case type may have changed, so the adapter still needs to check for stale rows
+        self.assertEqual(
+            self.index.get_adapters(dict(doc_type='CommCareCase', domain='user-reports', type='other')),
+            [(self.case_adapter, False), (self.unfiltered_adapter, True)]
+        )
+
+    def test_deleted_case(self):
+        self.assertEqual(
+            self.index.get_adapters(dict(doc_type='CommCareCase-Deleted', domain='user-reports', type='ticket')),
+            [(self.case_adapter, False), (self.unfiltered_adapter, False)]
+        )
+
+    def test_forms(self):
+        self.assertEqual(
+            self.index.get_adapters(dict(doc_type='XFormInstance', domain='user-reports', xmlns='xmlns-b')),
+            [(self.form_adapter, True)]
+        )
+        self.assertEqual(
+            self.index.get_adapters(dict(doc_type='XFormInstance', domain='user-reports', xmlns='xmlns-c')),
+            []
+        )
+        self.assertEqual(
+            self.index.get_adapters(dict(doc_type='XFormArchived', domain='user-reports', xmlns='xmlns-c')),
+            [(self.form_adapter, False)]
+        )
+
+    def test_other_doc_type(self):
+        self.assertEqual(self.index.get_adapters(dict(doc_type='CommCareUser', domain='user-reports')), [])
+
+
 def _save_sql_case(doc):
     system_props = ['_id', '_rev', 'opened_on', 'owner_id', 'doc_type', 'domain', 'type']
     with drop_connected_signals(case_post_save):
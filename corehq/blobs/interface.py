@@ -1,5 +1,6 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
+import shutil
 from abc import ABCMeta, abstractmethod
 
 from .metadata import MetaDB
@@ -64,6 +65,19 @@ class AbstractBlobDB(six.with_metaclass(ABCMeta, object)):
         """
         raise NotImplementedError
 
+    def get_to_file(self, key, fileobj):
+        """Write a blob's content to a file
+
+        Backends may override this to download large blobs faster, for
+        example in parts that are fetched in parallel.
+
+        :param key: Blob key.
+        :param fileobj: A file-like object in binary write mode.
+        :raises: `NotFound` if the blob does not exist.
+        """
+        with self.get(key) as blob:
+            shutil.copyfileobj(blob, fileobj)
+
     @abstractmethod
     def exists(self, key):
         """Check if blob exists
@@ -27,6 +27,12 @@ class MigratingBlobDB(object):
         except NotFound:
             return self.old_db.get(*args, **kw)
 
+    def get_to_file(self, *args, **kw):
+        try:
+            return self.new_db.get_to_file(*args, **kw)
+        except NotFound:
+            return self.old_db.get_to_file(*args, **kw)
+
     def size(self, *args, **kw):
         try:
             return self.new_db.size(*args, **kw)
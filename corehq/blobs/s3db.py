@@ -3,7 +3,7 @@ from __future__ import unicode_literals
 import os
 import weakref
 from contextlib import contextmanager
-from io import UnsupportedOperation
+from io import BytesIO, UnsupportedOperation
 
 from corehq.blobs.exceptions import NotFound
 from corehq.blobs.interface import AbstractBlobDB
@@ -17,12 +17,19 @@ from dimagi.utils.logging import notify_exception
 from dimagi.utils.chunked import chunked
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
 from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
 from botocore.utils import fix_s3_host
 
 DEFAULT_S3_BUCKET = "blobdb"
 DEFAULT_BULK_DELETE_CHUNKSIZE = 1000
+# Blobs larger than the threshold are uploaded, copied and downloaded
+# (with get_to_file) in chunks, up to max_concurrency chunks at a time.
+DEFAULT_MULTIPART_THRESHOLD = 16 * 1024 * 1024
+DEFAULT_MULTIPART_CHUNKSIZE = 16 * 1024 * 1024
+DEFAULT_MAX_CONCURRENCY = 10
 
 
 class S3BlobDB(AbstractBlobDB):
@@ -41,6 +48,11 @@ class S3BlobDB(AbstractBlobDB):
         )
         self.bulk_delete_chunksize = config.get("bulk_delete_chunksize", DEFAULT_BULK_DELETE_CHUNKSIZE)
         self.s3_bucket_name = config.get("s3_bucket", DEFAULT_S3_BUCKET)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=config.get("multipart_threshold", DEFAULT_MULTIPART_THRESHOLD),
+            multipart_chunksize=config.get("multipart_chunksize", DEFAULT_MULTIPART_CHUNKSIZE),
+            max_concurrency=config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY),
+        )
         self._s3_bucket_exists = False
         # https://github.com/boto/boto3/issues/259
         self.db.meta.client.meta.events.unregister('before-sign.s3', fix_s3_host)
@@ -65,25 +77,33 @@ class S3BlobDB(AbstractBlobDB):
         check_safe_key(meta.key)
         s3_bucket = self._s3_bucket(create=True)
         if isinstance(content, BlobStream) and content.blob_db is self:
-            obj = s3_bucket.Object(content.blob_key)
-            meta.content_length = obj.content_length
+            meta.content_length = content.content_length
             self.metadb.put(meta)
             source = {"Bucket": self.s3_bucket_name, "Key": content.blob_key}
             with self.report_timing('put-via-copy', meta.key):
-                s3_bucket.copy(source, meta.key)
+                s3_bucket.copy(source, meta.key, Config=self.transfer_config)
         else:
             content.seek(0)
             meta.content_length = get_file_size(content)
             self.metadb.put(meta)
             with self.report_timing('put', meta.key):
-                s3_bucket.upload_fileobj(content, meta.key)
+                s3_bucket.upload_fileobj(content, meta.key, Config=self.transfer_config)
         return meta
 
     def get(self, key):
         check_safe_key(key)
+        resp = self._get_object(key)
+        return BlobStream(resp["Body"], self, key, resp["ContentLength"])
+
+    def _get_object(self, key, offset=0):
+        kwargs = {"Range": "bytes={}-".format(offset)} if offset else {}
         with maybe_not_found(throw=NotFound(key)), self.report_timing('get', key):
-            resp = self._s3_bucket().Object(key).get()
-        return BlobStream(resp["Body"], self, key)
+            return self._s3_bucket().Object(key).get(**kwargs)
+
+    def get_to_file(self, key, fileobj):
+        check_safe_key(key)
+        with maybe_not_found(throw=NotFound(key)), self.report_timing('get_to_file', key):
+            self._s3_bucket().download_fileobj(key, fileobj, Config=self.transfer_config)
 
     def size(self, key):
         check_safe_key(key)
@@ -126,7 +146,7 @@ class S3BlobDB(AbstractBlobDB):
 
     def copy_blob(self, content, key):
         with self.report_timing('copy_blobdb', key):
-            self._s3_bucket(create=True).upload_fileobj(content, key)
+            self._s3_bucket(create=True).upload_fileobj(content, key, Config=self.transfer_config)
 
     def _s3_bucket(self, create=False):
         if create and not self._s3_bucket_exists:
@@ -144,22 +164,44 @@ class S3BlobDB(AbstractBlobDB):
 
 
 class BlobStream(ClosingContextProxy):
+    """Blob content stream
 
-    def __init__(self, stream, blob_db, blob_key):
+    Seeking to a position other than the current one requests the rest
+    of the blob from that position with a ranged GET.
+    """
+
+    def __init__(self, stream, blob_db, blob_key, content_length):
         super(BlobStream, self).__init__(stream)
         self._blob_db = weakref.ref(blob_db)
         self.blob_key = blob_key
+        self.content_length = content_length
+        # position of the start of the current stream in the blob
+        self._offset = 0
+
+    def tell(self):
+        return self._offset + self._obj._amount_read
+
+    def seekable(self):
+        return True
 
     def seek(self, offset, from_what=os.SEEK_SET):
-        try:
-            return super(BlobStream, self).seek(offset, from_what)
-        except AttributeError:
-            pass
-        if from_what != os.SEEK_SET:
+        if from_what == os.SEEK_CUR:
+            offset += self.tell()
+        elif from_what == os.SEEK_END:
+            offset += self.content_length
+        elif from_what != os.SEEK_SET:
             raise ValueError("seek mode not supported")
-        if offset != self._amount_read:
-            name = type(self._obj).__name__
-            raise ValueError("%s.seek not supported" % name)
+        if offset < 0:
+            raise ValueError("negative seek position %s" % offset)
+        if offset != self.tell():
+            self._obj.close()
+            if offset < self.content_length:
+                self._obj = self.blob_db._get_object(self.blob_key, offset)["Body"]
+            else:
+                # S3 rejects ranges that start past the end of the object
+                self._obj = StreamingBody(BytesIO(b""), 0)
+            self._offset = offset
+        return offset
 
     @property
     def blob_db(self):
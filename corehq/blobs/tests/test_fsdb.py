@@ -63,6 +63,15 @@ class _BlobDBTests(object):
         with self.db.get(key=new.key) as fh:
             self.assertEqual(fh.read(), b"content")
 
+    def test_get_to_file(self):
+        meta = self.db.put(BytesIO(b"content"), meta=new_meta())
+        fileobj = BytesIO()
+        self.db.get_to_file(meta.key, fileobj)
+        self.assertEqual(fileobj.getvalue(), b"content")
+
+        with self.assertRaises(mod.NotFound):
+            self.db.get_to_file("unknown", BytesIO())
+
     def test_exists(self):
         meta = self.db.put(BytesIO(b"content"), meta=new_meta())
         self.assertTrue(self.db.exists(key=meta.key), 'not found')
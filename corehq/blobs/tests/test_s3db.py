@@ -71,6 +71,7 @@ Add the following to localsettings.py
 """
 from __future__ import unicode_literals
 from __future__ import absolute_import
+import os
 from io import BytesIO
 
 from django.conf import settings
@@ -105,3 +106,35 @@ class TestS3BlobDB(TestCase, _BlobDBTests):
         self.assertEqual(meta2.content_length, meta.content_length)
         with db2.get(meta2.key) as blob2:
             self.assertEqual(blob2.read(), b"content")
+
+    def test_seek(self):
+        meta = self.db.put(BytesIO(b"0123456789"), meta=new_meta())
+        with self.db.get(meta.key) as blob:
+            self.assertEqual(blob.read(2), b"01")
+            self.assertEqual(blob.tell(), 2)
+            blob.seek(6)
+            self.assertEqual(blob.read(2), b"67")
+            blob.seek(-6, os.SEEK_CUR)
+            self.assertEqual(blob.read(3), b"234")
+            blob.seek(-1, os.SEEK_END)
+            self.assertEqual(blob.read(), b"9")
+            blob.seek(0, os.SEEK_END)
+            self.assertEqual(blob.read(), b"")
+            blob.seek(0)
+            self.assertEqual(blob.read(), b"0123456789")
+
+    def test_multipart_put_and_get_to_file(self):
+        db = S3BlobDB(dict(
+            settings.S3_BLOB_DB_SETTINGS,
+            s3_bucket=self.db.s3_bucket_name,
+            multipart_threshold=5 * 1024 * 1024,
+            multipart_chunksize=5 * 1024 * 1024,
+        ))
+        content = os.urandom(1024 * 1024) * 11
+        meta = db.put(BytesIO(content), meta=new_meta())
+        self.addCleanup(db.delete, meta.key)
+        self.assertEqual(meta.content_length, len(content))
+
+        fileobj = BytesIO()
+        db.get_to_file(meta.key, fileobj)
+        self.assertEqual(fileobj.getvalue(), content)
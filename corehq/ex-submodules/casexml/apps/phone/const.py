@@ -16,6 +16,7 @@ ASYNC_RETRY_AFTER = 5
 
 ASYNC_RESTORE_CACHE_KEY_PREFIX = "async-restore-task"
 RESTORE_CACHE_KEY_PREFIX = "ota-restore"
+CASE_XML_CACHE_KEY_PREFIX = "ota-case-xml"
 
 # case sync algorithms
 CLEAN_OWNERS = 'clean_owners'
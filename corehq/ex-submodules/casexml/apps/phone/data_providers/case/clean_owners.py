@@ -10,7 +10,7 @@ from corehq.util.datadog.utils import case_load_counter
 from casexml.apps.case.const import CASE_INDEX_EXTENSION, CASE_INDEX_CHILD
 from casexml.apps.phone.cleanliness import get_case_footprint_info
 from casexml.apps.phone.const import ASYNC_RETRY_AFTER
-from casexml.apps.phone.data_providers.case.load_testing import get_xml_for_response
+from casexml.apps.phone.data_providers.case.load_testing import get_xml_for_updates
 from casexml.apps.phone.data_providers.case.stock import get_stock_payload
 from casexml.apps.phone.data_providers.case.utils import get_case_sync_updates, CaseStub
 from casexml.apps.phone.models import OwnershipCleanlinessFlag, IndexTree
@@ -78,11 +78,11 @@ class CleanOwnerSyncPayload(object):
             self.restore_state.domain, case_batch, self.restore_state.last_sync_log
         )
 
-        for update in updates:
+        for update, sync_xml_items in zip(updates, get_xml_for_updates(updates, self.restore_state)):
             case = update.case
             self.potential_elements_to_sync[case.case_id] = PotentialSyncElement(
                 case_stub=CaseStub(case.case_id, case.type),
-                sync_xml_items=get_xml_for_response(update, self.restore_state)
+                sync_xml_items=sync_xml_items
             )
             self._process_case_update(case)
             self._mark_case_as_checked(case)
@@ -29,7 +29,7 @@ from itertools import chain, islice
 
 from casexml.apps.case.const import CASE_INDEX_EXTENSION as EXTENSION
 from casexml.apps.phone.data_providers.case.load_testing import (
-    get_xml_for_response,
+    get_xml_for_updates,
 )
 from casexml.apps.phone.const import ASYNC_RETRY_AFTER
 from casexml.apps.phone.data_providers.case.stock import get_stock_payload
@@ -328,8 +328,8 @@ def compile_response(timing_context, restore_state, response, batches, update_pr
 
         with timing_context("get_xml_for_response (%s updates)" % len(updates)):
             response.extend(item
-                for update in updates
-                for item in get_xml_for_response(update, restore_state))
+                for items in get_xml_for_updates(updates, restore_state)
+                for item in items)
 
         done += len(cases)
         update_progress(done)
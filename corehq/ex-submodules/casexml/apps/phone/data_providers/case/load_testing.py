@@ -2,8 +2,10 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 from copy import deepcopy
 from casexml.apps.phone.data_providers.case.utils import CaseSyncUpdate
+from casexml.apps.phone.restore_caching import CaseXMLCache
 from casexml.apps.phone.xml import get_case_element, tostring
 from corehq.apps.app_manager.const import USERCASE_TYPE
+from corehq.toggles import CASE_XML_CACHE
 
 
 def transform_loadtest_update(update, factor):
@@ -21,17 +23,43 @@ def transform_loadtest_update(update, factor):
     return CaseSyncUpdate(case, update.sync_token, required_updates=update.required_updates)
 
 
-def get_xml_for_response(update, restore_state):
+def get_xml_for_updates(updates, restore_state):
+    """
+    Returns a list with the result of `get_xml_for_response` for each update.
+    For domains using the case XML cache, cases that have not changed since
+    they were last serialized reuse the cached XML.
+    """
+    if not CASE_XML_CACHE.enabled(restore_state.domain):
+        return [get_xml_for_response(update, restore_state) for update in updates]
+
+    cache = CaseXMLCache(restore_state.version)
+    to_cache = []
+    items = []
+    for update, case_xml in zip(updates, cache.get_many(updates)):
+        if case_xml is None:
+            case_xml = tostring(get_case_element(update.case, update.required_updates, restore_state.version))
+            to_cache.append((update, case_xml))
+        items.append(get_xml_for_response(update, restore_state, case_xml=case_xml))
+    cache.set_many(to_cache)
+    return items
+
+
+def get_xml_for_response(update, restore_state, case_xml=None):
     """
     Adds the XML from the case_update to the restore response.
     If factor is > 1 it will append that many updates to the response for load testing purposes.
+
+    :param case_xml: Already serialized XML for `update` to use instead of generating it.
     """
     current_count = 0
     original_update = update
     elements = []
     while current_count < restore_state.loadtest_factor:
-        element = get_case_element(update.case, update.required_updates, restore_state.version)
-        elements.append(tostring(element))
+        if current_count == 0 and case_xml is not None:
+            elements.append(case_xml)
+        else:
+            element = get_case_element(update.case, update.required_updates, restore_state.version)
+            elements.append(tostring(element))
         current_count += 1
         if current_count < restore_state.loadtest_factor:
             update = transform_loadtest_update(original_update, current_count)
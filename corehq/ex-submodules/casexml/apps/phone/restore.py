@@ -1,9 +1,9 @@
 from __future__ import absolute_import
 
 from __future__ import unicode_literals
+import io
 import logging
 import os
-import shutil
 import tempfile
 import uuid
 from io import BytesIO
@@ -120,7 +120,9 @@ class RestoreContent(object):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.response_body.close()
+        # response_body is owned by the file returned by get_fileobj() once that is called
+        if self.response_body is not None:
+            self.response_body.close()
 
     def append(self, xml_element):
         self.num_items += 1
@@ -135,29 +137,90 @@ class RestoreContent(object):
         for element in iterable:
             self.append(element)
 
-    def _write_to_file(self, fileobj):
+    def _get_start_tag(self):
         # Add 1 to num_items to account for message element
         items = (self.items_template % ('%s' % (self.num_items + 1)).encode('utf-8')) if self.items else b''
-        fileobj.write(self.start_tag_template % {
+        return self.start_tag_template % {
             b"items": items,
             b"username": self.username.encode("utf8"),
             b"nature": ResponseNature.OTA_RESTORE_SUCCESS.encode("utf8"),
-        })
-
-        self.response_body.seek(0)
-        shutil.copyfileobj(self.response_body, fileobj)
-
-        fileobj.write(self.closing_tag)
+        }
 
     def get_fileobj(self):
-        fileobj = tempfile.TemporaryFile('w+b')
+        """Get a file object containing the full response
+
+        The start tag (which includes the item count) is only known once all
+        elements have been added, so rather than copying the body into a new
+        file after it, the returned file reads the start tag from memory and
+        the rest from the body file. Nothing can be appended after this is called.
+        """
+        body = self.response_body
         try:
-            self._write_to_file(fileobj)
-            fileobj.seek(0)
-            return fileobj
+            body.write(self.closing_tag)
+            fileobj = PrefixedFile(self._get_start_tag(), body)
         except:
-            fileobj.close()
+            body.close()
             raise
+        finally:
+            self.response_body = None
+        return fileobj
+
+
+class PrefixedFile(io.RawIOBase):
+    """Read-only, seekable file object that reads `prefix` followed by the content of `fileobj`
+
+    Closing it closes `fileobj`.
+    """
+
+    def __init__(self, prefix, fileobj):
+        self._prefix = prefix
+        self._fileobj = fileobj
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = len(buffer)
+        prefix_length = len(self._prefix)
+        count = 0
+        if self._pos < prefix_length:
+            chunk = self._prefix[self._pos:self._pos + size]
+            count = len(chunk)
+            buffer[:count] = chunk
+        if count < size:
+            self._fileobj.seek(self._pos + count - prefix_length)
+            chunk = self._fileobj.read(size - count)
+            buffer[count:count + len(chunk)] = chunk
+            count += len(chunk)
+        self._pos += count
+        return count
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            self._fileobj.seek(0, io.SEEK_END)
+            pos = len(self._prefix) + self._fileobj.tell() + offset
+        else:
+            raise ValueError("invalid whence ({})".format(whence))
+        if pos < 0:
+            raise ValueError("negative seek position {}".format(pos))
+        self._pos = pos
+        return pos
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        if not self.closed:
+            self._fileobj.close()
+        super(PrefixedFile, self).close()
 
 
 class RestoreResponse(object):
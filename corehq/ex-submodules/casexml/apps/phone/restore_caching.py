@@ -3,7 +3,11 @@ from __future__ import unicode_literals
 import hashlib
 import logging
 import datetime
-from casexml.apps.phone.const import RESTORE_CACHE_KEY_PREFIX, ASYNC_RESTORE_CACHE_KEY_PREFIX
+from casexml.apps.phone.const import (
+    RESTORE_CACHE_KEY_PREFIX,
+    ASYNC_RESTORE_CACHE_KEY_PREFIX,
+    CASE_XML_CACHE_KEY_PREFIX,
+)
 from corehq.toggles import ENABLE_LOADTEST_USERS
 from corehq.util.quickcache import quickcache
 from dimagi.utils.couch.cache.cache_core import get_redis_default_cache
@@ -99,3 +103,51 @@ class RestorePayloadPathCache(_RestoreCache):
 class AsyncRestoreTaskIdCache(_RestoreCache):
     timeout = 24 * 60 * 60
     prefix = ASYNC_RESTORE_CACHE_KEY_PREFIX
+
+
+class CaseXMLCache(object):
+    """
+    Serialized case XML shared between restores of all users
+
+    The XML for a case only depends on the case, the actions the phone
+    needs (create, update, close) and the restore version, so entries are
+    keyed on those along with the case's server_modified_on. Saving a case
+    changes its key, which means entries never need to be invalidated.
+    """
+    timeout = 12 * 60 * 60
+
+    def __init__(self, version):
+        self.version = version
+
+    def _make_cache_key(self, update):
+        case = update.case
+        if not case.server_modified_on:
+            return None
+        hashable_key = ','.join([str(part) for part in [
+            case.case_id,
+            case.server_modified_on.isoformat(),
+            self.version,
+            '|'.join(update.required_updates),
+        ]])
+        return '{}-{}'.format(CASE_XML_CACHE_KEY_PREFIX, hashlib.md5(hashable_key.encode('utf-8')).hexdigest())
+
+    def get_many(self, updates):
+        """
+        :param updates: list of CaseSyncUpdate objects
+        :returns: list of cached XML bytes (or None) in the same order as `updates`
+        """
+        keys = [self._make_cache_key(update) for update in updates]
+        cached = get_redis_default_cache().get_many([key for key in keys if key])
+        return [cached.get(key) if key else None for key in keys]
+
+    def set_many(self, update_xml_pairs):
+        """
+        :param update_xml_pairs: list of (CaseSyncUpdate, XML bytes) tuples
+        """
+        values = {}
+        for update, xml in update_xml_pairs:
+            key = self._make_cache_key(update)
+            if key:
+                values[key] = xml
+        if values:
+            get_redis_default_cache().set_many(values, timeout=self.timeout)
@@ -0,0 +1,49 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import datetime
+
+from django.test import SimpleTestCase
+
+from casexml.apps.case import const
+from casexml.apps.case.models import CommCareCase
+from casexml.apps.case.xml import V1, V2
+from casexml.apps.phone.data_providers.case.utils import CaseSyncUpdate
+from casexml.apps.phone.restore_caching import CaseXMLCache
+
+
+class CaseXMLCacheKeyTest(SimpleTestCase):
+
+    def setUp(self):
+        self.case = CommCareCase(
+            domain='winterfell',
+            type='priestess',
+            name='melisandre',
+            server_modified_on=datetime.datetime(2016, 5, 31),
+        )
+        self.case._id = 'redwoman'
+        self.cache = CaseXMLCache(V2)
+
+    def _key(self, required_updates=(const.CASE_ACTION_UPDATE,), cache=None):
+        update = CaseSyncUpdate(self.case, None, required_updates=list(required_updates))
+        return (cache or self.cache)._make_cache_key(update)
+
+    def test_key_is_stable(self):
+        self.assertEqual(self._key(), self._key())
+
+    def test_key_changes_when_case_is_modified(self):
+        key = self._key()
+        self.case.server_modified_on = datetime.datetime(2016, 6, 1)
+        self.assertNotEqual(key, self._key())
+
+    def test_key_depends_on_required_updates(self):
+        self.assertNotEqual(
+            self._key(),
+            self._key([const.CASE_ACTION_CREATE, const.CASE_ACTION_UPDATE]),
+        )
+
+    def test_key_depends_on_version(self):
+        self.assertNotEqual(self._key(), self._key(cache=CaseXMLCache(V1)))
+
+    def test_unsaved_case_is_not_cached(self):
+        self.case.server_modified_on = None
+        self.assertIsNone(self._key())
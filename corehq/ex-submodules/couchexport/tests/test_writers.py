@@ -92,6 +92,16 @@ class CsvFileWriterTests(SimpleTestCase):
         file_start = writer.get_file().read(6)
         self.assertEqual(file_start, BOM_UTF8 + b'100')
 
+    def test_csv_file_writer_rows(self):
+        writer = CsvFileWriter()
+        writer.open('Spam')
+        writer.write_rows([['ham', 'spam'], ['eggs', 'hám']])
+        writer.finish()
+        self.assertEqual(
+            writer.get_file().read(),
+            BOM_UTF8 + 'ham,spam\r\neggs,hám\r\n'.encode('utf-8')
+        )
+
 
 class HtmlExportWriterTests(SimpleTestCase):
 
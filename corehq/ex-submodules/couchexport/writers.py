@@ -28,6 +28,11 @@ from six.moves import map
 
 MAX_XLS_COLUMNS = 256
 
+# Source: http://stackoverflow.com/questions/1707890/fast-way-to-filter-illegal-xml-unicode-chars-in-python
+XML_DIRTY_CHARS = re.compile(
+    '[\x00-\x08\x0b-\x1f\x7f-\x84\x86-\x9f\ud800-\udfff\ufdd0-\ufddf\ufffe-\uffff]'
+)
+
 
 class XlsLengthException(Exception):
     pass
@@ -101,6 +106,10 @@ class ExportFileWriter(object):
     def write_row(self, row):
         raise NotImplementedError
 
+    def write_rows(self, rows):
+        for row in rows:
+            self.write_row(row)
+
     def _end_file(self):
         pass
 
@@ -122,11 +131,14 @@ class CsvFileWriter(ExportFileWriter):
         self._file.write(BOM_UTF8)
 
     def write_row(self, row):
+        self.write_rows([row])
+
+    def write_rows(self, rows):
         buffer = io.StringIO()
         csvwriter = csv.writer(buffer, csv.excel)
-        csvwriter.writerow([
-            col.decode('utf-8') if isinstance(col, bytes) else col
-            for col in row
+        csvwriter.writerows([
+            [col.decode('utf-8') if isinstance(col, bytes) else col for col in row]
+            for row in rows
         ])
         self._file.write(buffer.getvalue().encode('utf-8'))
 
@@ -247,6 +259,16 @@ class ExportWriter(object):
         """
         return self._write_row(table_index, row)
 
+    def write_rows(self, table_index, rows):
+        """
+        Write a block of rows to a single table.
+
+        Unlike write(), the rows are written as they are, without
+        updating their primary ids.
+        """
+        assert self._isopen
+        return self._write_rows(table_index, rows)
+
     def close(self):
         """
         Close any open file references, do any cleanup.
@@ -264,6 +286,13 @@ class ExportWriter(object):
     def _write_row(self, sheet_index, row):
         raise NotImplementedError
 
+    def _write_rows(self, sheet_index, rows):
+        """
+        Subclasses can override this to write a block of rows more efficiently
+        """
+        for row in rows:
+            self._write_row(sheet_index, row)
+
     def _close(self):
         raise NotImplementedError
 
@@ -291,6 +320,9 @@ class OnDiskExportWriter(ExportWriter):
         self.table_names[table_index] = table_title
 
     def _write_row(self, sheet_index, row):
+        self._write_rows(sheet_index, [row])
+
+    def _write_rows(self, sheet_index, rows):
 
         def _transform(val):
             if isinstance(val, six.text_type):
@@ -300,8 +332,7 @@ class OnDiskExportWriter(ExportWriter):
             else:
                 return val
 
-        row = list(map(_transform, row))
-        self.tables[sheet_index].write_row(row)
+        self.tables[sheet_index].write_rows([list(map(_transform, row)) for row in rows])
 
     def _close(self):
         """
@@ -387,16 +418,17 @@ class Excel2007ExportWriter(ExportWriter):
         self.table_indices[table_index] = 0
 
     def _write_row(self, sheet_index, row):
+        self._write_rows(sheet_index, [row])
+
+    def _write_rows(self, sheet_index, rows):
         from couchexport.export import FormattedRow
         sheet = self.tables[sheet_index]
-
-        # Source: http://stackoverflow.com/questions/1707890/fast-way-to-filter-illegal-xml-unicode-chars-in-python
-        dirty_chars = re.compile(
-            '[\x00-\x08\x0b-\x1f\x7f-\x84\x86-\x9f\ud800-\udfff\ufdd0-\ufddf\ufffe-\uffff]'
-        )
+        format_as_text = self.format_as_text
+        number_types = six.integer_types + (float,)
+        dirty_chars_sub = XML_DIRTY_CHARS.sub
 
         def get_write_value(value):
-            if isinstance(value, six.integer_types + (float,)):
+            if isinstance(value, number_types):
                 return value
             if isinstance(value, bytes):
                 value = value.decode('utf-8')
@@ -404,18 +436,18 @@ class Excel2007ExportWriter(ExportWriter):
                 value = six.text_type(value)
             else:
                 value = ''
-            return dirty_chars.sub('?', value)
-
-        write_values = [get_write_value(val) for val in row]
-        cells = [WriteOnlyCell(sheet, val) for val in write_values]
-        if self.format_as_text:
-            for cell in cells:
-                cell.number_format = numbers.FORMAT_TEXT
-        if isinstance(row, FormattedRow):
-            for hyperlink_column_index in row.hyperlink_column_indices:
-                cells[hyperlink_column_index].hyperlink = cells[hyperlink_column_index].value
-                cells[hyperlink_column_index].style = 'Hyperlink'
-        sheet.append(cells)
+            return dirty_chars_sub('?', value)
+
+        for row in rows:
+            cells = [WriteOnlyCell(sheet, get_write_value(val)) for val in row]
+            if format_as_text:
+                for cell in cells:
+                    cell.number_format = numbers.FORMAT_TEXT
+            if isinstance(row, FormattedRow):
+                for hyperlink_column_index in row.hyperlink_column_indices:
+                    cells[hyperlink_column_index].hyperlink = cells[hyperlink_column_index].value
+                    cells[hyperlink_column_index].style = 'Hyperlink'
+            sheet.append(cells)
 
     def _close(self):
         """
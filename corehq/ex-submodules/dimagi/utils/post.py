@@ -14,10 +14,14 @@ def tmpfile(*args, **kwargs):
     return (os.fdopen(fd, 'w'), path)
 
 
-def simple_post(data, url, content_type="text/xml", timeout=60, headers=None, auth=None, verify=None):
+def simple_post(data, url, content_type="text/xml", timeout=60, headers=None, auth=None, verify=None,
+                session=None):
     """
     POST with a cleaner API, and return the actual HTTPResponse object, so
     that error codes can be interpreted.
+
+    If a requests `session` is given, the request is sent with it, so that
+    its connections are reused.
     """
     if isinstance(data, six.text_type):
         data = data.encode('utf-8')  # can't pass unicode to http request posts
@@ -37,7 +41,7 @@ def simple_post(data, url, content_type="text/xml", timeout=60, headers=None, au
     if verify is not None:
         kwargs["verify"] = verify
 
-    return requests.post(url, data, **kwargs)
+    return (session or requests).post(url, data, **kwargs)
 
 
 def post_data(data, url, curl_command="curl", use_curl=False,
@@ -1,5 +1,7 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
+from __future__ import division
+import time
 from datetime import datetime, timedelta
 from dimagi.utils.couch.cache.cache_core import get_redis_client
 
@@ -44,6 +46,60 @@ def rate_limit(key, actions_allowed=60, how_often=60):
     return value <= actions_allowed
 
 
+# Refills the bucket for the time passed since it was last used and then
+# takes up to the requested number of tokens from it, returning how many
+# were taken. The bucket expires once it would be full again anyway.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+local bucket = redis.call('hmget', KEYS[1], 'tokens', 'timestamp')
+local tokens = tonumber(bucket[1]) or capacity
+local timestamp = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - timestamp) * rate)
+local taken = math.min(requested, math.floor(tokens))
+redis.call('hmset', KEYS[1], 'tokens', tostring(tokens - taken), 'timestamp', tostring(now))
+redis.call('expire', KEYS[1], math.ceil(capacity / rate) + 1)
+return taken
+"""
+
+
+class TokenBucket(object):
+    """
+    A token bucket rate limiter, using redis as a backend.
+
+    Unlike rate_limit(), which counts actions in fixed windows, the bucket
+    refills continuously at `rate` tokens per second up to `capacity`
+    tokens, and many tokens can be taken at once. For example, to send at
+    most 100 SMS a minute through a backend in batches:
+
+    bucket = TokenBucket('sms-backend-' + backend_id, capacity=100, rate=100 / 60)
+    allowed = bucket.take(len(messages))
+    <send messages[:allowed] and delay the rest>
+    """
+
+    def __init__(self, key, capacity, rate):
+        self.key = key
+        self.capacity = capacity
+        self.rate = rate
+
+    def take(self, tokens=1):
+        """
+        Returns the number of tokens taken, which is less than `tokens`
+        if the bucket doesn't have that many left.
+        """
+        client = get_redis_client().client.get_client()
+        return int(client.eval(TOKEN_BUCKET_SCRIPT, 1, self.key, self.capacity, self.rate, time.time(), tokens))
+
+    def seconds_until(self, tokens):
+        """
+        Returns how long it takes the empty bucket to refill the given
+        number of tokens (at most its capacity)
+        """
+        return min(tokens, self.capacity) / self.rate
+
+
 class DomainRateLimiter(object):
     """
     A util for rate limiting by domain.
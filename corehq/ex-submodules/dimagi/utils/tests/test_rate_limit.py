@@ -1,12 +1,14 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
-from dimagi.utils.rate_limit import rate_limit, DomainRateLimiter
+from dimagi.utils.rate_limit import rate_limit, DomainRateLimiter, TokenBucket
 from django.test import SimpleTestCase
 # import the datetime module and not datetime.datetime:
 # "datetime" has to be the datetime module since the tests/__init__.py file
 # just imports * from all test files and the json_format_datetime doctest
 # expects datetime to be the datetime module
 import datetime
+import time
+import uuid
 
 
 class RateLimitTestCase(SimpleTestCase):
@@ -42,3 +44,18 @@ class RateLimitTestCase(SimpleTestCase):
         for domain in domains:
             self.assertEqual(domain_counts[domain], 20)
         self.assertGreater(iteration_count, 20)
+
+    def test_token_bucket(self):
+        bucket = TokenBucket('token-bucket-test-%s' % uuid.uuid4().hex, capacity=10, rate=10)
+        self.assertEqual(bucket.take(4), 4)
+        self.assertEqual(bucket.take(10), 6)
+        self.assertEqual(bucket.take(), 0)
+
+        time.sleep(0.5)
+        taken = bucket.take(10)
+        self.assertGreaterEqual(taken, 4)
+        self.assertLess(taken, 10)
+
+        time.sleep(1.5)
+        self.assertEqual(bucket.take(20), 10)
+        self.assertEqual(bucket.seconds_until(20), 1)
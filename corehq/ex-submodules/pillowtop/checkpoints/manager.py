@@ -144,7 +144,10 @@ class PillowCheckpointEventHandler(ChangeEventHandler):
 
     def update_checkpoint(self, change, context):
         if self.should_update_checkpoint(context):
-            self.checkpoint.update_to(self.get_new_seq(change))
+            if context.checkpoint_sequence is not None:
+                self.checkpoint.update_to(context.checkpoint_sequence)
+            else:
+                self.checkpoint.update_to(self.get_new_seq(change))
             self.last_update = datetime.utcnow()
             if self.checkpoint_callback:
                 self.checkpoint_callback.checkpoint_updated()
@@ -2,3 +2,5 @@
 CHECKPOINT_FREQUENCY = 100
 CHECKPOINT_MIN_WAIT = 300
 DEFAULT_PROCESSOR_CHUNK_SIZE = 10
+# max seconds to wait for a chunk to fill up before processing it anyway
+MIN_CHUNK_WAIT_SECONDS = 30
@@ -7,6 +7,7 @@ from django.conf import settings
 from django.core.management.base import BaseCommand
 
 from pillowtop.const import DEFAULT_PROCESSOR_CHUNK_SIZE
+from pillowtop.pillow.chunk_size import AdaptiveChunkSize
 from pillowtop.run_pillowtop import start_pillows, start_pillow
 from pillowtop.utils import (
     get_all_pillow_instances,
@@ -81,6 +82,22 @@ class Command(BaseCommand):
             help="The process number of this pillow process. Should be between 0 and num-processes. "
                  "It's expected that there will only be one process for each number running at once",
         )
+        parser.add_argument(
+            '--pipelined',
+            action='store_true',
+            dest='pipelined',
+            default=False,
+            help="Read and fetch the next chunk of changes in the background while the current "
+                 "chunk is processed. Only applies to pillows with batch processors.",
+        )
+        parser.add_argument(
+            '--adaptive-chunk-size',
+            action='store_true',
+            dest='adaptive_chunk_size',
+            default=False,
+            help="Grow the processor chunk size while the pillow is behind and shrink it when "
+                 "chunks take too long to process, starting from --processor-chunk-size.",
+        )
 
     def handle(self, **options):
         run_all = options['run_all']
@@ -91,6 +108,8 @@ class Command(BaseCommand):
         num_processes = options['num_processes']
         process_number = options['process_number']
         processor_chunk_size = options['processor_chunk_size']
+        pipelined = options['pipelined']
+        adaptive_chunk_size = options['adaptive_chunk_size']
         assert 0 <= process_number < num_processes
         assert processor_chunk_size
         if list_all:
@@ -116,6 +135,7 @@ class Command(BaseCommand):
 
         elif not run_all and not pillow_key and pillow_name:
             pillow = get_pillow_by_name(pillow_name, num_processes=num_processes, process_num=process_number, processor_chunk_size=processor_chunk_size)
+            _configure_chunking(pillow, pipelined, adaptive_chunk_size)
             start_pillow(pillow)
             sys.exit()
         elif list_checkpoints:
@@ -126,4 +146,13 @@ class Command(BaseCommand):
             print("\nNo command set, please see --help for runtime instructions")
             sys.exit()
 
-        start_pillows(pillows=[pillow_config.get_instance() for pillow_config in pillows_to_run])
+        pillows = [pillow_config.get_instance() for pillow_config in pillows_to_run]
+        for pillow in pillows:
+            _configure_chunking(pillow, pipelined, adaptive_chunk_size)
+        start_pillows(pillows=pillows)
+
+
+def _configure_chunking(pillow, pipelined, adaptive_chunk_size):
+    pillow.pipelined_processing = pipelined
+    if adaptive_chunk_size and pillow.processor_chunk_size:
+        pillow.adaptive_chunk_size = AdaptiveChunkSize(pillow.processor_chunk_size)
@@ -0,0 +1,38 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+
+
+class AdaptiveChunkSize(object):
+    """
+    Chooses the chunk size for pillows with batch processors.
+
+    The size doubles (up to ``max_size``) after a full chunk that was processed within
+    ``target_seconds`` while the pillow was more than ``lag_threshold`` seconds behind.
+    It halves (down to ``min_size``) whenever a chunk takes longer than ``target_seconds``,
+    so that changes are not held back by large chunks once the pillow has caught up.
+    """
+
+    def __init__(self, initial_size, min_size=1, max_size=None, target_seconds=10, lag_threshold=60):
+        self.min_size = min_size
+        self.max_size = max_size or initial_size * 10
+        self.target_seconds = target_seconds
+        self.lag_threshold = lag_threshold
+        self.size = max(self.min_size, min(initial_size, self.max_size))
+
+    @property
+    def max_wait_seconds(self):
+        # don't wait longer than the latency target for a partial chunk to fill up
+        return self.target_seconds
+
+    def record_chunk(self, chunk_full, processing_time, lag):
+        """
+        :param chunk_full: whether the chunk was read in full at the size it was read with,
+                           rather than cut short by the feed or the wait time
+        :param processing_time: seconds taken to process the chunk
+        :param lag: seconds since the oldest change in the chunk was published
+        """
+        if processing_time > self.target_seconds:
+            self.size = max(self.min_size, self.size // 2)
+        elif lag > self.lag_threshold and chunk_full:
+            self.size = min(self.max_size, self.size * 2)
@@ -11,11 +11,12 @@ from corehq.util.datadog.gauges import datadog_counter, datadog_gauge, datadog_h
 from corehq.util.timer import TimingContext
 from dimagi.utils.logging import notify_exception
 from kafka.common import TopicPartition
-from pillowtop.const import CHECKPOINT_MIN_WAIT
+from pillowtop.const import CHECKPOINT_MIN_WAIT, MIN_CHUNK_WAIT_SECONDS
 from pillowtop.dao.exceptions import DocumentMissingError
 from pillowtop.utils import force_seq_int
 from pillowtop.exceptions import PillowtopCheckpointReset
 from pillowtop.logger import pillow_logging
+from pillowtop.pillow.pipeline import PipelinedChangeReader
 import six
 
 
@@ -37,6 +38,8 @@ class PillowRuntimeContext(object):
 
     def __init__(self, changes_seen=0):
         self.changes_seen = changes_seen
+        # set when the sequence to checkpoint to was worked out before the change was processed
+        self.checkpoint_sequence = None
 
 
 class PillowBase(six.with_metaclass(ABCMeta, object)):
@@ -49,6 +52,12 @@ class PillowBase(six.with_metaclass(ABCMeta, object)):
     retry_errors = True
     # this will be the batch size for processors that support batch processing
     processor_chunk_size = 0
+    # set to true to read the next chunk from the feed (and fetch its documents) in
+    # a background thread while the current chunk is processed. Only used with batch processors.
+    pipelined_processing = False
+    # optional AdaptiveChunkSize to vary the chunk size between chunks instead of
+    # always using processor_chunk_size
+    adaptive_chunk_size = None
 
     @abstractproperty
     def pillow_id(self):
@@ -94,6 +103,26 @@ class PillowBase(six.with_metaclass(ABCMeta, object)):
     def reset_checkpoint(self):
         self.checkpoint.reset()
 
+    def get_processor_chunk_size(self):
+        if self.adaptive_chunk_size:
+            return self.adaptive_chunk_size.size
+        return self.processor_chunk_size
+
+    def get_max_chunk_wait_seconds(self):
+        """
+        Seconds after which a partial chunk is processed anyway
+        """
+        if self.adaptive_chunk_size:
+            return self.adaptive_chunk_size.max_wait_seconds
+        return MIN_CHUNK_WAIT_SECONDS
+
+    def get_checkpoint_sequence(self, change):
+        """
+        The sequence the checkpoint should be updated to after processing ``change``,
+        or None if it can only be worked out when the checkpoint is updated.
+        """
+        return None
+
     def run(self):
         """
         Main entry point for running pillows forever.
@@ -133,17 +162,20 @@ class PillowBase(six.with_metaclass(ABCMeta, object)):
             batch processors. If there are batch processors, checkpoint is updated
             at the end of the batch, otherwise is updated for every change.
         """
+        if self.pipelined_processing and self.batch_processors:
+            return self._process_changes_pipelined(since, forever)
+
         context = PillowRuntimeContext(changes_seen=0)
-        min_wait_seconds = 30
 
         def process_offset_chunk(chunk, context):
             if not chunk:
                 return
-            self._batch_process_with_error_handling(chunk)
+            self._batch_process_with_error_handling(chunk, chunk_size)
             self._update_checkpoint(chunk[-1], context)
 
         # keep track of chunk for batch processors
         changes_chunk = []
+        chunk_size = self.get_processor_chunk_size()
         last_process_time = datetime.utcnow()
 
         try:
@@ -154,11 +186,14 @@ class PillowBase(six.with_metaclass(ABCMeta, object)):
                         # Queue and process in chunks for both batch
                         #   and serial processors
                         changes_chunk.append(change)
-                        chunk_full = len(changes_chunk) == self.processor_chunk_size
-                        time_elapsed = (datetime.utcnow() - last_process_time).seconds > min_wait_seconds
+                        chunk_size = self.get_processor_chunk_size()
+                        chunk_full = len(changes_chunk) >= chunk_size
+                        time_elapsed = (
+                            (datetime.utcnow() - last_process_time).seconds > self.get_max_chunk_wait_seconds()
+                        )
                         if chunk_full or time_elapsed:
                             last_process_time = datetime.utcnow()
-                            self._batch_process_with_error_handling(changes_chunk)
+                            self._batch_process_with_error_handling(changes_chunk, chunk_size)
                             # update checkpoint for just the latest change
                             self._update_checkpoint(changes_chunk[-1], context)
                             # reset for next chunk
@@ -175,7 +210,37 @@ class PillowBase(six.with_metaclass(ABCMeta, object)):
             process_offset_chunk(changes_chunk, context)
             self.process_changes(since=self.get_last_checkpoint_sequence(), forever=forever)
 
-    def _batch_process_with_error_handling(self, changes_chunk):
+    def _process_changes_pipelined(self, since, forever):
+        """
+        Process changes in chunks like ``process_changes`` does for batch processors, but
+        read the next chunk from the feed and fetch its documents in a background thread
+        while the current chunk is being processed.
+
+            Chunks are processed and checkpointed strictly in the order they were read.
+        """
+        context = PillowRuntimeContext(changes_seen=0)
+        reader = PipelinedChangeReader(self, since, forever)
+        reader.start()
+        try:
+            for chunk in reader:
+                context.changes_seen = chunk.changes_seen
+                if chunk.changes:
+                    self._batch_process_with_error_handling(chunk.changes, chunk.chunk_size)
+                    context.checkpoint_sequence = chunk.checkpoint_sequence
+                    try:
+                        self._update_checkpoint(chunk.changes[-1], context)
+                    finally:
+                        context.checkpoint_sequence = None
+                else:
+                    self._update_checkpoint(None, None)
+        except PillowtopCheckpointReset:
+            # the reader must be done with the feed before it is read again from the checkpoint
+            reader.stop(wait=True)
+            self.process_changes(since=self.get_last_checkpoint_sequence(), forever=forever)
+        finally:
+            reader.stop()
+
+    def _batch_process_with_error_handling(self, changes_chunk, chunk_size):
         """
         Process given chunk in batch mode first on batch-processors
             and only latter on serial processors one by one, so that
@@ -186,8 +251,12 @@ class PillowBase(six.with_metaclass(ABCMeta, object)):
 
             If there is an exception in chunked processing, falls back
             to serial processing.
+
+            ``chunk_size`` is the processor chunk size the chunk was read with.
         """
         processing_time = 0
+        # whether the chunk filled up, before duplicate changes are dropped
+        chunk_full = len(changes_chunk) >= chunk_size
 
         def reprocess_serially(chunk, processor):
             for change in chunk:
@@ -225,7 +294,11 @@ class PillowBase(six.with_metaclass(ABCMeta, object)):
         # process on serial_processors
         for change in changes_chunk:
             processing_time += self.process_with_error_handling(change)
-        self._record_datadog_metrics(changes_chunk, processing_time)
+        self._record_datadog_metrics(changes_chunk, processing_time, chunk_size, chunk_full)
+        if self.adaptive_chunk_size:
+            self.adaptive_chunk_size.record_chunk(
+                chunk_full, processing_time, self._get_change_lag(changes_chunk[0])
+            )
 
     def process_with_error_handling(self, change, processor=None):
         # process given change on all serial processors or given processor.
@@ -285,15 +358,21 @@ class PillowBase(six.with_metaclass(ABCMeta, object)):
             sequence = {topic: force_seq_int(sequence)}
         return sequence
 
-    def _record_datadog_metrics(self, changes_chunk, processing_time):
+    @staticmethod
+    def _get_change_lag(change):
+        if change.metadata is None:
+            return 0
+        return (datetime.utcnow() - change.metadata.publish_timestamp).total_seconds()
+
+    def _record_datadog_metrics(self, changes_chunk, processing_time, chunk_size, chunk_full):
         tags = ["pillow_name:{}".format(self.get_name()), "mode:chunked"]
         # Since success/fail count is tracked per processor, to get sense of
         #   actual operations count, multiply by number of processors
         count = len(changes_chunk) * len(self.processors)
         datadog_counter('commcare.change_feed.changes.count', count, tags=tags)
 
-        max_change_lag = (datetime.utcnow() - changes_chunk[0].metadata.publish_timestamp).total_seconds()
-        min_change_lag = (datetime.utcnow() - changes_chunk[-1].metadata.publish_timestamp).total_seconds()
+        max_change_lag = self._get_change_lag(changes_chunk[0])
+        min_change_lag = self._get_change_lag(changes_chunk[-1])
         datadog_gauge('commcare.change_feed.chunked.min_change_lag', min_change_lag, tags=tags)
         datadog_gauge('commcare.change_feed.chunked.max_change_lag', max_change_lag, tags=tags)
 
@@ -304,11 +383,15 @@ class PillowBase(six.with_metaclass(ABCMeta, object)):
             tags=tags + ["chunk_size:".format(str(len(changes_chunk)))]
         )
 
-        if len(changes_chunk) == self.processor_chunk_size:
+        if chunk_full:
             # don't report offset chunks to ease up datadog calculations
             datadog_histogram('commcare.change_feed.chunked.processing_time_total', processing_time,
                 tags=tags + ["chunk_size:{}".format(str(len(changes_chunk)))])
 
+        if self.adaptive_chunk_size:
+            datadog_gauge('commcare.change_feed.chunked.chunk_size', chunk_size, tags=tags)
+            datadog_histogram('commcare.change_feed.chunked.chunk_processing_time', processing_time, tags=tags)
+
     def _record_checkpoint_in_datadog(self):
         datadog_counter('commcare.change_feed.change_feed.checkpoint', tags=[
             'pillow_name:{}'.format(self.get_name()),
@@ -434,6 +517,11 @@ class ConstructedPillow(PillowBase):
         for processor in processors:
             processor.process_change(change)
 
+    def get_checkpoint_sequence(self, change):
+        if self._change_processed_event_handler is not None:
+            return self._change_processed_event_handler.get_new_seq(change)
+        return None
+
     def update_checkpoint(self, change, context):
         if self._change_processed_event_handler is not None:
             return self._change_processed_event_handler.update_checkpoint(change, context)
@@ -0,0 +1,167 @@
+"""
+Support for pipelined pillow processing, where the changes of the next chunk are read
+from the change feed (and their documents fetched) in a background thread while the
+current chunk is being processed.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import sys
+import threading
+from collections import defaultdict, namedtuple
+from datetime import datetime
+
+import six
+from six.moves import queue
+
+from pillowtop.logger import pillow_logging
+
+# number of chunks that can be read ahead of the chunk being processed
+PIPELINE_DEPTH = 1
+# seconds to wait for the reader to stop before giving up on it
+READER_STOP_TIMEOUT = 5
+
+
+class ChangeChunk(namedtuple('ChangeChunk', ['changes', 'changes_seen', 'checkpoint_sequence', 'chunk_size'])):
+    """
+    A chunk of changes read from the feed.
+
+    :param changes: the changes in the chunk. An empty list means the feed returned
+                    an empty change, which should just touch the checkpoint.
+    :param changes_seen: the number of changes seen by the feed up to the end of the chunk
+    :param checkpoint_sequence: the sequence to checkpoint to once the chunk is processed,
+                                or None to let the pillow work it out from the last change.
+    :param chunk_size: the processor chunk size the chunk was read with
+    """
+
+
+class _ReaderFinished(object):
+
+    def __init__(self, exc_info=None):
+        self.exc_info = exc_info
+
+
+class PipelinedChangeReader(threading.Thread):
+    """
+    Reads chunks of changes from a pillow's change feed in a background thread.
+
+    Chunks are handed over to the processing thread through a bounded queue,
+    in the order they were read, by iterating over the reader. Errors raised
+    while reading the feed are re-raised in the processing thread.
+    """
+
+    def __init__(self, pillow, since, forever, depth=PIPELINE_DEPTH):
+        super(PipelinedChangeReader, self).__init__(name='{}-reader'.format(pillow.get_name()))
+        self.daemon = True
+        self.pillow = pillow
+        self.since = since
+        self.forever = forever
+        self._queue = queue.Queue(maxsize=depth)
+        self._stopped = threading.Event()
+
+    def run(self):
+        from django.db import connections
+        finished = _ReaderFinished()
+        try:
+            self._read_changes()
+        except Exception:
+            finished = _ReaderFinished(sys.exc_info())
+        finally:
+            self._put(finished)
+            # this thread has its own database connections
+            connections.close_all()
+
+    def stop(self, wait=False):
+        """
+        :param wait: keep waiting until the reader has exited rather than giving up on it
+                     after ``READER_STOP_TIMEOUT`` seconds
+        """
+        self._stopped.set()
+        self.join(READER_STOP_TIMEOUT)
+        while wait and self.is_alive():
+            pillow_logging.warning("[%s] Waiting for the change reader to stop", self.pillow.get_name())
+            self.join(READER_STOP_TIMEOUT)
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if isinstance(item, _ReaderFinished):
+                if item.exc_info:
+                    six.reraise(*item.exc_info)
+                return
+            yield item
+
+    def _read_changes(self):
+        changes_seen = 0
+        changes_chunk = []
+        last_process_time = datetime.utcnow()
+        change_feed = self.pillow.get_change_feed()
+        for change in change_feed.iter_changes(since=self.since or None, forever=self.forever):
+            if self._stopped.is_set():
+                return
+            changes_seen += 1
+            if change:
+                changes_chunk.append(change)
+                chunk_size = self.pillow.get_processor_chunk_size()
+                chunk_full = len(changes_chunk) >= chunk_size
+                time_elapsed = (
+                    (datetime.utcnow() - last_process_time).seconds > self.pillow.get_max_chunk_wait_seconds()
+                )
+                if chunk_full or time_elapsed:
+                    last_process_time = datetime.utcnow()
+                    self._put(self._make_chunk(changes_chunk, changes_seen, chunk_size))
+                    changes_chunk = []
+            else:
+                self._put(ChangeChunk([], changes_seen, None, None))
+        if changes_chunk:
+            self._put(self._make_chunk(changes_chunk, changes_seen, chunk_size))
+
+    def _make_chunk(self, changes_chunk, changes_seen, chunk_size):
+        self._fetch_documents(changes_chunk)
+        # work out the sequence here since the feed may have moved on by the time the chunk is processed
+        checkpoint_sequence = self.pillow.get_checkpoint_sequence(changes_chunk[-1])
+        return ChangeChunk(changes_chunk, changes_seen, checkpoint_sequence, chunk_size)
+
+    def _fetch_documents(self, changes_chunk):
+        """
+        Fetch the documents of the chunk in bulk, from one document store at a time,
+        and set them on the changes. Missing documents are left to be fetched (and the
+        errors handled) during processing.
+        """
+        changes_by_store = defaultdict(list)
+        for change in changes_chunk:
+            if change.deleted or not change.should_fetch_document():
+                continue
+            if change.metadata:
+                # document stores are created per change, but are the same
+                # for changes with the same domain and data source
+                key = (change.metadata.domain, change.metadata.data_source_type,
+                       change.metadata.data_source_name)
+            else:
+                key = change.document_store
+            changes_by_store[key].append(change)
+
+        for store_changes in changes_by_store.values():
+            if self._stopped.is_set():
+                return
+            try:
+                document_store = store_changes[0].document_store
+                docs_by_id = {
+                    doc['_id']: doc
+                    for doc in document_store.iter_documents([change.id for change in store_changes])
+                }
+            except Exception:
+                pillow_logging.exception("[%s] Error fetching documents for changes: %s",
+                                         self.pillow.get_name(), [change.id for change in store_changes])
+                continue
+            for change in store_changes:
+                if change.id in docs_by_id:
+                    change.set_document(docs_by_id[change.id])
+
+    def _put(self, item):
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=1)
+                return
+            except queue.Full:
+                pass
@@ -2,13 +2,15 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 import math
 import time
+from collections import defaultdict
 
 from elasticsearch.exceptions import RequestError, ConnectionError, NotFoundError, ConflictError
 
 from pillowtop.utils import ensure_matched_revisions, ensure_document_exists
+from pillowtop.dao.exceptions import DocumentMismatchError
 from pillowtop.exceptions import PillowtopIndexingError
 from pillowtop.logger import pillow_logging
-from .interface import PillowProcessor
+from .interface import BulkPillowProcessor
 
 
 def identity(x):
@@ -19,7 +21,15 @@ RETRY_INTERVAL = 2  # seconds, exponentially increasing
 MAX_RETRIES = 4  # exponential factor threshold for alerts
 
 
-class ElasticProcessor(PillowProcessor):
+class ElasticProcessor(BulkPillowProcessor):
+    """
+    Saves documents to an elasticsearch index
+
+    When the pillow processes changes in chunks, documents are fetched in
+    bulk and the whole chunk is sent to elasticsearch in a single _bulk
+    request. Changes that fail are reprocessed one at a time with
+    process_change.
+    """
 
     def __init__(self, elasticsearch, index_info, doc_prep_fn=None, doc_filter_fn=None):
         self.doc_filter_fn = doc_filter_fn
@@ -60,6 +70,60 @@ class ElasticProcessor(PillowProcessor):
             update=self._doc_exists(change.id),
         )
 
+    def process_changes_chunk(self, changes_chunk):
+        retry_changes = _fetch_documents(changes_chunk)
+
+        actions = []
+        action_changes = []
+        for change in changes_chunk:
+            if change in retry_changes:
+                continue
+            try:
+                action = self._get_bulk_action(change)
+            except Exception:
+                # let process_change raise the error
+                retry_changes.add(change)
+                continue
+            if action:
+                actions.extend(action)
+                action_changes.append(change)
+
+        if actions:
+            response = self.elasticsearch.bulk(body=actions)
+            if response.get('errors'):
+                for change, item in zip(action_changes, response['items']):
+                    if not _is_bulk_item_success(item):
+                        pillow_logging.warning("[ElasticProcessor] Bulk error for %s: %s", change.id, item)
+                        retry_changes.add(change)
+
+        return retry_changes, []
+
+    def _get_bulk_action(self, change):
+        """
+        :returns: A list of the lines of the _bulk request for the change, or
+        None if it should not be sent to elasticsearch. Same as process_change.
+        """
+        if change.deleted and change.id:
+            return [self._bulk_metadata('delete', change.id)]
+
+        doc = change.get_document()
+        if doc is None or (self.doc_filter_fn and self.doc_filter_fn(doc)):
+            return None
+
+        if doc.get('doc_type') is not None and doc['doc_type'].endswith("-Deleted"):
+            return [self._bulk_metadata('delete', change.id)]
+
+        return [self._bulk_metadata('index', change.id), self.doc_transform_fn(doc)]
+
+    def _bulk_metadata(self, action, doc_id):
+        return {
+            action: {
+                "_index": self.index_info.index,
+                "_type": self.index_info.type,
+                "_id": doc_id,
+            }
+        }
+
     def _doc_exists(self, doc_id):
         return self.elasticsearch.exists(self.index_info.index, self.index_info.type, doc_id)
 
@@ -121,3 +185,54 @@ def send_to_elasticsearch(index, doc_type, doc_id, es_getter, name, data=None, r
             break  # ignore the error if a doc already exists when trying to create it in the index
         except NotFoundError:
             break
+
+
+def _fetch_documents(changes):
+    """
+    Fetch the documents of the changes in bulk, from one document store
+    at a time, and set them on the changes.
+
+    :returns: The set of changes that should be processed one at a time
+    to handle missing documents or mismatched revisions.
+    """
+    changes_by_store = defaultdict(list)
+    for change in changes:
+        if change.deleted or not change.should_fetch_document():
+            continue
+        if change.metadata:
+            # document stores are created per change, but are the same
+            # for changes with the same domain and data source
+            key = (change.metadata.domain, change.metadata.data_source_type, change.metadata.data_source_name)
+        else:
+            key = change.document_store
+        changes_by_store[key].append(change)
+
+    retry_changes = set()
+    for store_changes in changes_by_store.values():
+        document_store = store_changes[0].document_store
+        docs_by_id = {
+            doc['_id']: doc
+            for doc in document_store.iter_documents([change.id for change in store_changes])
+        }
+        for change in store_changes:
+            if change.id in docs_by_id:
+                change.set_document(docs_by_id[change.id])
+            else:
+                retry_changes.add(change)
+
+    for change in changes:
+        if change in retry_changes or change.deleted:
+            continue
+        try:
+            ensure_matched_revisions(change, change.document)
+        except DocumentMismatchError:
+            retry_changes.add(change)
+    return retry_changes
+
+
+def _is_bulk_item_success(item):
+    (action, result), = item.items()
+    if action == 'delete' and result.get('status') == 404:
+        # the document was not in the index
+        return True
+    return 200 <= result.get('status', 500) < 300
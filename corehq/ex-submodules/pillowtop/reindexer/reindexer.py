@@ -4,13 +4,17 @@ from __future__ import unicode_literals
 from abc import ABCMeta, abstractmethod
 import argparse
 from datetime import datetime
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 import time
 
-from elasticsearch import TransportError
+from django.db import connections
+from elasticsearch import Elasticsearch, TransportError
 import six
 
 from corehq.apps.change_feed.document_types import is_deletion
 from corehq.util.doc_processor.interface import BaseDocProcessor, BulkDocProcessor
+from dimagi.utils.chunked import chunked
 from pillowtop.es_utils import set_index_reindex_settings, \
     set_index_normal_settings, initialize_mapping_if_necessary
 from pillowtop.feed.interface import Change
@@ -97,6 +101,26 @@ class ReindexerFactory(six.with_metaclass(ABCMeta)):
             help='Number of docs to process at a time'
         )
 
+    @staticmethod
+    def parallel_reindexer_args(parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            action='store',
+            dest='processes',
+            default=1,
+            help='Number of processes to split the SQL databases between. '
+                 'Each database is reindexed with its own resumable checkpoint.'
+        )
+        parser.add_argument(
+            '--max-in-flight',
+            type=int,
+            action='store',
+            dest='max_in_flight',
+            default=1,
+            help='Maximum number of bulk requests each process sends to Elasticsearch at a time'
+        )
+
     @staticmethod
     def limit_db_args(parser):
         parser.add_argument(
@@ -194,11 +218,18 @@ class ElasticPillowReindexer(PillowChangeProviderReindexer):
 
 
 class BulkPillowReindexProcessor(BaseDocProcessor):
-    def __init__(self, es_client, index_info, doc_filter=None, doc_transform=None):
+    """
+    :param max_in_flight: Each batch of docs is split into this many payloads
+    which are sent to Elasticsearch concurrently. The next batch is only read
+    once all the payloads of the current batch have been sent, so this is
+    also the maximum number of requests waiting on Elasticsearch.
+    """
+    def __init__(self, es_client, index_info, doc_filter=None, doc_transform=None, max_in_flight=1):
         self.doc_transform = doc_transform
         self.doc_filter = doc_filter
         self.es = es_client
         self.index_info = index_info
+        self.max_in_flight = max_in_flight
 
     def should_process(self, doc):
         if self.doc_filter:
@@ -214,15 +245,27 @@ class BulkPillowReindexProcessor(BaseDocProcessor):
         changes = [self._doc_to_change(doc) for doc in docs]
         error_collector = ErrorCollector()
 
-        bulk_changes = build_bulk_payload(self.index_info, changes, self.doc_transform, error_collector)
+        payloads = []
+        slice_size = -(-len(changes) // self.max_in_flight)
+        for changes_slice in chunked(changes, slice_size):
+            bulk_changes = build_bulk_payload(self.index_info, changes_slice, self.doc_transform, error_collector)
+            payloads.extend(prepare_bulk_payloads(bulk_changes, MAX_PAYLOAD_SIZE))
 
         for change, exception in error_collector.errors:
             pillow_logging.error("Error procesing doc %s: %s (%s)", change.id, type(exception), exception)
 
-        payloads = prepare_bulk_payloads(bulk_changes, MAX_PAYLOAD_SIZE)
         if len(payloads) > 1:
             pillow_logging.info("Payload split into %s parts" % len(payloads))
 
+        if self.max_in_flight > 1 and len(payloads) > 1:
+            pool = ThreadPool(min(self.max_in_flight, len(payloads)))
+            try:
+                results = pool.map(self._send_payload_with_retries, payloads)
+            finally:
+                pool.close()
+            # stop the reindexer if we're unable to send a payload to ES
+            return all(results)
+
         for payload in payloads:
             success = self._send_payload_with_retries(payload)
             if not success:
@@ -269,7 +312,7 @@ class ResumableBulkElasticPillowReindexer(Reindexer):
 
     def __init__(self, doc_provider, elasticsearch, index_info,
                  doc_filter=None, doc_transform=None, chunk_size=1000, pillow=None,
-                 reset=False, in_place=False):
+                 reset=False, in_place=False, max_in_flight=1):
         self.reset = reset
         self.in_place = in_place
         self.doc_provider = doc_provider
@@ -277,7 +320,7 @@ class ResumableBulkElasticPillowReindexer(Reindexer):
         self.index_info = index_info
         self.chunk_size = chunk_size
         self.doc_processor = BulkPillowReindexProcessor(
-            self.es, self.index_info, doc_filter, doc_transform
+            self.es, self.index_info, doc_filter, doc_transform, max_in_flight
         )
         self.pillow = pillow
 
@@ -310,3 +353,79 @@ class ResumableBulkElasticPillowReindexer(Reindexer):
                 'you can fix this by running ./manage.py ptop_reindexer_v2 [index-name] --reset or '
                 './manage.py ptop_preindex --reset.'
             )
+
+
+class PartitionedBulkElasticPillowReindexer(Reindexer):
+    """
+    Reindex SQL documents in parallel by splitting the databases between
+    worker processes.
+
+    Each database is reindexed with the document provider returned by
+    ``get_doc_provider(db_alias)``, which should use an iteration key that
+    is unique to the database so that each one is resumed from its own
+    checkpoint. Interrupted reindexes can be resumed with a different
+    number of processes.
+    """
+
+    def __init__(self, get_doc_provider, db_aliases, elasticsearch, index_info,
+                 doc_filter=None, doc_transform=None, chunk_size=1000,
+                 reset=False, in_place=False, processes=1, max_in_flight=1):
+        self.get_doc_provider = get_doc_provider
+        self.db_aliases = db_aliases
+        self.es = elasticsearch
+        self.index_info = index_info
+        self.doc_filter = doc_filter
+        self.doc_transform = doc_transform
+        self.chunk_size = chunk_size
+        self.reset = reset
+        self.in_place = in_place
+        self.processes = processes
+        self.max_in_flight = max_in_flight
+
+    def clean(self):
+        _clean_index(self.es, self.index_info)
+
+    def reindex(self):
+        if not self.es.indices.exists(self.index_info.index):
+            self.reset = True  # if the index doesn't exist always reset the processing
+
+        if not self.in_place:
+            _prepare_index_for_reindex(self.es, self.index_info)
+
+        # don't share database connections with the worker processes
+        connections.close_all()
+        workers = []
+        for worker_num in range(self.processes):
+            db_aliases = self.db_aliases[worker_num::self.processes]
+            if db_aliases:
+                worker = multiprocessing.Process(target=self._reindex_dbs, args=(db_aliases,))
+                worker.start()
+                workers.append(worker)
+        pillow_logging.info("Started %s reindex processes, pids: %s", len(workers), [w.pid for w in workers])
+
+        for worker in workers:
+            worker.join()
+
+        failed = [worker.pid for worker in workers if worker.exitcode]
+        if failed:
+            raise Exception(
+                'Reindex processes {} failed. Run the reindex again to resume it.'.format(failed)
+            )
+
+        _prepare_index_for_usage(self.es, self.index_info)
+
+    def _reindex_dbs(self, db_aliases):
+        # the connection pool of the parent process can't be shared
+        es = Elasticsearch(self.es.transport.hosts, **self.es.transport.kwargs)
+        doc_processor = BulkPillowReindexProcessor(
+            es, self.index_info, self.doc_filter, self.doc_transform, self.max_in_flight
+        )
+        for db_alias in db_aliases:
+            pillow_logging.info("Reindexing %s", db_alias)
+            processor = BulkDocProcessor(
+                self.get_doc_provider(db_alias),
+                doc_processor,
+                reset=self.reset,
+                chunk_size=self.chunk_size,
+            )
+            processor.run()
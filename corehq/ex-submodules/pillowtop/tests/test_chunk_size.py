@@ -0,0 +1,33 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from django.test import SimpleTestCase
+
+from pillowtop.pillow.chunk_size import AdaptiveChunkSize
+
+
+class AdaptiveChunkSizeTest(SimpleTestCase):
+
+    def test_grows_when_behind(self):
+        chunk_size = AdaptiveChunkSize(10, max_size=30, target_seconds=5, lag_threshold=60)
+        chunk_size.record_chunk(True, processing_time=1, lag=120)
+        self.assertEqual(chunk_size.size, 20)
+        chunk_size.record_chunk(True, processing_time=1, lag=120)
+        self.assertEqual(chunk_size.size, 30)
+
+    def test_does_not_grow_when_caught_up(self):
+        chunk_size = AdaptiveChunkSize(10, target_seconds=5, lag_threshold=60)
+        chunk_size.record_chunk(True, processing_time=1, lag=10)
+        self.assertEqual(chunk_size.size, 10)
+
+    def test_does_not_grow_after_partial_chunk(self):
+        chunk_size = AdaptiveChunkSize(10, target_seconds=5, lag_threshold=60)
+        chunk_size.record_chunk(False, processing_time=1, lag=120)
+        self.assertEqual(chunk_size.size, 10)
+
+    def test_shrinks_when_slow(self):
+        chunk_size = AdaptiveChunkSize(10, min_size=4, target_seconds=5, lag_threshold=60)
+        chunk_size.record_chunk(True, processing_time=6, lag=120)
+        self.assertEqual(chunk_size.size, 5)
+        chunk_size.record_chunk(True, processing_time=6, lag=120)
+        self.assertEqual(chunk_size.size, 4)
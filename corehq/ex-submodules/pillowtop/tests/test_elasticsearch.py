@@ -4,17 +4,25 @@ import functools
 import uuid
 
 from django.conf import settings
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
 from elasticsearch.exceptions import ConnectionError
+from mock import patch
 
 from corehq.elastic import get_es_new
+from corehq.form_processor.backends.sql.dbaccessors import CaseReindexAccessor, FormReindexAccessor
+from corehq.pillows.case import SqlCaseReindexerFactory
+from corehq.pillows.xform import SqlFormReindexerFactory
+from corehq.util.doc_processor.sql import SqlDocumentProvider
 from corehq.util.elastic import ensure_index_deleted
 from corehq.util.test_utils import trap_extra_setup
 from pillowtop.es_utils import INDEX_REINDEX_SETTINGS, INDEX_STANDARD_SETTINGS, update_settings, \
     set_index_reindex_settings, set_index_normal_settings, mapping_exists, initialize_index, \
     initialize_index_and_mapping, assume_alias
 from pillowtop.exceptions import PillowtopIndexingError
-from pillowtop.processors.elastic import send_to_elasticsearch
+from pillowtop.feed.interface import Change
+from pillowtop.processors.elastic import ElasticProcessor, send_to_elasticsearch
+from pillowtop.reindexer.reindexer import BulkPillowReindexProcessor, PartitionedBulkElasticPillowReindexer, \
+    ResumableBulkElasticPillowReindexer
 from .utils import get_doc_count, get_index_mapping, TEST_INDEX_INFO
 
 
@@ -242,3 +250,244 @@ class TestSendToElasticsearch(SimpleTestCase):
 
         # attempt to create the same doc twice shouldn't fail
         self._send_to_es_and_check(doc)
+
+
+class TestElasticProcessorBulk(SimpleTestCase):
+
+    def setUp(self):
+        self.es = get_es_new()
+        self.index = TEST_INDEX_INFO.index
+
+        with trap_extra_setup(ConnectionError):
+            ensure_index_deleted(self.index)
+            initialize_index_and_mapping(self.es, TEST_INDEX_INFO)
+        self.processor = ElasticProcessor(self.es, TEST_INDEX_INFO)
+
+    def tearDown(self):
+        ensure_index_deleted(self.index)
+
+    def _doc(self, **kwargs):
+        doc = {'_id': uuid.uuid4().hex, 'doc_type': 'MyCoolDoc', 'property': 'foo'}
+        doc.update(kwargs)
+        return doc
+
+    def test_index_and_delete(self):
+        docs = [self._doc() for i in range(3)]
+        retry, errors = self.processor.process_changes_chunk([
+            Change(id=doc['_id'], sequence_id=i, document=doc) for i, doc in enumerate(docs)
+        ])
+        self.assertEqual((set(retry), errors), (set(), []))
+        self.assertEqual(3, get_doc_count(self.es, self.index))
+
+        deleted_doc = dict(docs[1], doc_type='MyCoolDoc-Deleted')
+        retry, errors = self.processor.process_changes_chunk([
+            Change(id=docs[0]['_id'], sequence_id=3, deleted=True),
+            Change(id=deleted_doc['_id'], sequence_id=4, document=deleted_doc),
+            # not in the index
+            Change(id=uuid.uuid4().hex, sequence_id=5, deleted=True),
+        ])
+        self.assertEqual((set(retry), errors), (set(), []))
+        self.assertEqual(1, get_doc_count(self.es, self.index))
+        self.assertEqual(
+            docs[2]['property'],
+            self.es.get_source(self.index, TEST_INDEX_INFO.type, docs[2]['_id'])['property']
+        )
+
+    def test_failed_change_is_retried(self):
+        good_doc = self._doc()
+        # conflicts with the string mapping of 'property' from good_doc
+        bad_doc = self._doc(property={'not': 'a string'})
+        bad_change = Change(id=bad_doc['_id'], sequence_id=1, document=bad_doc)
+        retry, errors = self.processor.process_changes_chunk([
+            Change(id=good_doc['_id'], sequence_id=0, document=good_doc),
+            bad_change,
+        ])
+        self.assertEqual((set(retry), errors), ({bad_change}, []))
+        self.assertEqual(1, get_doc_count(self.es, self.index))
+
+
+class TestBulkPillowReindexProcessor(SimpleTestCase):
+
+    def setUp(self):
+        self.es = get_es_new()
+        self.index = TEST_INDEX_INFO.index
+
+        with trap_extra_setup(ConnectionError):
+            ensure_index_deleted(self.index)
+            initialize_index_and_mapping(self.es, TEST_INDEX_INFO)
+
+    def tearDown(self):
+        ensure_index_deleted(self.index)
+
+    def test_concurrent_payloads(self):
+        processor = BulkPillowReindexProcessor(self.es, TEST_INDEX_INFO, max_in_flight=3)
+        docs = [
+            {'_id': uuid.uuid4().hex, 'doc_type': 'MyCoolDoc', 'property': 'foo'}
+            for i in range(10)
+        ]
+        self.assertTrue(processor.process_bulk_docs(docs))
+        self.assertEqual(10, get_doc_count(self.es, self.index))
+
+
+class _Doc(object):
+
+    def __init__(self, pk, doc_id):
+        self.pk = pk
+        self.doc_id = doc_id
+
+
+class InMemoryReindexAccessor(object):
+    """Serves docs by database alias, like a ``ReindexAccessor`` limited to some databases"""
+
+    def __init__(self, doc_ids_by_db, db_aliases, failing_dbs=()):
+        self.docs_by_db = {
+            db_alias: [_Doc(pk, doc_id) for pk, doc_id in enumerate(doc_ids, start=1)]
+            for db_alias, doc_ids in doc_ids_by_db.items()
+        }
+        self.sql_db_aliases = db_aliases
+        self.failing_dbs = failing_dbs
+        self.queried_dbs = []
+
+    def get_docs(self, from_db, last_doc_pk=None, limit=500):
+        self.queried_dbs.append(from_db)
+        if from_db in self.failing_dbs:
+            raise Exception('Database is down')
+        return [doc for doc in self.docs_by_db[from_db] if doc.pk > (last_doc_pk or 0)][:limit]
+
+    def get_doc(self, doc_id):
+        return None
+
+    def doc_to_json(self, doc):
+        return {'_id': doc.doc_id, 'doc_type': 'MyCoolDoc', 'property': 'foo'}
+
+    def get_approximate_doc_count(self, from_db):
+        return len(self.docs_by_db[from_db])
+
+
+class InlineProcess(object):
+    """Runs the target of a ``multiprocessing.Process`` in the current process"""
+    pid = None
+
+    def __init__(self, target, args):
+        self.target = target
+        self.args = args
+        self.exitcode = None
+
+    def start(self):
+        try:
+            self.target(*self.args)
+        except Exception:
+            self.exitcode = 1
+        else:
+            self.exitcode = 0
+
+    def join(self):
+        pass
+
+
+# the reindexer closes database connections before starting its worker processes,
+# which would end the test transaction
+@patch('pillowtop.reindexer.reindexer.connections')
+@patch('pillowtop.reindexer.reindexer.multiprocessing.Process', new=InlineProcess)
+class TestPartitionedBulkElasticPillowReindexer(TestCase):
+
+    def setUp(self):
+        self.es = get_es_new()
+        self.index = TEST_INDEX_INFO.index
+        with trap_extra_setup(ConnectionError):
+            ensure_index_deleted(self.index)
+        self.iteration_key_prefix = uuid.uuid4().hex
+        self.doc_ids_by_db = {
+            'db1': [uuid.uuid4().hex for i in range(3)],
+            'db2': [uuid.uuid4().hex for i in range(2)],
+            'db3': [uuid.uuid4().hex for i in range(4)],
+        }
+        self.doc_providers = []
+
+    def tearDown(self):
+        ensure_index_deleted(self.index)
+        for doc_provider in self.doc_providers:
+            doc_provider.get_document_iterator(1).discard_state()
+
+    def _get_reindexer(self, failing_dbs=()):
+        def get_doc_provider(db_alias):
+            iteration_key = '{}_{}'.format(self.iteration_key_prefix, db_alias)
+            accessor = InMemoryReindexAccessor(self.doc_ids_by_db, [db_alias], failing_dbs)
+            doc_provider = SqlDocumentProvider(iteration_key, accessor)
+            self.doc_providers.append(doc_provider)
+            return doc_provider
+
+        return PartitionedBulkElasticPillowReindexer(
+            get_doc_provider,
+            sorted(self.doc_ids_by_db),
+            elasticsearch=self.es,
+            index_info=TEST_INDEX_INFO,
+            chunk_size=2,
+            processes=2,
+        )
+
+    def test_reindex(self, connections_patch):
+        with patch.object(PartitionedBulkElasticPillowReindexer, '_reindex_dbs', autospec=True,
+                          side_effect=PartitionedBulkElasticPillowReindexer._reindex_dbs) as reindex_dbs:
+            self._get_reindexer().reindex()
+
+        # the databases were split between the processes
+        self.assertEqual(
+            [call[0][1] for call in reindex_dbs.call_args_list],
+            [['db1', 'db3'], ['db2']]
+        )
+        # each database was read with its own iteration key
+        self.assertEqual(
+            {
+                doc_provider.iteration_key: doc_provider.reindex_accessor.queried_dbs[0]
+                for doc_provider in self.doc_providers
+            },
+            {'{}_{}'.format(self.iteration_key_prefix, db_alias): db_alias for db_alias in ['db1', 'db2', 'db3']}
+        )
+        self.assertEqual(9, get_doc_count(self.es, self.index))
+
+    def test_failed_process_is_resumed(self, connections_patch):
+        with self.assertRaises(Exception):
+            self._get_reindexer(failing_dbs=['db2']).reindex()
+        self.assertEqual(7, get_doc_count(self.es, self.index))
+
+        self.doc_providers = []
+        self._get_reindexer().reindex()
+
+        # only the database that failed is read again
+        queried_dbs = [
+            db_alias for doc_provider in self.doc_providers
+            for db_alias in doc_provider.reindex_accessor.queried_dbs
+        ]
+        self.assertEqual(set(queried_dbs), {'db2'})
+        self.assertEqual(9, get_doc_count(self.es, self.index))
+
+
+class TestSqlReindexerFactories(SimpleTestCase):
+
+    def _get_options(self, **options):
+        options.update({'reset': False, 'in_place': False, 'chunk_size': 1000, 'max_in_flight': 1})
+        return options
+
+    def test_partitioned_reindexers(self):
+        for factory_class, accessor_class in [
+            (SqlCaseReindexerFactory, CaseReindexAccessor),
+            (SqlFormReindexerFactory, FormReindexAccessor),
+        ]:
+            reindexer = factory_class(**self._get_options(processes=2)).build()
+            self.assertIsInstance(reindexer, PartitionedBulkElasticPillowReindexer)
+            db_aliases = accessor_class().sql_db_aliases
+            self.assertEqual(reindexer.db_aliases, db_aliases)
+            self.assertEqual(reindexer.processes, 2)
+
+            doc_providers = [reindexer.get_doc_provider(db_alias) for db_alias in db_aliases]
+            for db_alias, doc_provider in zip(db_aliases, doc_providers):
+                self.assertIn(db_alias, doc_provider.iteration_key)
+                self.assertEqual(doc_provider.reindex_accessor.sql_db_aliases, [db_alias])
+
+    def test_limit_to_db_is_not_partitioned(self):
+        db_alias = CaseReindexAccessor().sql_db_aliases[0]
+        for factory_class in [SqlCaseReindexerFactory, SqlFormReindexerFactory]:
+            reindexer = factory_class(**self._get_options(processes=2, limit_to_db=db_alias)).build()
+            self.assertIsInstance(reindexer, ResumableBulkElasticPillowReindexer)
+            self.assertIn(db_alias, reindexer.doc_provider.iteration_key)
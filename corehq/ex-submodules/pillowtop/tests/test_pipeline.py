@@ -0,0 +1,153 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import threading
+import uuid
+
+from django.test import SimpleTestCase
+from mock import MagicMock, patch
+
+from pillowtop.checkpoints.manager import PillowCheckpointEventHandler
+from pillowtop.feed.interface import Change, ChangeMeta
+from pillowtop.feed.mock import RandomChangeFeed
+from pillowtop.pillow.interface import ConstructedPillow
+from pillowtop.pillow.pipeline import PipelinedChangeReader
+from pillowtop.processors.sample import ChunkedCountProcessor
+
+
+def _change_with_meta(sequence_id, doc_id=None):
+    doc_id = doc_id or uuid.uuid4().hex
+    return Change(
+        id=doc_id,
+        sequence_id=sequence_id,
+        document={'_id': doc_id},
+        metadata=ChangeMeta(document_id=doc_id, data_source_type='dummy-type', data_source_name='dummy-name'),
+    )
+
+
+class PipelinedProcessingTest(SimpleTestCase):
+
+    def _get_pillow(self, checkpoint, processor, change_generator=_change_with_meta):
+        pillow = ConstructedPillow(
+            name='test-pipelined-pillow',
+            checkpoint=checkpoint,
+            change_feed=RandomChangeFeed(11, change_generator=change_generator),
+            processor=processor,
+            change_processed_event_handler=PillowCheckpointEventHandler(
+                checkpoint=checkpoint, checkpoint_frequency=1,
+            ),
+            processor_chunk_size=3,
+        )
+        pillow.pipelined_processing = True
+        return pillow
+
+    def test_process_changes(self):
+        checkpoint = MagicMock()
+        processor = ChunkedCountProcessor()
+        pillow = self._get_pillow(checkpoint, processor)
+        pillow.process_changes(since=1, forever=False)
+        self.assertEqual(processor.count, 10)
+        # checkpoints are updated in order at the end of each chunk
+        self.assertEqual(
+            [call[0][0] for call in checkpoint.update_to.call_args_list],
+            [3, 6, 9, 10]
+        )
+
+    def test_processing_error_stops_reader(self):
+        checkpoint = MagicMock()
+        processor = ChunkedCountProcessor()
+        pillow = self._get_pillow(checkpoint, processor)
+        checkpoint.update_to.side_effect = ValueError
+        with self.assertRaises(ValueError):
+            pillow.process_changes(since=1, forever=False)
+        self.assertEqual(processor.count, 3)
+
+    def test_duplicate_changes_count_towards_full_chunk(self):
+        def change_generator(sequence_id):
+            # every pair of changes is for the same document
+            return _change_with_meta(sequence_id, doc_id='doc-{}'.format(sequence_id // 2))
+
+        pillow = self._get_pillow(MagicMock(), ChunkedCountProcessor(), change_generator)
+        pillow.adaptive_chunk_size = MagicMock(size=3, max_wait_seconds=10)
+        pillow.process_changes(since=1, forever=False)
+        self.assertEqual(
+            [call[0][0] for call in pillow.adaptive_chunk_size.record_chunk.call_args_list],
+            [True, True, True, False]
+        )
+
+
+class BlockingChangeFeed(RandomChangeFeed):
+    """
+    Blocks before each change until ``release`` is set. With ``heartbeat_seconds``
+    it yields None every so often while blocked, like the kafka feed does.
+    """
+
+    def __init__(self, count, heartbeat_seconds=None):
+        super(BlockingChangeFeed, self).__init__(count, change_generator=_change_with_meta)
+        self.release = threading.Event()
+        self.heartbeat_seconds = heartbeat_seconds
+
+    def iter_changes(self, since, forever):
+        for change in super(BlockingChangeFeed, self).iter_changes(since, forever):
+            while not self.release.wait(self.heartbeat_seconds):
+                yield None
+            yield change
+
+
+@patch('pillowtop.pillow.pipeline.READER_STOP_TIMEOUT', 0.01)
+class PipelinedChangeReaderStopTest(SimpleTestCase):
+
+    def _get_reader(self, heartbeat_seconds=None):
+        feed = BlockingChangeFeed(3, heartbeat_seconds)
+        pillow = MagicMock()
+        pillow.get_name.return_value = 'test-pipelined-pillow'
+        pillow.get_change_feed.return_value = feed
+        pillow.get_processor_chunk_size.return_value = 10
+        reader = PipelinedChangeReader(pillow, since=1, forever=False)
+        reader.start()
+        return reader, feed
+
+    def test_stop_gives_up_on_blocked_reader(self):
+        reader, feed = self._get_reader()
+        reader.stop()
+        self.assertTrue(reader.is_alive())
+        feed.release.set()
+        reader.join()
+
+    def test_stop_waits_for_blocked_reader(self):
+        reader, feed = self._get_reader()
+        threading.Timer(0.1, feed.release.set).start()
+        reader.stop(wait=True)
+        self.assertFalse(reader.is_alive())
+
+    def test_stop_interrupts_reader_on_quiet_feed(self):
+        reader, feed = self._get_reader(heartbeat_seconds=0.01)
+        reader.stop(wait=True)
+        self.assertFalse(reader.is_alive())
+
+
+class PipelinedChangeReaderFetchTest(SimpleTestCase):
+
+    def test_documents_are_fetched_in_bulk(self):
+        document_store = MagicMock()
+        document_store.iter_documents.side_effect = lambda ids: [{'_id': doc_id} for doc_id in ids[1:]]
+        changes = [
+            Change(
+                id=doc_id,
+                sequence_id=sequence_id,
+                document_store=document_store,
+                metadata=ChangeMeta(document_id=doc_id, data_source_type='dummy-type',
+                                    data_source_name='dummy-name'),
+            )
+            for sequence_id, doc_id in enumerate(['missing', 'doc1', 'doc2'])
+        ]
+        reader = PipelinedChangeReader(MagicMock(), since=1, forever=False)
+
+        reader._fetch_documents(changes)
+
+        document_store.iter_documents.assert_called_once_with(['missing', 'doc1', 'doc2'])
+        document_store.get_document.assert_not_called()
+        missing, doc1, doc2 = changes
+        # the missing document is left to be fetched during processing
+        self.assertTrue(missing.should_fetch_document())
+        self.assertEqual(doc1.document, {'_id': 'doc1'})
+        self.assertEqual(doc2.document, {'_id': 'doc2'})
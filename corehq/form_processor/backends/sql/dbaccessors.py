@@ -7,7 +7,7 @@ import logging
 import struct
 from abc import ABCMeta, abstractproperty
 from abc import abstractmethod
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 from datetime import datetime
 from io import BytesIO
 from itertools import groupby
@@ -59,6 +59,7 @@ from corehq.form_processor.utils.sql import (
     fetchall_as_namedtuple
 )
 from corehq.sql_db.config import get_sql_db_aliases_in_use, partition_config
+from corehq.sql_db.parallel import iter_query_results_in_parallel
 from corehq.sql_db.routers import db_for_read_write, get_cursor
 from corehq.sql_db.util import split_list_by_db_partition
 from corehq.util.datadog.utils import form_load_counter
@@ -375,7 +376,10 @@ class FormAccessorSQL(AbstractFormAccessor):
         assert isinstance(form_ids, list)
         if not form_ids:
             return []
-        forms = list(XFormInstanceSQL.objects.raw('SELECT * from get_forms_by_id(%s)', [form_ids]))
+        if _should_fetch_from_shards():
+            forms = _get_objects_from_shards(XFormInstanceSQL, 'form_id', form_ids)
+        else:
+            forms = list(XFormInstanceSQL.objects.raw('SELECT * from get_forms_by_id(%s)', [form_ids]))
         if ordered:
             _sort_with_id_list(forms, form_ids, 'form_id')
 
@@ -774,7 +778,10 @@ class CaseAccessorSQL(AbstractCaseAccessor):
         assert isinstance(case_ids, list)
         if not case_ids:
             return []
-        cases = list(CommCareCaseSQL.objects.raw('SELECT * from get_cases_by_id(%s)', [case_ids]))
+        if _should_fetch_from_shards():
+            cases = _get_objects_from_shards(CommCareCaseSQL, 'case_id', case_ids)
+        else:
+            cases = list(CommCareCaseSQL.objects.raw('SELECT * from get_cases_by_id(%s)', [case_ids]))
 
         if ordered:
             _sort_with_id_list(cases, case_ids, 'case_id')
@@ -1474,6 +1481,40 @@ class LedgerAccessorSQL(AbstractLedgerAccessor):
                 yield trans
 
 
+def _should_fetch_from_shards():
+    return settings.USE_PARTITIONED_DATABASE and settings.BULK_FETCH_FROM_SHARDS
+
+
+def _get_objects_from_shards(model_class, id_field, ids):
+    """
+    Fetch objects by ID directly from the shard databases they are stored in rather
+    than through the proxy database. Shards are queried at the same time, using
+    the pooled connections of ``corehq.sql_db.parallel``.
+
+    Like the proxy functions, this does not return the objects in any particular order.
+    """
+    ids_by_db = defaultdict(list)
+    for id_, db_name in ShardAccessor.get_database_for_docs(ids).items():
+        ids_by_db[db_name].append(id_)
+
+    def _get_objects(db_name, db_ids):
+        return model_class.objects.using(db_name).filter(**{'{}__in'.format(id_field): db_ids})
+
+    if len(ids_by_db) == 1 or any(connections[db_name].in_atomic_block for db_name in ids_by_db):
+        # Other threads use their own connections, which can't see changes
+        # made in a transaction the caller has open
+        return [
+            obj
+            for db_name, db_ids in ids_by_db.items()
+            for obj in _get_objects(db_name, db_ids)
+        ]
+
+    return list(iter_query_results_in_parallel({
+        db_name: functools.partial(_get_objects, db_name, db_ids)
+        for db_name, db_ids in ids_by_db.items()
+    }))
+
+
 def _sort_with_id_list(object_list, id_list, id_property):
     """Sort object list in the same order as given list of ids
 
@@ -4,7 +4,8 @@ import uuid
 from collections import namedtuple
 from datetime import datetime
 
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase, override_settings
+from mock import patch
 
 from corehq.form_processor.backends.sql.dbaccessors import CaseAccessorSQL
 from corehq.form_processor.backends.sql.processor import FormProcessorSQL
@@ -13,9 +14,15 @@ from corehq.form_processor.interfaces.dbaccessors import CaseIndexInfo, CaseAcce
 from corehq.form_processor.interfaces.processor import ProcessedForms
 from corehq.form_processor.models import XFormInstanceSQL, CommCareCaseSQL, \
     CaseTransaction, CommCareCaseIndexSQL, CaseAttachmentSQL, SupplyPointCaseMixin
-from corehq.form_processor.tests.utils import FormProcessorTestUtils, use_sql_backend
+from corehq.form_processor.tests.utils import (
+    FormProcessorTestUtils,
+    only_run_with_partitioned_database,
+    use_sql_backend,
+)
 from corehq.form_processor.tests.test_basics import _submit_case_block
+from corehq.sql_db.parallel import iter_query_results_in_parallel
 from corehq.sql_db.routers import db_for_read_write
+from corehq.sql_db.util import get_db_alias_for_partitioned_doc
 
 DOMAIN = 'test-case-accessor'
 CaseTransactionTrace = namedtuple('CaseTransactionTrace', 'form_id include')
@@ -654,6 +661,61 @@ class CaseAccessorTestsSQL(TestCase):
         self.assertEqual({'user1', 'user2'}, owners)
 
 
+@use_sql_backend
+@only_run_with_partitioned_database
+@override_settings(BULK_FETCH_FROM_SHARDS=True)
+class CaseAccessorShardFetchTestsSQL(TestCase):
+
+    def tearDown(self):
+        FormProcessorTestUtils.delete_all_sql_forms(DOMAIN)
+        FormProcessorTestUtils.delete_all_sql_cases(DOMAIN)
+        super(CaseAccessorShardFetchTestsSQL, self).tearDown()
+
+    @patch('corehq.form_processor.backends.sql.dbaccessors.iter_query_results_in_parallel')
+    def test_get_cases_in_transaction(self, parallel_patch):
+        case_ids = [_create_case(case_id=case_id).case_id for case_id in _case_ids_on_different_shards()]
+        case_ids.reverse()
+
+        # the test transaction is open, so the shards are queried in this thread
+        cases = CaseAccessorSQL.get_cases(case_ids + ['missing_case'], ordered=True)
+        self.assertEqual(case_ids, [case.case_id for case in cases])
+        self.assertFalse(parallel_patch.called)
+
+        cases = CaseAccessorSQL.get_cases(case_ids[:1])
+        self.assertEqual(case_ids[:1], [case.case_id for case in cases])
+
+
+@use_sql_backend
+@only_run_with_partitioned_database
+@override_settings(BULK_FETCH_FROM_SHARDS=True)
+class CaseAccessorParallelShardFetchTestsSQL(TransactionTestCase):
+
+    def tearDown(self):
+        FormProcessorTestUtils.delete_all_sql_forms(DOMAIN)
+        FormProcessorTestUtils.delete_all_sql_cases(DOMAIN)
+        super(CaseAccessorParallelShardFetchTestsSQL, self).tearDown()
+
+    def test_get_cases(self):
+        case_ids = [_create_case(case_id=case_id).case_id for case_id in _case_ids_on_different_shards()]
+        case_ids.reverse()
+
+        with patch('corehq.form_processor.backends.sql.dbaccessors.iter_query_results_in_parallel',
+                   wraps=iter_query_results_in_parallel) as parallel_patch:
+            cases = CaseAccessorSQL.get_cases(case_ids + ['missing_case'], ordered=True)
+        self.assertEqual(case_ids, [case.case_id for case in cases])
+        self.assertTrue(parallel_patch.called)
+
+
+def _case_ids_on_different_shards(count=5):
+    case_ids = []
+    db_names = set()
+    while len(case_ids) < count or len(db_names) < 2:
+        case_id = uuid.uuid4().hex
+        case_ids.append(case_id)
+        db_names.add(get_db_alias_for_partitioned_doc(case_id))
+    return case_ids
+
+
 class CaseAccessorsTests(TestCase):
 
     def tearDown(self):
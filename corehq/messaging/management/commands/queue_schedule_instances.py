@@ -16,9 +16,18 @@ from corehq.messaging.scheduling.tasks import (
     handle_timed_schedule_instance,
     handle_case_alert_schedule_instance,
     handle_case_timed_schedule_instance,
+    handle_alert_schedule_instance_batch,
+    handle_timed_schedule_instance_batch,
+    handle_case_alert_schedule_instance_batch,
+    handle_case_timed_schedule_instance_batch,
 )
-from corehq.sql_db.util import handle_connection_failure, get_default_and_partitioned_db_aliases
-from corehq.toggles import REMINDERS_MIGRATION_IN_PROGRESS
+from corehq.sql_db.util import (
+    handle_connection_failure,
+    get_default_and_partitioned_db_aliases,
+    get_db_alias_for_partitioned_doc,
+)
+from corehq.toggles import BATCH_SCHEDULE_INSTANCES, REMINDERS_MIGRATION_IN_PROGRESS
+from collections import defaultdict
 from datetime import datetime
 from dimagi.utils.couch import get_redis_lock
 from dimagi.utils.logging import notify_exception
@@ -26,6 +35,11 @@ from django.core.management.base import BaseCommand
 from time import sleep
 
 
+# The number of schedule instances handled by one task for domains
+# with the BATCH_SCHEDULE_INSTANCES toggle
+SCHEDULE_INSTANCE_BATCH_SIZE = 100
+
+
 def skip_domain(domain):
     return (
         any_migrations_in_progress(domain) or
@@ -33,6 +47,28 @@ def skip_domain(domain):
     )
 
 
+class TaskBatcher(object):
+    """
+    Groups schedule instances by domain and partitioned database so that
+    each batch task can look them up, and the cases they reference, in bulk.
+    """
+
+    def __init__(self, task):
+        self.task = task
+        self.batches = defaultdict(list)
+
+    def add(self, domain, partition_value, item):
+        key = (domain, get_db_alias_for_partitioned_doc(partition_value))
+        self.batches[key].append(item)
+        if len(self.batches[key]) >= SCHEDULE_INSTANCE_BATCH_SIZE:
+            self.task.delay(self.batches.pop(key))
+
+    def flush(self):
+        for batch in self.batches.values():
+            self.task.delay(batch)
+        self.batches.clear()
+
+
 class Command(BaseCommand):
     """
     Based on our commcare-cloud code, there will be one instance of this
@@ -56,6 +92,19 @@ class Command(BaseCommand):
 
         raise ValueError("Unexpected class: %s" % cls)
 
+    def get_batch_task(self, cls):
+        task = {
+            AlertScheduleInstance: handle_alert_schedule_instance_batch,
+            TimedScheduleInstance: handle_timed_schedule_instance_batch,
+            CaseAlertScheduleInstance: handle_case_alert_schedule_instance_batch,
+            CaseTimedScheduleInstance: handle_case_timed_schedule_instance_batch,
+        }.get(cls)
+
+        if task:
+            return task
+
+        raise ValueError("Unexpected class: %s" % cls)
+
     def get_enqueue_lock(self, cls, schedule_instance_id, next_event_due):
         key = "create-task-for-%s-%s-%s" % (
             cls.__name__,
@@ -72,6 +121,7 @@ class Command(BaseCommand):
     @handle_connection_failure(get_db_aliases=get_default_and_partitioned_db_aliases)
     def create_tasks(self):
         for cls in (AlertScheduleInstance, TimedScheduleInstance):
+            batcher = TaskBatcher(self.get_batch_task(cls))
             for domain, schedule_instance_id, next_event_due in get_active_schedule_instance_ids(
                     cls, datetime.utcnow()):
                 if skip_domain(domain):
@@ -81,9 +131,14 @@ class Command(BaseCommand):
                 # that we only retry non-processed schedule instances once an hour.
                 enqueue_lock = self.get_enqueue_lock(cls, schedule_instance_id, next_event_due)
                 if enqueue_lock.acquire(blocking=False):
-                    self.get_task(cls).delay(schedule_instance_id)
+                    if BATCH_SCHEDULE_INSTANCES.enabled(domain):
+                        batcher.add(domain, schedule_instance_id, schedule_instance_id)
+                    else:
+                        self.get_task(cls).delay(schedule_instance_id)
+            batcher.flush()
 
         for cls in (CaseAlertScheduleInstance, CaseTimedScheduleInstance):
+            batcher = TaskBatcher(self.get_batch_task(cls))
             for domain, case_id, schedule_instance_id, next_event_due in get_active_case_schedule_instance_ids(
                     cls, datetime.utcnow()):
                 if skip_domain(domain):
@@ -92,7 +147,11 @@ class Command(BaseCommand):
                 # See comment above about why we use a non-blocking lock here.
                 enqueue_lock = self.get_enqueue_lock(cls, schedule_instance_id, next_event_due)
                 if enqueue_lock.acquire(blocking=False):
-                    self.get_task(cls).delay(case_id, schedule_instance_id)
+                    if BATCH_SCHEDULE_INSTANCES.enabled(domain):
+                        batcher.add(domain, case_id, (case_id, schedule_instance_id))
+                    else:
+                        self.get_task(cls).delay(case_id, schedule_instance_id)
+            batcher.flush()
 
     def handle(self, **options):
         while True:
@@ -1,10 +1,12 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
+from collections import defaultdict
 from corehq.sql_db.util import (
     run_query_across_partitioned_databases,
     get_db_aliases_for_partitioned_query,
+    split_list_by_db_partition,
 )
-from django.db.models import Q
+from django.db.models import Case, Q, Value, When
 from uuid import UUID
 
 
@@ -34,6 +36,27 @@ def get_timed_schedule_instance(schedule_instance_id):
     return TimedScheduleInstance.objects.partitioned_get(schedule_instance_id)
 
 
+def get_schedule_instances_by_id(cls, schedule_instance_ids):
+    """
+    Get many AlertScheduleInstances or TimedScheduleInstances with one query
+    per partitioned database. Instances that don't exist are skipped.
+    """
+    from corehq.messaging.scheduling.scheduling_partitioned.models import (
+        AlertScheduleInstance,
+        TimedScheduleInstance,
+    )
+
+    if cls not in (AlertScheduleInstance, TimedScheduleInstance):
+        raise TypeError("Expected AlertScheduleInstance or TimedScheduleInstance")
+
+    for schedule_instance_id in schedule_instance_ids:
+        _validate_uuid(schedule_instance_id)
+
+    for db_alias, ids in split_list_by_db_partition(schedule_instance_ids):
+        for instance in cls.objects.using(db_alias).filter(schedule_instance_id__in=ids):
+            yield instance
+
+
 def save_alert_schedule_instance(instance):
     from corehq.messaging.scheduling.scheduling_partitioned.models import AlertScheduleInstance
 
@@ -219,6 +242,83 @@ def save_case_schedule_instance(instance):
     instance.save()
 
 
+def get_case_schedule_instances_by_id(cls, case_and_schedule_instance_ids):
+    """
+    Get many CaseAlertScheduleInstances or CaseTimedScheduleInstances with one
+    query per partitioned database. Instances that don't exist are skipped.
+
+    :param case_and_schedule_instance_ids: A list of (case_id, schedule_instance_id) tuples
+    """
+    from corehq.messaging.scheduling.scheduling_partitioned.models import (
+        CaseAlertScheduleInstance,
+        CaseTimedScheduleInstance,
+    )
+
+    if cls not in (CaseAlertScheduleInstance, CaseTimedScheduleInstance):
+        raise TypeError("Expected CaseAlertScheduleInstance or CaseTimedScheduleInstance")
+
+    schedule_instance_ids_by_case_id = defaultdict(list)
+    for case_id, schedule_instance_id in case_and_schedule_instance_ids:
+        _validate_uuid(schedule_instance_id)
+        schedule_instance_ids_by_case_id[case_id].append(schedule_instance_id)
+
+    for db_alias, case_ids in split_list_by_db_partition(schedule_instance_ids_by_case_id):
+        schedule_instance_ids = [
+            schedule_instance_id
+            for case_id in case_ids
+            for schedule_instance_id in schedule_instance_ids_by_case_id[case_id]
+        ]
+        for instance in cls.objects.using(db_alias).filter(schedule_instance_id__in=schedule_instance_ids):
+            yield instance
+
+
+def bulk_save_schedule_instance_state(cls, instances):
+    """
+    Saves the fields that change when schedule instances of the given class
+    are handled, with one UPDATE query per partitioned database. The instances
+    must already exist.
+    """
+    from corehq.messaging.scheduling.scheduling_partitioned.models import (
+        AlertScheduleInstance,
+        TimedScheduleInstance,
+        CaseAlertScheduleInstance,
+        CaseTimedScheduleInstance,
+        AbstractTimedScheduleInstance,
+    )
+
+    if cls not in (AlertScheduleInstance, TimedScheduleInstance, CaseAlertScheduleInstance,
+            CaseTimedScheduleInstance):
+        raise TypeError("Unexpected class: %s" % cls)
+
+    fields = ['current_event_num', 'schedule_iteration_num', 'next_event_due', 'active']
+    if issubclass(cls, AbstractTimedScheduleInstance):
+        fields.append('start_date')
+
+    instances_by_db = defaultdict(list)
+    for instance in instances:
+        _validate_class(instance, cls)
+        _validate_uuid(instance.schedule_instance_id)
+        instances_by_db[instance.db].append(instance)
+
+    for db_alias, db_instances in instances_by_db.items():
+        updates = {}
+        for field_name in fields:
+            field = cls._meta.get_field(field_name)
+            updates[field_name] = Case(
+                *[
+                    When(
+                        schedule_instance_id=instance.schedule_instance_id,
+                        then=Value(getattr(instance, field_name), output_field=field),
+                    )
+                    for instance in db_instances
+                ],
+                output_field=field
+            )
+        cls.objects.using(db_alias).filter(
+            schedule_instance_id__in=[instance.schedule_instance_id for instance in db_instances]
+        ).update(**updates)
+
+
 def delete_case_schedule_instance(instance):
     from corehq.messaging.scheduling.scheduling_partitioned.models import (
         CaseAlertScheduleInstance,
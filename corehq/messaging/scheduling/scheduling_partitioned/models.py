@@ -366,13 +366,19 @@ class ScheduleInstance(PartitionedModel):
         raise NotImplementedError()
 
     @property
-    @memoized
     def memoized_schedule(self):
         """
         This is named with a memoized_ prefix to be clear that it should only be used
         when the schedule is not changing.
         """
-        return self.schedule
+        if not hasattr(self, '_memoized_schedule'):
+            self._memoized_schedule = self.schedule
+        return self._memoized_schedule
+
+    @memoized_schedule.setter
+    def memoized_schedule(self, value):
+        # Lets the schedule be looked up once for many instances
+        self._memoized_schedule = value
 
     def additional_deactivation_condition_reached(self):
         """
@@ -528,12 +534,18 @@ class CaseScheduleInstanceMixin(object):
     RECIPIENT_TYPE_CUSTOM = 'CustomRecipient'
 
     @property
-    @memoized
     def case(self):
-        try:
-            return CaseAccessors(self.domain).get_case(self.case_id)
-        except CaseNotFound:
-            return None
+        if not hasattr(self, '_case'):
+            try:
+                self._case = CaseAccessors(self.domain).get_case(self.case_id)
+            except CaseNotFound:
+                self._case = None
+        return self._case
+
+    @case.setter
+    def case(self, value):
+        # Lets cases be looked up in bulk for many instances
+        self._case = value
 
     @property
     @memoized
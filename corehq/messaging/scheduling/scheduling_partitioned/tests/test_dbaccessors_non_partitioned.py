@@ -12,6 +12,8 @@ from corehq.messaging.scheduling.scheduling_partitioned.dbaccessors import (
     get_active_schedule_instance_ids,
     get_alert_schedule_instances_for_schedule,
     get_timed_schedule_instances_for_schedule,
+    get_schedule_instances_by_id,
+    bulk_save_schedule_instance_state,
 )
 from corehq.messaging.scheduling.models import (
     AlertSchedule,
@@ -109,6 +111,48 @@ class TestSchedulingNonPartitionedDBAccessorsGetAndSave(BaseSchedulingNontPartit
         with self.assertRaises(TimedScheduleInstance.DoesNotExist):
             get_timed_schedule_instance(uuid.uuid4())
 
+    def test_get_schedule_instances_by_id(self):
+        instance1 = self.make_alert_schedule_instance()
+        save_alert_schedule_instance(instance1)
+        instance2 = self.make_alert_schedule_instance()
+        save_alert_schedule_instance(instance2)
+
+        self.assertItemsEqual(
+            [
+                instance.schedule_instance_id
+                for instance in get_schedule_instances_by_id(
+                    AlertScheduleInstance,
+                    [instance1.schedule_instance_id, instance2.schedule_instance_id, uuid.uuid4()]
+                )
+            ],
+            [instance1.schedule_instance_id, instance2.schedule_instance_id]
+        )
+
+        with self.assertRaises(TypeError):
+            list(get_schedule_instances_by_id(TimedScheduleInstance, [instance1.schedule_instance_id.hex]))
+
+    def test_bulk_save_schedule_instance_state(self):
+        instance1 = self.make_timed_schedule_instance()
+        save_timed_schedule_instance(instance1)
+        instance2 = self.make_timed_schedule_instance()
+        save_timed_schedule_instance(instance2)
+
+        instance1.current_event_num = 1
+        instance1.next_event_due = datetime(2017, 3, 2)
+        instance2.active = False
+        instance2.start_date = date(2017, 4, 1)
+        bulk_save_schedule_instance_state(TimedScheduleInstance, [instance1, instance2])
+
+        instance1 = get_timed_schedule_instance(instance1.schedule_instance_id)
+        self.assertEqual(instance1.current_event_num, 1)
+        self.assertEqual(instance1.next_event_due, datetime(2017, 3, 2))
+        self.assertTrue(instance1.active)
+
+        instance2 = get_timed_schedule_instance(instance2.schedule_instance_id)
+        self.assertEqual(instance2.current_event_num, 0)
+        self.assertFalse(instance2.active)
+        self.assertEqual(instance2.start_date, date(2017, 4, 1))
+
 
 class TestSchedulingNonPartitionedDBAccessorsDeleteAndFilter(BaseSchedulingNontPartitionedDBAccessorsTest):
 
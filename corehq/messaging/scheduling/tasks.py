@@ -13,6 +13,7 @@ from corehq.messaging.scheduling.scheduling_partitioned.models import (
     CaseAlertScheduleInstance,
     CaseTimedScheduleInstance,
     CaseScheduleInstanceMixin,
+    AbstractAlertScheduleInstance,
 )
 from corehq.messaging.scheduling.scheduling_partitioned.dbaccessors import (
     delete_alert_schedule_instance,
@@ -31,14 +32,30 @@ from corehq.messaging.scheduling.scheduling_partitioned.dbaccessors import (
     delete_alert_schedule_instances_for_schedule,
     delete_timed_schedule_instances_for_schedule,
     delete_schedule_instances_by_case_id,
+    get_schedule_instances_by_id,
+    get_case_schedule_instances_by_id,
+    bulk_save_schedule_instance_state,
 )
+from corehq.form_processor.interfaces.dbaccessors import CaseAccessors
 from corehq.util.celery_utils import no_result_task
+from collections import defaultdict
 from datetime import datetime
+from dimagi.utils.chunked import chunked
 from dimagi.utils.couch import CriticalSection
+from dimagi.utils.logging import notify_exception
 from django.conf import settings
 import six
 
 
+# Schedule instances in a batch task are locked, handled and saved this many
+# at a time
+SCHEDULE_INSTANCE_SUB_BATCH_SIZE = 10
+
+# The number of seconds a batch task allows for handling each schedule
+# instance while holding its lock
+SCHEDULE_INSTANCE_LOCK_TIMEOUT = 60
+
+
 class ScheduleInstanceRefresher(object):
 
     def __init__(self, schedule, new_recipients, existing_instances):
@@ -510,6 +527,138 @@ def handle_case_timed_schedule_instance(case_id, schedule_instance_id):
         _handle_schedule_instance(instance, save_case_schedule_instance)
 
 
+def _prefetch_schedules(cls, instances):
+    if issubclass(cls, AbstractAlertScheduleInstance):
+        schedule_class, schedule_id_attr = AlertSchedule, 'alert_schedule_id'
+    else:
+        schedule_class, schedule_id_attr = TimedSchedule, 'timed_schedule_id'
+
+    schedule_ids = set(getattr(instance, schedule_id_attr) for instance in instances)
+    schedules = {
+        schedule.schedule_id: schedule
+        for schedule in schedule_class.objects.filter(schedule_id__in=schedule_ids)
+    }
+
+    for instance in instances:
+        schedule_id = getattr(instance, schedule_id_attr)
+        if schedule_id in schedules:
+            instance.memoized_schedule = schedules[schedule_id]
+
+
+def _prefetch_cases(instances):
+    case_ids_by_domain = defaultdict(set)
+    for instance in instances:
+        case_ids_by_domain[instance.domain].add(instance.case_id)
+
+    cases = {}
+    for domain, case_ids in case_ids_by_domain.items():
+        for case in CaseAccessors(domain).get_cases(list(case_ids)):
+            cases[case.case_id] = case
+
+    for instance in instances:
+        instance.case = cases.get(instance.case_id)
+
+
+def _handle_schedule_instances(cls, instances):
+    """
+    Handles schedule instances of the same class, looking up their
+    schedules (and cases) in bulk and saving their state in bulk.
+
+    :return: The schedule ids of the instances whose event was handled
+    """
+    instances = list(instances)
+    _prefetch_schedules(cls, instances)
+    if issubclass(cls, CaseScheduleInstanceMixin):
+        _prefetch_cases(instances)
+
+    to_save = []
+    handled_schedule_ids = set()
+    for instance in instances:
+        try:
+            if _handle_schedule_instance(instance, to_save.append):
+                handled_schedule_ids.add(instance.memoized_schedule.schedule_id)
+        except Exception:
+            # The instance isn't saved, so it will be retried
+            notify_exception(None, message="Error handling schedule instance %s" % instance.schedule_instance_id)
+
+    bulk_save_schedule_instance_state(cls, to_save)
+    return handled_schedule_ids
+
+
+def _handle_schedule_instance_batch(cls, items, get_lock_key, get_instances, min_lock_timeout=60):
+    """
+    Handles a batch of schedule instances of the same class a few at a time.
+    Each sub-batch is locked, loaded, handled and saved before the next one
+    is started, so that locks are only held briefly and few messages are
+    sent again if the task fails part way through.
+
+    :param items: The schedule instance ids (or case and schedule instance ids)
+    :param get_lock_key: Returns the lock key for one of the items
+    :param get_instances: Returns the schedule instances for a list of items
+    :return: The schedule ids of the instances whose event was handled
+    """
+    handled_schedule_ids = set()
+    for sub_batch in chunked(items, SCHEDULE_INSTANCE_SUB_BATCH_SIZE):
+        lock_keys = sorted(set(get_lock_key(item) for item in sub_batch))
+        timeout = max(min_lock_timeout, SCHEDULE_INSTANCE_LOCK_TIMEOUT * len(sub_batch))
+        with CriticalSection(lock_keys, timeout=timeout):
+            handled_schedule_ids |= _handle_schedule_instances(cls, get_instances(list(sub_batch)))
+
+    return handled_schedule_ids
+
+
+@no_result_task(serializer='pickle', queue='reminder_queue')
+def handle_alert_schedule_instance_batch(schedule_instance_ids):
+    handled_schedule_ids = _handle_schedule_instance_batch(
+        AlertScheduleInstance,
+        schedule_instance_ids,
+        lambda schedule_instance_id: 'handle-alert-schedule-instance-%s' % schedule_instance_id.hex,
+        lambda ids: get_schedule_instances_by_id(AlertScheduleInstance, ids),
+    )
+    for schedule_id in handled_schedule_ids:
+        update_broadcast_last_sent_timestamp(ImmediateBroadcast, schedule_id)
+
+
+@no_result_task(serializer='pickle', queue='reminder_queue')
+def handle_timed_schedule_instance_batch(schedule_instance_ids):
+    handled_schedule_ids = _handle_schedule_instance_batch(
+        TimedScheduleInstance,
+        schedule_instance_ids,
+        lambda schedule_instance_id: 'handle-timed-schedule-instance-%s' % schedule_instance_id.hex,
+        lambda ids: get_schedule_instances_by_id(TimedScheduleInstance, ids),
+    )
+    for schedule_id in handled_schedule_ids:
+        update_broadcast_last_sent_timestamp(ScheduledBroadcast, schedule_id)
+
+
+@no_result_task(serializer='pickle', queue='reminder_queue')
+def handle_case_alert_schedule_instance_batch(case_and_schedule_instance_ids):
+    """
+    :param case_and_schedule_instance_ids: A list of (case_id, schedule_instance_id) tuples
+    """
+    _handle_case_schedule_instance_batch(CaseAlertScheduleInstance, case_and_schedule_instance_ids)
+
+
+@no_result_task(serializer='pickle', queue='reminder_queue')
+def handle_case_timed_schedule_instance_batch(case_and_schedule_instance_ids):
+    """
+    :param case_and_schedule_instance_ids: A list of (case_id, schedule_instance_id) tuples
+    """
+    _handle_case_schedule_instance_batch(CaseTimedScheduleInstance, case_and_schedule_instance_ids)
+
+
+def _handle_case_schedule_instance_batch(cls, case_and_schedule_instance_ids):
+    # Use the same lock keys as the tasks which refresh case schedule instances
+    from corehq.messaging.tasks import get_sync_key
+    _handle_schedule_instance_batch(
+        cls,
+        case_and_schedule_instance_ids,
+        lambda case_and_schedule_instance_id: get_sync_key(case_and_schedule_instance_id[0]),
+        lambda ids: get_case_schedule_instances_by_id(cls, ids),
+        min_lock_timeout=5 * 60,
+    )
+
+
 @no_result_task(serializer='pickle', queue='background_queue', acks_late=True)
 def delete_schedule_instances_for_cases(domain, case_ids):
     for case_id in case_ids:
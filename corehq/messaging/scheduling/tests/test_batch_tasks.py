@@ -0,0 +1,182 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import uuid
+from corehq.form_processor.tests.utils import partitioned
+from corehq.messaging.management.commands.queue_schedule_instances import TaskBatcher
+from corehq.messaging.scheduling.models import AlertSchedule, SMSContent
+from corehq.messaging.scheduling.scheduling_partitioned.dbaccessors import (
+    bulk_save_schedule_instance_state,
+    delete_alert_schedule_instances_for_schedule,
+    get_alert_schedule_instance,
+    get_alert_schedule_instances_for_schedule,
+    get_case_schedule_instance,
+    save_case_schedule_instance,
+)
+from corehq.messaging.scheduling.scheduling_partitioned.models import (
+    AlertScheduleInstance,
+    CaseAlertScheduleInstance,
+)
+from corehq.messaging.scheduling.tasks import (
+    handle_alert_schedule_instance_batch,
+    handle_case_alert_schedule_instance_batch,
+    refresh_alert_schedule_instances,
+)
+from corehq.messaging.scheduling.tests.test_schedules import BaseScheduleTest
+from datetime import datetime
+from django.test import SimpleTestCase
+from mock import Mock, patch
+
+
+@partitioned
+@patch('corehq.messaging.scheduling.models.content.SMSContent.send')
+class ScheduleInstanceBatchTest(BaseScheduleTest):
+
+    def setUp(self):
+        super(ScheduleInstanceBatchTest, self).setUp()
+        self.schedule = AlertSchedule.create_simple_alert(self.domain, SMSContent())
+        refresh_alert_schedule_instances(
+            self.schedule.schedule_id,
+            (('CommCareUser', self.user1.get_id), ('CommCareUser', self.user2.get_id))
+        )
+
+    def tearDown(self):
+        delete_alert_schedule_instances_for_schedule(AlertScheduleInstance, self.schedule.schedule_id)
+        self.schedule.delete()
+        super(ScheduleInstanceBatchTest, self).tearDown()
+
+    def get_instances(self):
+        return {
+            instance.recipient_id: instance
+            for instance in get_alert_schedule_instances_for_schedule(self.schedule)
+        }
+
+    def get_instance_ids(self):
+        return [instance.schedule_instance_id for instance in self.get_instances().values()]
+
+    def assertHandled(self, instance):
+        self.assertEqual(instance.schedule_iteration_num, 2)
+        self.assertFalse(instance.active)
+
+    def assertNotHandled(self, instance, active=True):
+        self.assertEqual(instance.schedule_iteration_num, 1)
+        self.assertEqual(instance.active, active)
+
+    def test_handled_instances(self, send_patch):
+        handle_alert_schedule_instance_batch(self.get_instance_ids())
+
+        self.assertEqual(send_patch.call_count, 2)
+        instances = self.get_instances()
+        self.assertHandled(instances[self.user1.get_id])
+        self.assertHandled(instances[self.user2.get_id])
+
+    def test_missing_instances(self, send_patch):
+        handle_alert_schedule_instance_batch(self.get_instance_ids() + [uuid.uuid4()])
+        self.assertEqual(send_patch.call_count, 2)
+
+    def test_deleted_schedule(self, send_patch):
+        schedule_instance_ids = self.get_instance_ids()
+        self.schedule.deleted = True
+        self.schedule.save()
+
+        handle_alert_schedule_instance_batch(schedule_instance_ids)
+
+        self.assertEqual(send_patch.call_count, 0)
+        for schedule_instance_id in schedule_instance_ids:
+            with self.assertRaises(AlertScheduleInstance.DoesNotExist):
+                get_alert_schedule_instance(schedule_instance_id)
+
+    def test_deactivated_schedule(self, send_patch):
+        self.schedule.active = False
+        self.schedule.save()
+
+        handle_alert_schedule_instance_batch(self.get_instance_ids())
+
+        self.assertEqual(send_patch.call_count, 0)
+        instances = self.get_instances()
+        self.assertNotHandled(instances[self.user1.get_id], active=False)
+        self.assertNotHandled(instances[self.user2.get_id], active=False)
+
+    @patch('corehq.messaging.scheduling.tasks.notify_exception')
+    def test_failing_instance(self, notify_exception_patch, send_patch):
+        handle_current_event = AlertScheduleInstance.handle_current_event
+
+        def fail_for_user1(instance):
+            if instance.recipient_id == self.user1.get_id:
+                raise Exception("Failed")
+            return handle_current_event(instance)
+
+        with patch.object(AlertScheduleInstance, 'handle_current_event', autospec=True,
+                side_effect=fail_for_user1):
+            handle_alert_schedule_instance_batch(self.get_instance_ids())
+
+        self.assertEqual(notify_exception_patch.call_count, 1)
+        instances = self.get_instances()
+        self.assertNotHandled(instances[self.user1.get_id])
+        self.assertHandled(instances[self.user2.get_id])
+
+    @patch('corehq.messaging.scheduling.tasks.SCHEDULE_INSTANCE_SUB_BATCH_SIZE', 1)
+    def test_sub_batches_are_saved_as_they_are_handled(self, send_patch):
+        saved = []
+
+        def save_first_sub_batch(cls, instances):
+            if saved:
+                raise Exception("Failed")
+            bulk_save_schedule_instance_state(cls, instances)
+            saved.extend(instance.recipient_id for instance in instances)
+
+        with patch('corehq.messaging.scheduling.tasks.bulk_save_schedule_instance_state',
+                side_effect=save_first_sub_batch):
+            with self.assertRaises(Exception):
+                handle_alert_schedule_instance_batch(self.get_instance_ids())
+
+        self.assertEqual(len(saved), 1)
+        instances = self.get_instances()
+        self.assertHandled(instances.pop(saved[0]))
+        [unsaved_instance] = instances.values()
+        self.assertNotHandled(unsaved_instance)
+
+    def test_instance_with_deleted_case(self, send_patch):
+        instance = CaseAlertScheduleInstance(
+            domain=self.domain,
+            recipient_type='Self',
+            recipient_id=None,
+            current_event_num=0,
+            schedule_iteration_num=1,
+            next_event_due=datetime(2017, 3, 1),
+            active=True,
+            alert_schedule_id=self.schedule.schedule_id,
+            case_id=uuid.uuid4().hex,
+            rule_id=1,
+        )
+        save_case_schedule_instance(instance)
+
+        handle_case_alert_schedule_instance_batch([(instance.case_id, instance.schedule_instance_id)])
+
+        self.assertEqual(send_patch.call_count, 0)
+        with self.assertRaises(CaseAlertScheduleInstance.DoesNotExist):
+            get_case_schedule_instance(CaseAlertScheduleInstance, instance.case_id, instance.schedule_instance_id)
+
+
+@patch('corehq.messaging.management.commands.queue_schedule_instances.SCHEDULE_INSTANCE_BATCH_SIZE', 2)
+@patch('corehq.messaging.management.commands.queue_schedule_instances.get_db_alias_for_partitioned_doc',
+       new=Mock(return_value='default'))
+class TaskBatcherTest(SimpleTestCase):
+
+    def test_batches(self):
+        task = Mock()
+        batcher = TaskBatcher(task)
+
+        batcher.add('domain1', 'id1', 'item1')
+        batcher.add('domain2', 'id2', 'item2')
+        self.assertEqual(task.delay.call_count, 0)
+
+        # a full batch is spawned right away
+        batcher.add('domain1', 'id3', 'item3')
+        task.delay.assert_called_once_with(['item1', 'item3'])
+
+        batcher.flush()
+        self.assertEqual(task.delay.call_count, 2)
+        task.delay.assert_called_with(['item2'])
+
+        batcher.flush()
+        self.assertEqual(task.delay.call_count, 2)
@@ -0,0 +1,92 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from datetime import timedelta
+
+from dimagi.utils.couch.cache.cache_core import get_redis_client
+
+from .const import (
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    CIRCUIT_BREAKER_MAX_WAIT,
+    CIRCUIT_BREAKER_MIN_WAIT,
+    POST_TIMEOUT,
+)
+
+# how long the failure count of a repeater is kept after its last failure
+FAILURE_COUNT_TIMEOUT = 24 * 60 * 60  # seconds
+
+
+class RepeaterCircuitBreaker(object):
+    """
+    Tracks the health of a repeater's endpoint across all repeat records.
+
+    After CIRCUIT_BREAKER_FAILURE_THRESHOLD consecutive failed requests the
+    circuit opens, and repeat records of the repeater are postponed without
+    being sent until it closes again. When the wait is over a single repeat
+    record is sent as a probe: if it succeeds the circuit closes, otherwise
+    it opens again for twice as long, up to CIRCUIT_BREAKER_MAX_WAIT.
+
+    State is kept in redis so that it is shared by all workers:
+
+    * failures: the number of consecutive failed requests
+    * open: set while the circuit is open, expires when it is time to probe
+    * opened: the number of times the circuit has opened since the
+      last successful request, to back off exponentially
+    * probe: set while a probe request is in flight
+    """
+
+    def __init__(self, repeater_id):
+        self.repeater_id = repeater_id
+        self.client = get_redis_client().client.get_client()
+
+    def _key(self, name):
+        return 'repeater-circuit-{}-{}'.format(name, self.repeater_id)
+
+    def is_open(self):
+        return bool(self.client.exists(self._key('open')))
+
+    def get_wait(self):
+        """
+        :returns: How long until the circuit can be probed, as a timedelta
+        """
+        ttl = self.client.ttl(self._key('open'))
+        return timedelta(seconds=max(ttl, 0))
+
+    def allow_request(self):
+        """
+        :returns: True if a request may be sent to the repeater. While the
+        circuit is recovering this is only True for one request at a time.
+        """
+        if self.is_open():
+            return False
+        failures = int(self.client.get(self._key('failures')) or 0)
+        if failures < CIRCUIT_BREAKER_FAILURE_THRESHOLD:
+            return True
+        return bool(self.client.set(self._key('probe'), 1, nx=True, ex=POST_TIMEOUT * 2))
+
+    def record_success(self):
+        self.client.delete(
+            self._key('failures'),
+            self._key('opened'),
+            self._key('open'),
+            self._key('probe'),
+        )
+
+    def record_failure(self):
+        failures = self.client.incr(self._key('failures'))
+        self.client.expire(self._key('failures'), FAILURE_COUNT_TIMEOUT)
+        if failures >= CIRCUIT_BREAKER_FAILURE_THRESHOLD and not self.is_open():
+            self._open()
+        self.client.delete(self._key('probe'))
+
+    def release_probe(self):
+        """
+        Lets another request probe the repeater, when a request failed for
+        a reason that says nothing about the health of the endpoint
+        """
+        self.client.delete(self._key('probe'))
+
+    def _open(self):
+        opened = self.client.incr(self._key('opened'))
+        self.client.expire(self._key('opened'), FAILURE_COUNT_TIMEOUT)
+        wait = min(CIRCUIT_BREAKER_MIN_WAIT * 2 ** (opened - 1), CIRCUIT_BREAKER_MAX_WAIT)
+        self.client.set(self._key('open'), 1, ex=int(wait.total_seconds()))
@@ -10,6 +10,20 @@ CHECK_REPEATERS_KEY = 'check-repeaters-key'
 
 POST_TIMEOUT = 75  # seconds
 
+# Repeat records of domains with the BATCH_REPEAT_RECORDS toggle are sent in
+# batches of records for the same repeater, several at a time
+REPEAT_RECORD_BATCH_SIZE = 100
+REPEATER_BATCH_CONCURRENCY = 5
+# requests sent per minute to a single repeater, over all batches
+REPEATER_RATE_LIMIT = 600
+REPEATER_RATE_LIMIT_DELAY = timedelta(minutes=1)
+
+# Repeat records of a repeater are postponed together, without being sent,
+# after this many consecutive failed requests (see RepeaterCircuitBreaker)
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 10
+CIRCUIT_BREAKER_MIN_WAIT = timedelta(minutes=15)
+CIRCUIT_BREAKER_MAX_WAIT = timedelta(hours=12)
+
 RECORD_PENDING_STATE = 'PENDING'
 RECORD_SUCCESS_STATE = 'SUCCESS'
 RECORD_FAILURE_STATE = 'FAIL'
@@ -15,6 +15,7 @@ from requests.auth import HTTPBasicAuth, HTTPDigestAuth
 from requests.exceptions import Timeout, ConnectionError
 
 from casexml.apps.case.xml import V2, LEGAL_VERSIONS
+from corehq import toggles
 from corehq.apps.cachehq.mixins import QuickCachedDocumentMixin
 from corehq.apps.locations.models import SQLLocation
 from corehq.apps.users.models import CommCareUser
@@ -57,6 +58,7 @@ from .const import (
     RECORD_CANCELLED_STATE,
     POST_TIMEOUT,
 )
+from .circuit_breaker import RepeaterCircuitBreaker
 from .dbaccessors import (
     get_pending_repeat_record_count,
     get_failure_repeat_record_count,
@@ -64,7 +66,7 @@ from .dbaccessors import (
     get_cancelled_repeat_record_count
 )
 from .exceptions import RequestConnectionError
-from .utils import get_all_repeater_types
+from .utils import get_all_repeater_types, get_repeater_session
 
 
 def log_repeater_timeout_in_datadog(domain):
@@ -295,7 +297,11 @@ class Repeater(QuickCachedDocumentMixin, Document):
         headers = self.get_headers(repeat_record)
         auth = self.get_auth()
         url = self.get_url(repeat_record)
-        return simple_post(payload, url, headers=headers, timeout=POST_TIMEOUT, auth=auth, verify=self.verify)
+        session = None
+        if toggles.BATCH_REPEAT_RECORDS.enabled(self.domain):
+            session = get_repeater_session(self.get_id)
+        return simple_post(payload, url, headers=headers, timeout=POST_TIMEOUT, auth=auth, verify=self.verify,
+                           session=session)
 
     def fire_for_record(self, repeat_record):
         payload = self.get_payload(repeat_record)
@@ -315,6 +321,17 @@ class Repeater(QuickCachedDocumentMixin, Document):
 
         result may be either a response object or an exception
         """
+        circuit_breaker = RepeaterCircuitBreaker(self.get_id)
+        if isinstance(result, RequestConnectionError):
+            circuit_breaker.record_failure()
+        elif isinstance(result, Exception):
+            # the request could not be sent, which says nothing about the endpoint
+            circuit_breaker.release_probe()
+        elif result.status_code >= 500:
+            circuit_breaker.record_failure()
+        else:
+            circuit_breaker.record_success()
+
         if isinstance(result, Exception):
             attempt = repeat_record.handle_exception(result)
             self.generator.handle_exception(result, repeat_record)
@@ -700,7 +717,11 @@ class RepeatRecord(Document):
             succeeded=False,
         )
 
-    def fire(self, force_send=False):
+    def fire(self, force_send=False, save=True):
+        """
+        :param save: If False the caller is responsible for saving the
+        record after it is fired, e.g. with other records in bulk.
+        """
         if self.try_now() or force_send:
             self.overall_tries += 1
             try:
@@ -715,7 +736,8 @@ class RepeatRecord(Document):
                 # that'll only happen if fire_for_record raise a non-Exception exception (e.g. SIGINT)
                 # or handle_payload_exception raises an exception. I'm okay with that. -DMR
                 self.add_attempt(attempt)
-                self.save()
+                if save:
+                    self.save()
 
     @staticmethod
     def _format_response(response):
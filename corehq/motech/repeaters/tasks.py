@@ -1,25 +1,37 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
+import threading
+from collections import defaultdict
 from datetime import datetime, timedelta
 from celery.schedules import crontab
-from couchdbkit import ResourceNotFound
+from couchdbkit import BulkSaveError, ResourceNotFound
 
 from django.conf import settings
+from django.db import connections
+from six.moves import queue
 from celery.task import periodic_task, task
 from celery.utils.log import get_task_logger
 from redis.exceptions import LockError
 from corehq.util.datadog.gauges import datadog_gauge_task
 from dimagi.utils.couch import get_redis_lock
 from dimagi.utils.couch.undo import DELETED_SUFFIX
+from dimagi.utils.rate_limit import rate_limit
 
+from corehq.motech.repeaters.circuit_breaker import RepeaterCircuitBreaker
 from corehq.motech.repeaters.dbaccessors import iterate_repeat_records, \
     get_overdue_repeat_record_count
+from corehq.motech.repeaters.models import RepeatRecord
 from corehq import toggles
 from corehq.motech.repeaters.const import (
     CHECK_REPEATERS_INTERVAL,
     CHECK_REPEATERS_KEY,
     RECORD_PENDING_STATE,
-    RECORD_FAILURE_STATE)
+    RECORD_FAILURE_STATE,
+    REPEAT_RECORD_BATCH_SIZE,
+    REPEATER_BATCH_CONCURRENCY,
+    REPEATER_RATE_LIMIT,
+    REPEATER_RATE_LIMIT_DELAY,
+)
 
 logging = get_task_logger(__name__)
 
@@ -41,62 +53,226 @@ def check_repeaters():
     if not check_repeater_lock.acquire(blocking=False):
         return
 
-    for record in iterate_repeat_records(start):
-        now = datetime.utcnow()
-        lock_key = _get_repeat_record_lock_key(record)
+    try:
+        batches_by_repeater = defaultdict(list)
+        open_circuit_breakers = {}
+        postponed = []
+        postponed_locks = {}
+        for record in iterate_repeat_records(start):
+            now = datetime.utcnow()
+            lock_key = _get_repeat_record_lock_key(record)
+
+            if now > cutoff:
+                break
 
-        if now > cutoff:
-            break
+            lock = get_redis_lock(
+                lock_key,
+                timeout=60 * 60 * 48,
+                name="repeat_record",
+                track_unreleased=False,
+            )
+            if not lock.acquire(blocking=False):
+                continue
 
-        lock = get_redis_lock(
-            lock_key,
-            timeout=60 * 60 * 48,
-            name="repeat_record",
-            track_unreleased=False,
-        )
-        if not lock.acquire(blocking=False):
-            continue
+            if record.repeater_id not in open_circuit_breakers:
+                circuit_breaker = RepeaterCircuitBreaker(record.repeater_id)
+                open_circuit_breakers[record.repeater_id] = circuit_breaker if circuit_breaker.is_open() else None
+            circuit_breaker = open_circuit_breakers[record.repeater_id]
+            if circuit_breaker:
+                # the repeater is failing, so postpone its records without sending them
+                _postpone_for_circuit_breaker(record, circuit_breaker)
+                postponed.append(record)
+                postponed_locks[record._id] = lock
+                if len(postponed) >= REPEAT_RECORD_BATCH_SIZE:
+                    _save_postponed_repeat_records(postponed, postponed_locks)
+                    postponed = []
+                    postponed_locks = {}
+            elif toggles.BATCH_REPEAT_RECORDS.enabled(record.domain):
+                batch = batches_by_repeater[record.repeater_id]
+                batch.append(record)
+                if len(batch) >= REPEAT_RECORD_BATCH_SIZE:
+                    process_repeat_record_batch.delay(batches_by_repeater.pop(record.repeater_id))
+            else:
+                process_repeat_record.delay(record)
 
-        process_repeat_record.delay(record)
+        for batch in batches_by_repeater.values():
+            process_repeat_record_batch.delay(batch)
+        if postponed:
+            _save_postponed_repeat_records(postponed, postponed_locks)
+    finally:
+        try:
+            check_repeater_lock.release()
+        except LockError:
+            # Ignore if already released
+            pass
 
-    try:
-        check_repeater_lock.release()
-    except LockError:
-        # Ignore if already released
-        pass
+
+def _save_postponed_repeat_records(repeat_records, locks_by_id):
+    """
+    Save repeat records postponed by their circuit breaker, and release the
+    locks of records that could not be saved so they are picked up again.
+    """
+    for repeat_record in _save_repeat_records(repeat_records):
+        try:
+            locks_by_id[repeat_record._id].release()
+        except LockError:
+            pass
 
 
 @task(serializer='pickle', queue=settings.CELERY_REPEAT_RECORD_QUEUE)
 def process_repeat_record(repeat_record):
+    try:
+        if _should_fire(repeat_record):
+            circuit_breaker = RepeaterCircuitBreaker(repeat_record.repeater_id)
+            if circuit_breaker.allow_request():
+                repeat_record.fire()
+            else:
+                _postpone_for_circuit_breaker(repeat_record, circuit_breaker)
+                repeat_record.save()
+    except Exception:
+        logging.exception('Failed to process repeat record: {}'.format(repeat_record._id))
+
+
+@task(serializer='pickle', queue=settings.CELERY_REPEAT_RECORD_QUEUE)
+def process_repeat_record_batch(repeat_records):
+    """
+    Send repeat records of a single repeater concurrently and save them in bulk
+
+    Requests to the repeater reuse connections (see `get_repeater_session`).
+    Records that would take the repeater over its rate limit, or that are
+    not allowed by its circuit breaker, are postponed.
+    """
+    to_fire = []
+    for repeat_record in repeat_records:
+        try:
+            if _should_fire(repeat_record):
+                to_fire.append(repeat_record)
+        except Exception:
+            logging.exception('Failed to process repeat record: {}'.format(repeat_record._id))
+
+    if to_fire:
+        _fire_concurrently(to_fire, REPEATER_BATCH_CONCURRENCY)
+        _save_repeat_records(to_fire)
+
+
+def _save_repeat_records(repeat_records):
+    """
+    Save repeat records in bulk. If the bulk save fails, the records
+    are saved one at a time so that the attempts of all records that can
+    be saved are kept, and their payloads are not sent again.
+
+    :returns: The repeat records that could not be saved
+    """
+    try:
+        RepeatRecord.bulk_save(repeat_records)
+    except BulkSaveError as e:
+        for error in e.errors:
+            logging.error('Failed to save repeat record: {} ({})'.format(error['id'], error.get('error')))
+        failed_ids = {error['id'] for error in e.errors}
+        return [repeat_record for repeat_record in repeat_records if repeat_record._id in failed_ids]
+    except Exception:
+        logging.exception('Failed to save repeat records in bulk')
+        failed = []
+        for repeat_record in repeat_records:
+            try:
+                repeat_record.save()
+            except Exception:
+                logging.exception('Failed to save repeat record: {}'.format(repeat_record._id))
+                failed.append(repeat_record)
+        return failed
+    return []
+
+
+def _should_fire(repeat_record):
+    """
+    Cancel, postpone or delete the repeat record if it should not be sent
+
+    :returns: True if the repeat record should be sent
+    """
     if repeat_record.state == RECORD_FAILURE_STATE and repeat_record.overall_tries >= repeat_record.max_possible_tries:
         repeat_record.cancel()
         repeat_record.save()
-        return
+        return False
     if repeat_record.cancelled:
-        return
+        return False
 
     repeater = repeat_record.repeater
     if not repeater:
         repeat_record.cancel()
         repeat_record.save()
+        return False
+
+    if repeater.paused:
+        # postpone repeat record by 1 hour so that these don't get picked in each cycle and
+        # thus clogging the queue with repeat records with paused repeater
+        repeat_record.postpone_by(timedelta(hours=1))
+        return False
+    if repeater.doc_type.endswith(DELETED_SUFFIX):
+        if not repeat_record.doc_type.endswith(DELETED_SUFFIX):
+            repeat_record.doc_type += DELETED_SUFFIX
+            repeat_record.save()
+        return False
+    return repeat_record.state == RECORD_PENDING_STATE or repeat_record.state == RECORD_FAILURE_STATE
+
+
+def _fire_concurrently(repeat_records, concurrency):
+    """
+    Fire the repeat records (without saving them) in up to `concurrency` threads
+    """
+    if concurrency == 1 or len(repeat_records) == 1:
+        for repeat_record in repeat_records:
+            _fire_without_saving(repeat_record)
         return
 
+    record_queue = queue.Queue()
+    for repeat_record in repeat_records:
+        record_queue.put(repeat_record)
+
+    def fire_records():
+        try:
+            while True:
+                try:
+                    repeat_record = record_queue.get(block=False)
+                except queue.Empty:
+                    return
+                _fire_without_saving(repeat_record)
+        finally:
+            # each thread has its own database connections
+            connections.close_all()
+
+    threads = [threading.Thread(target=fire_records) for i in range(min(concurrency, len(repeat_records)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def _fire_without_saving(repeat_record):
+    circuit_breaker = RepeaterCircuitBreaker(repeat_record.repeater_id)
+    if not circuit_breaker.allow_request():
+        _postpone_for_circuit_breaker(repeat_record, circuit_breaker)
+        return
+    rate_limit_key = 'repeater-requests-{}'.format(repeat_record.repeater_id)
+    if not rate_limit(rate_limit_key, actions_allowed=REPEATER_RATE_LIMIT, how_often=60):
+        _postpone_without_saving(repeat_record, REPEATER_RATE_LIMIT_DELAY)
+        return
     try:
-        if repeater.paused:
-            # postpone repeat record by 1 hour so that these don't get picked in each cycle and
-            # thus clogging the queue with repeat records with paused repeater
-            repeat_record.postpone_by(timedelta(hours=1))
-            return
-        if repeater.doc_type.endswith(DELETED_SUFFIX):
-            if not repeat_record.doc_type.endswith(DELETED_SUFFIX):
-                repeat_record.doc_type += DELETED_SUFFIX
-                repeat_record.save()
-        elif repeat_record.state == RECORD_PENDING_STATE or repeat_record.state == RECORD_FAILURE_STATE:
-                repeat_record.fire()
+        repeat_record.fire(save=False)
     except Exception:
         logging.exception('Failed to process repeat record: {}'.format(repeat_record._id))
 
 
+def _postpone_for_circuit_breaker(repeat_record, circuit_breaker):
+    # Until the circuit can be probed, or for one interval if another
+    # record is already probing it
+    _postpone_without_saving(repeat_record, max(circuit_breaker.get_wait(), CHECK_REPEATERS_INTERVAL))
+
+
+def _postpone_without_saving(repeat_record, duration):
+    repeat_record.last_checked = datetime.utcnow()
+    repeat_record.next_check = repeat_record.last_checked + duration
+
+
 def _get_repeat_record_lock_key(record):
     """
     Including the rev in the key means that the record will be unlocked for processing
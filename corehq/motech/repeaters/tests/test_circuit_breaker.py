@@ -0,0 +1,65 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import uuid
+from datetime import timedelta
+
+from django.test import SimpleTestCase
+
+from corehq.motech.repeaters.circuit_breaker import RepeaterCircuitBreaker
+from corehq.motech.repeaters.const import (
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    CIRCUIT_BREAKER_MAX_WAIT,
+    CIRCUIT_BREAKER_MIN_WAIT,
+)
+
+
+class RepeaterCircuitBreakerTest(SimpleTestCase):
+
+    def setUp(self):
+        self.circuit_breaker = RepeaterCircuitBreaker(uuid.uuid4().hex)
+
+    def tearDown(self):
+        self.circuit_breaker.record_success()
+
+    def _fail(self, times=CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+        for i in range(times):
+            self.circuit_breaker.record_failure()
+
+    def _close_for_probing(self):
+        self.circuit_breaker.client.delete(self.circuit_breaker._key('open'))
+
+    def test_opens_after_consecutive_failures(self):
+        self._fail(CIRCUIT_BREAKER_FAILURE_THRESHOLD - 1)
+        self.assertFalse(self.circuit_breaker.is_open())
+        self.assertTrue(self.circuit_breaker.allow_request())
+
+        self._fail(1)
+        self.assertTrue(self.circuit_breaker.is_open())
+        self.assertFalse(self.circuit_breaker.allow_request())
+        self.assertGreater(self.circuit_breaker.get_wait(), CIRCUIT_BREAKER_MIN_WAIT - timedelta(seconds=5))
+
+    def test_success_resets_failures(self):
+        self._fail(CIRCUIT_BREAKER_FAILURE_THRESHOLD - 1)
+        self.circuit_breaker.record_success()
+        self._fail(CIRCUIT_BREAKER_FAILURE_THRESHOLD - 1)
+        self.assertFalse(self.circuit_breaker.is_open())
+
+    def test_single_probe(self):
+        self._fail()
+        self._close_for_probing()
+        self.assertTrue(self.circuit_breaker.allow_request())
+        self.assertFalse(self.circuit_breaker.allow_request())
+
+        self.circuit_breaker.record_success()
+        self.assertTrue(self.circuit_breaker.allow_request())
+        self.assertTrue(self.circuit_breaker.allow_request())
+
+    def test_failed_probe_backs_off(self):
+        self._fail()
+        self._close_for_probing()
+        self.assertTrue(self.circuit_breaker.allow_request())
+        self._fail(1)
+
+        self.assertTrue(self.circuit_breaker.is_open())
+        self.assertGreater(self.circuit_breaker.get_wait(), CIRCUIT_BREAKER_MIN_WAIT)
+        self.assertLessEqual(self.circuit_breaker.get_wait(), CIRCUIT_BREAKER_MAX_WAIT)
@@ -4,7 +4,9 @@ import uuid
 from collections import namedtuple
 from datetime import datetime, timedelta
 import json
+from couchdbkit import BulkSaveError
 from mock import patch
+from requests.exceptions import ConnectionError
 
 from django.test import override_settings, TestCase
 
@@ -18,7 +20,8 @@ from corehq.apps.receiverwrapper.exceptions import DuplicateFormatException, Ign
 from corehq.apps.receiverwrapper.util import submit_form_locally
 from corehq.motech.repeaters.repeater_generators import FormRepeaterXMLPayloadGenerator, RegisterGenerator, \
     BasePayloadGenerator
-from corehq.motech.repeaters.tasks import check_repeaters, process_repeat_record
+from corehq.motech.repeaters.tasks import check_repeaters, process_repeat_record, process_repeat_record_batch, \
+    _get_repeat_record_lock_key
 from corehq.motech.repeaters.models import (
     CaseRepeater,
     FormRepeater,
@@ -26,12 +29,25 @@ from corehq.motech.repeaters.models import (
     LocationRepeater,
     RepeatRecord,
     ShortFormRepeater)
-from corehq.motech.repeaters.const import MIN_RETRY_WAIT, POST_TIMEOUT, RECORD_SUCCESS_STATE
-from corehq.motech.repeaters.dbaccessors import delete_all_repeat_records, delete_all_repeaters
+from corehq.motech.repeaters.circuit_breaker import RepeaterCircuitBreaker
+from corehq.motech.repeaters.const import (
+    CHECK_REPEATERS_INTERVAL,
+    CHECK_REPEATERS_KEY,
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    MIN_RETRY_WAIT,
+    POST_TIMEOUT,
+    RECORD_SUCCESS_STATE,
+)
+from corehq.motech.repeaters.dbaccessors import (
+    delete_all_repeat_records,
+    delete_all_repeaters,
+    iter_repeat_records_by_domain,
+)
 from corehq.apps.users.models import CommCareUser
 from corehq.form_processor.tests.utils import run_with_all_backends, FormProcessorTestUtils
 from corehq.form_processor.interfaces.dbaccessors import CaseAccessors, FormAccessors
 from couchforms.const import DEVICE_LOG_XMLNS
+from dimagi.utils.couch import get_redis_lock
 from dimagi.utils.parsing import json_format_datetime
 from corehq.util.test_utils import flag_enabled
 
@@ -235,6 +251,104 @@ class RepeaterTest(BaseRepeaterTest):
             check_repeaters()
             self.assertEqual(mock_fire.call_count, 0)
 
+    @run_with_all_backends
+    def test_check_repeat_records_in_batches(self):
+        self.assertEqual(len(RepeatRecord.all()), 2)
+
+        with flag_enabled('BATCH_REPEAT_RECORDS'), \
+                patch('corehq.motech.repeaters.tasks.REPEATER_BATCH_CONCURRENCY', 1), \
+                patch('corehq.motech.repeaters.models.simple_post',
+                      return_value=MockResponse(status_code=200, reason='')) as mock_fire:
+            check_repeaters()
+            self.assertEqual(mock_fire.call_count, 2)
+
+        repeat_records = list(iter_repeat_records_by_domain(self.domain))
+        self.assertEqual(len(repeat_records), 2)
+        for repeat_record in repeat_records:
+            self.assertEqual(repeat_record.state, RECORD_SUCCESS_STATE)
+
+    @run_with_all_backends
+    def test_repeat_record_batch_saves_records_if_bulk_save_fails(self):
+        with patch.object(RepeatRecord, 'bulk_save', side_effect=Exception('bulk save failed')), \
+                patch('corehq.motech.repeaters.tasks.REPEATER_BATCH_CONCURRENCY', 1), \
+                patch('corehq.motech.repeaters.models.simple_post',
+                      return_value=MockResponse(status_code=200, reason='')):
+            process_repeat_record_batch(list(RepeatRecord.all()))
+
+        # the attempts were saved one record at a time
+        for repeat_record in iter_repeat_records_by_domain(self.domain):
+            self.assertEqual(repeat_record.state, RECORD_SUCCESS_STATE)
+
+    @run_with_all_backends
+    def test_repeat_record_batch_rate_limit(self):
+        with patch('corehq.motech.repeaters.tasks.REPEATER_RATE_LIMIT', 0), \
+                patch('corehq.motech.repeaters.models.simple_post') as mock_fire:
+            process_repeat_record_batch(list(RepeatRecord.all()))
+            self.assertEqual(mock_fire.call_count, 0)
+
+        # the records were postponed
+        self.assertEqual(len(RepeatRecord.all(domain=self.domain)), 0)
+
+    @run_with_all_backends
+    def test_check_repeaters_postpones_records_of_failing_repeater(self):
+        self.assertEqual(len(RepeatRecord.all()), 2)
+        for repeater in [self.case_repeater, self.form_repeater]:
+            circuit_breaker = RepeaterCircuitBreaker(repeater.get_id)
+            self.addCleanup(circuit_breaker.record_success)
+            for i in range(CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+                circuit_breaker.record_failure()
+
+        with patch('corehq.motech.repeaters.models.simple_post') as mock_fire:
+            check_repeaters()
+            self.assertEqual(mock_fire.call_count, 0)
+
+        # the records were postponed without counting as tries
+        self.assertEqual(len(RepeatRecord.all(domain=self.domain)), 0)
+        for repeat_record in iter_repeat_records_by_domain(self.domain):
+            self.assertEqual(repeat_record.overall_tries, 0)
+
+    @run_with_all_backends
+    def test_check_repeaters_continues_if_postponed_records_fail_to_save(self):
+        circuit_breaker = RepeaterCircuitBreaker(self.case_repeater.get_id)
+        self.addCleanup(circuit_breaker.record_success)
+        for i in range(CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+            circuit_breaker.record_failure()
+        [postponed_record] = [record for record in RepeatRecord.all()
+                              if record.repeater_id == self.case_repeater.get_id]
+
+        def fail_bulk_save(docs):
+            raise BulkSaveError([{'id': doc._id, 'error': 'conflict'} for doc in docs], [])
+
+        with patch.object(RepeatRecord, 'bulk_save', side_effect=fail_bulk_save), \
+                patch('corehq.motech.repeaters.tasks.REPEAT_RECORD_BATCH_SIZE', 1), \
+                patch('corehq.motech.repeaters.models.simple_post') as mock_fire:
+            check_repeaters()
+            # the record of the other repeater was still sent
+            self.assertEqual(mock_fire.call_count, 1)
+
+        # the locks of the check and of the record that wasn't saved were released
+        for lock_key in [CHECK_REPEATERS_KEY, _get_repeat_record_lock_key(postponed_record)]:
+            lock = get_redis_lock(lock_key, timeout=CHECK_REPEATERS_INTERVAL.seconds, name=lock_key)
+            self.assertTrue(lock.acquire(blocking=False))
+            lock.release()
+
+    @run_with_all_backends
+    def test_circuit_breaker_only_counts_endpoint_failures(self):
+        repeat_record = RepeatRecord.all()[0]
+        with patch.object(RepeaterCircuitBreaker, 'record_failure') as record_failure:
+            with patch('corehq.motech.repeaters.models.simple_post', side_effect=ValueError('bad request')):
+                repeat_record.fire(force_send=True)
+            self.assertEqual(record_failure.call_count, 0)
+
+            with patch('corehq.motech.repeaters.models.simple_post', side_effect=ConnectionError):
+                repeat_record.fire(force_send=True)
+            self.assertEqual(record_failure.call_count, 1)
+
+            with patch('corehq.motech.repeaters.models.simple_post',
+                       return_value=MockResponse(status_code=503, reason='Service Unavailable')):
+                repeat_record.fire(force_send=True)
+            self.assertEqual(record_failure.call_count, 2)
+
     @run_with_all_backends
     def test_repeat_record_status_check(self):
         self.assertEqual(len(RepeatRecord.all()), 2)
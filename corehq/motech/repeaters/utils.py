@@ -1,8 +1,13 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 import base64
+import threading
 from collections import OrderedDict
+
+import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+from six.moves.http_cookiejar import DefaultCookiePolicy
 
 from corehq.util.couch import DocUpdate
 from dimagi.utils.modules import to_function
@@ -14,6 +19,37 @@ def get_all_repeater_types():
     ])
 
 
+# The number of repeaters whose sessions are kept by each process. The
+# least recently used session is dropped when there are more.
+MAX_REPEATER_SESSIONS = 50
+
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+
+
+def get_repeater_session(repeater_id):
+    """
+    Get the requests session used to send repeat records of a repeater,
+    so that connections to its endpoint are kept alive and reused.
+    """
+    from .const import REPEATER_BATCH_CONCURRENCY
+    with _sessions_lock:
+        session = _sessions.pop(repeater_id, None)
+        if session is None:
+            session = requests.Session()
+            # don't send cookies set in the response to one repeat record with the next one
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            adapter = HTTPAdapter(pool_maxsize=REPEATER_BATCH_CONCURRENCY)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        _sessions[repeater_id] = session
+        while len(_sessions) > MAX_REPEATER_SESSIONS:
+            # the session may still be in use by another thread, so its
+            # connections are closed when it is garbage collected
+            _sessions.popitem(last=False)
+        return session
+
+
 def migrate_repeater(repeater_doc):
     from .models import BASIC_AUTH
     if "use_basic_auth" in repeater_doc:
@@ -23,7 +23,11 @@ from pillowtop.checkpoints.manager import get_checkpoint_for_elasticsearch_pillo
 from pillowtop.const import DEFAULT_PROCESSOR_CHUNK_SIZE
 from pillowtop.pillow.interface import ConstructedPillow
 from pillowtop.processors.elastic import ElasticProcessor
-from pillowtop.reindexer.reindexer import ResumableBulkElasticPillowReindexer, ReindexerFactory
+from pillowtop.reindexer.reindexer import (
+    PartitionedBulkElasticPillowReindexer,
+    ReindexerFactory,
+    ResumableBulkElasticPillowReindexer,
+)
 
 pillow_logging = logging.getLogger("pillowtop")
 pillow_logging.setLevel(logging.INFO)
@@ -150,6 +154,7 @@ class SqlCaseReindexerFactory(ReindexerFactory):
     arg_contributors = [
         ReindexerFactory.resumable_reindexer_args,
         ReindexerFactory.elastic_reindexer_args,
+        ReindexerFactory.parallel_reindexer_args,
         ReindexerFactory.limit_db_args,
         ReindexerFactory.domain_arg,
         ReindexerFactory.server_modified_on_arg,
@@ -160,19 +165,34 @@ class SqlCaseReindexerFactory(ReindexerFactory):
         domain = self.options.pop('domain', None)
         start_date = self.options.pop('start_date', None)
         end_date = self.options.pop('end_date', None)
-        iteration_key = "SqlCaseToElasticsearchPillow_{}_reindexer_{}_{}_from_{}_until_{}".format(
-            CASE_INDEX_INFO.index, limit_to_db or 'all', domain or 'all',
-            start_date or 'beginning', end_date or 'current'
-        )
-        limit_db_aliases = [limit_to_db] if limit_to_db else None
+        processes = self.options.pop('processes', 1)
+
+        def get_doc_provider(db_alias):
+            iteration_key = "SqlCaseToElasticsearchPillow_{}_reindexer_{}_{}_from_{}_until_{}".format(
+                CASE_INDEX_INFO.index, db_alias or 'all', domain or 'all',
+                start_date or 'beginning', end_date or 'current'
+            )
+            limit_db_aliases = [db_alias] if db_alias else None
+
+            reindex_accessor = CaseReindexAccessor(
+                domain=domain, limit_db_aliases=limit_db_aliases,
+                start_date=start_date, end_date=end_date
+            )
+            return SqlDocumentProvider(iteration_key, reindex_accessor)
+
+        if processes > 1 and not limit_to_db:
+            return PartitionedBulkElasticPillowReindexer(
+                get_doc_provider,
+                CaseReindexAccessor(domain=domain).sql_db_aliases,
+                elasticsearch=get_es_new(),
+                index_info=CASE_INDEX_INFO,
+                doc_transform=transform_case_for_elasticsearch,
+                processes=processes,
+                **self.options
+            )
 
-        reindex_accessor = CaseReindexAccessor(
-            domain=domain, limit_db_aliases=limit_db_aliases,
-            start_date=start_date, end_date=end_date
-        )
-        doc_provider = SqlDocumentProvider(iteration_key, reindex_accessor)
         return ResumableBulkElasticPillowReindexer(
-            doc_provider,
+            get_doc_provider(limit_to_db),
             elasticsearch=get_es_new(),
             index_info=CASE_INDEX_INFO,
             doc_transform=transform_case_for_elasticsearch,
@@ -95,6 +95,15 @@ class CaseSearchPillowProcessor(ElasticProcessor):
 
     def process_change(self, change):
         assert isinstance(change, Change)
+        if self._needs_search_index(change):
+            super(CaseSearchPillowProcessor, self).process_change(change)
+
+    def process_changes_chunk(self, changes_chunk):
+        changes_to_index = [change for change in changes_chunk if self._needs_search_index(change)]
+        return super(CaseSearchPillowProcessor, self).process_changes_chunk(changes_to_index)
+
+    @staticmethod
+    def _needs_search_index(change):
         if change.metadata is not None:
             # Comes from KafkaChangeFeed (i.e. running pillowtop)
             domain = change.metadata.domain
@@ -102,8 +111,7 @@ class CaseSearchPillowProcessor(ElasticProcessor):
             # comes from ChangeProvider (i.e reindexing)
             domain = change.get_document()['domain']
 
-        if domain and domain_needs_search_index(domain):
-            super(CaseSearchPillowProcessor, self).process_change(change)
+        return domain and domain_needs_search_index(domain)
 
 
 def get_case_search_processor():
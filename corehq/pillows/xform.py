@@ -33,7 +33,11 @@ from pillowtop.const import DEFAULT_PROCESSOR_CHUNK_SIZE
 from pillowtop.pillow.interface import ConstructedPillow
 from pillowtop.processors.form import FormSubmissionMetadataTrackerProcessor
 from pillowtop.processors.elastic import ElasticProcessor
-from pillowtop.reindexer.reindexer import ResumableBulkElasticPillowReindexer, ReindexerFactory
+from pillowtop.reindexer.reindexer import (
+    PartitionedBulkElasticPillowReindexer,
+    ReindexerFactory,
+    ResumableBulkElasticPillowReindexer,
+)
 
 
 def is_valid_date(txt):
@@ -258,6 +262,7 @@ class SqlFormReindexerFactory(ReindexerFactory):
     arg_contributors = [
         ReindexerFactory.resumable_reindexer_args,
         ReindexerFactory.elastic_reindexer_args,
+        ReindexerFactory.parallel_reindexer_args,
         ReindexerFactory.limit_db_args,
         ReindexerFactory.domain_arg,
     ]
@@ -265,16 +270,31 @@ class SqlFormReindexerFactory(ReindexerFactory):
     def build(self):
         limit_to_db = self.options.pop('limit_to_db', None)
         domain = self.options.pop('domain', None)
+        processes = self.options.pop('processes', 1)
+
+        def get_doc_provider(db_alias):
+            iteration_key = "SqlXFormToElasticsearchPillow_{}_reindexer_{}_{}".format(
+                XFORM_INDEX_INFO.index, db_alias or 'all', domain or 'all'
+            )
+            limit_db_aliases = [db_alias] if db_alias else None
+
+            reindex_accessor = FormReindexAccessor(domain=domain, limit_db_aliases=limit_db_aliases)
+            return SqlDocumentProvider(iteration_key, reindex_accessor)
+
+        if processes > 1 and not limit_to_db:
+            return PartitionedBulkElasticPillowReindexer(
+                get_doc_provider,
+                FormReindexAccessor(domain=domain).sql_db_aliases,
+                elasticsearch=get_es_new(),
+                index_info=XFORM_INDEX_INFO,
+                doc_filter=xform_pillow_filter,
+                doc_transform=transform_xform_for_elasticsearch,
+                processes=processes,
+                **self.options
+            )
 
-        iteration_key = "SqlXFormToElasticsearchPillow_{}_reindexer_{}_{}".format(
-            XFORM_INDEX_INFO.index, limit_to_db or 'all', domain or 'all'
-        )
-        limit_db_aliases = [limit_to_db] if limit_to_db else None
-
-        reindex_accessor = FormReindexAccessor(domain=domain, limit_db_aliases=limit_db_aliases)
-        doc_provider = SqlDocumentProvider(iteration_key, reindex_accessor)
         return ResumableBulkElasticPillowReindexer(
-            doc_provider,
+            get_doc_provider(limit_to_db),
             elasticsearch=get_es_new(),
             index_info=XFORM_INDEX_INFO,
             doc_filter=xform_pillow_filter,
@@ -0,0 +1,215 @@
+"""
+Helpers for running queries on several databases (e.g. the shards of a partitioned
+database) at the same time.
+
+Each database is queried in its own thread. The threads are taken from a pool of worker
+threads per database, and since Django connections are thread local every worker keeps its
+own connection to its database open between queries. A worker closes its connection when it
+is no longer needed in the pool.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import heapq
+import sys
+import threading
+from collections import defaultdict
+
+import six
+from django import db
+from django.conf import settings
+from six.moves import queue
+
+# number of results read ahead from each database
+DEFAULT_BUFFER_SIZE = 1000
+# results are passed between threads in batches of this size
+_BATCH_SIZE = 100
+# number of idle worker threads (and connections) kept for each database
+MAX_IDLE_WORKERS_PER_DB = 4
+
+_idle_workers = defaultdict(list)
+_idle_workers_lock = threading.Lock()
+
+
+class _Worker(threading.Thread):
+    """
+    A thread which runs queries on one database, one after the other,
+    reusing its connection to the database.
+    """
+
+    def __init__(self, db_alias):
+        super(_Worker, self).__init__(name='query-{}'.format(db_alias))
+        self.daemon = True
+        self.db_alias = db_alias
+        self.jobs = queue.Queue()
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            job()
+            if self.db_alias in settings.DATABASES and db.connections[self.db_alias].errors_occurred:
+                # use a new connection for the next query
+                db.connections[self.db_alias].close()
+            if not _release_worker(self):
+                if self.db_alias in settings.DATABASES:
+                    db.connections[self.db_alias].close()
+                return
+
+
+def _run_in_worker(db_alias, job):
+    with _idle_workers_lock:
+        idle_workers = _idle_workers[db_alias]
+        worker = idle_workers.pop() if idle_workers else None
+    if worker is None:
+        worker = _Worker(db_alias)
+        worker.start()
+    worker.jobs.put(job)
+
+
+def _release_worker(worker):
+    """
+    :return: True if the worker was put back in the pool, False if it should stop
+    """
+    with _idle_workers_lock:
+        idle_workers = _idle_workers[worker.db_alias]
+        if len(idle_workers) < MAX_IDLE_WORKERS_PER_DB:
+            idle_workers.append(worker)
+            return True
+    return False
+
+
+class _Finished(object):
+
+    def __init__(self, exc_info=None):
+        self.exc_info = exc_info
+
+
+class _DatabaseReader(object):
+    """
+    Iterates over the results of a query on one database in a worker thread,
+    buffering up to ``buffer_size`` results until they are consumed.
+    """
+
+    def __init__(self, db_alias, get_results, buffer_size, ready_queue=None):
+        self.db_alias = db_alias
+        self.get_results = get_results
+        self.buffer = queue.Queue(maxsize=max(1, buffer_size // _BATCH_SIZE))
+        # if given, the alias is put on this queue every time a batch is buffered
+        self.ready_queue = ready_queue
+        self.stopped = threading.Event()
+
+    def start(self):
+        _run_in_worker(self.db_alias, self.run)
+
+    def run(self):
+        finished = _Finished()
+        results = None
+        try:
+            results = iter(self.get_results())
+            batch = []
+            for result in results:
+                batch.append(result)
+                if len(batch) == _BATCH_SIZE:
+                    if not self._put(batch):
+                        # stop reading once the results are no longer wanted
+                        return
+                    batch = []
+            if batch:
+                self._put(batch)
+        except Exception:
+            finished = _Finished(sys.exc_info())
+        finally:
+            if hasattr(results, 'close'):
+                results.close()
+            self._put(finished)
+
+    def _put(self, item):
+        """
+        :return: False if the results are no longer wanted
+        """
+        while not self.stopped.is_set():
+            try:
+                self.buffer.put(item, timeout=1)
+            except queue.Full:
+                continue
+            if self.ready_queue is not None:
+                self.ready_queue.put(self.db_alias)
+            return True
+        return False
+
+    def get_batch(self, block=True):
+        """
+        :return: the next list of results, or None once the query has no more results
+        """
+        item = self.buffer.get(block=block)
+        if isinstance(item, _Finished):
+            if item.exc_info:
+                six.reraise(*item.exc_info)
+            return None
+        return item
+
+    def __iter__(self):
+        while True:
+            batch = self.get_batch()
+            if batch is None:
+                return
+            for result in batch:
+                yield result
+
+
+def iter_query_results_in_parallel(get_results_by_db, sort_key=None, buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Query several databases concurrently and yield all of the results.
+
+    :param get_results_by_db: dict of ``{db_alias: get_results}`` where ``get_results`` is
+    a function that takes no arguments and returns an iterable of results from that database.
+    It is called in a separate thread for each database.
+    :param sort_key: (optional) If given, the results of each database must be sorted by this
+    function and the results are merged so that they are yielded in sorted order.
+    Otherwise results are yielded as soon as they are available.
+    :param buffer_size: number of results to read ahead from each database
+    """
+    ready_queue = queue.Queue() if sort_key is None else None
+    readers = [
+        _DatabaseReader(db_alias, get_results, buffer_size, ready_queue)
+        for db_alias, get_results in get_results_by_db.items()
+    ]
+    for reader in readers:
+        reader.start()
+
+    try:
+        if sort_key is None:
+            for result in _iter_as_ready(readers, ready_queue):
+                yield result
+        else:
+            for result in merge_sorted(readers, sort_key):
+                yield result
+    finally:
+        for reader in readers:
+            reader.stopped.set()
+
+
+def _iter_as_ready(readers, ready_queue):
+    readers_by_alias = {reader.db_alias: reader for reader in readers}
+    while readers_by_alias:
+        db_alias = ready_queue.get()
+        batch = readers_by_alias[db_alias].get_batch(block=False)
+        if batch is None:
+            del readers_by_alias[db_alias]
+            continue
+        for result in batch:
+            yield result
+
+
+def merge_sorted(iterables, sort_key):
+    """
+    Merge iterables that are each sorted by ``sort_key`` into a single sorted iterable.
+    """
+    def _decorated(index, iterable):
+        # the index avoids comparing the results themselves when the keys are equal
+        for result in iterable:
+            yield sort_key(result), index, result
+
+    merged = heapq.merge(*[_decorated(index, iterable) for index, iterable in enumerate(iterables)])
+    for _, _, result in merged:
+        yield result
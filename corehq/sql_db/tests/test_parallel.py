@@ -0,0 +1,95 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from corehq.sql_db import parallel
+from corehq.sql_db.parallel import iter_query_results_in_parallel, merge_sorted
+
+
+class ParallelQueryTest(SimpleTestCase):
+
+    def test_all_results(self):
+        results = iter_query_results_in_parallel({
+            'db1': lambda: iter(range(0, 500)),
+            'db2': lambda: iter(range(500, 750)),
+            'db3': lambda: iter([]),
+        }, buffer_size=200)
+        self.assertEqual(sorted(results), list(range(750)))
+
+    def test_sorted_results(self):
+        results = iter_query_results_in_parallel({
+            'db1': lambda: iter(range(0, 600, 3)),
+            'db2': lambda: iter(range(1, 600, 3)),
+            'db3': lambda: iter(range(2, 600, 3)),
+        }, sort_key=lambda value: value, buffer_size=200)
+        self.assertEqual(list(results), list(range(600)))
+
+    def test_error_is_raised(self):
+        def _fail():
+            yield 1
+            raise ValueError('query failed')
+
+        results = iter_query_results_in_parallel({
+            'db1': _fail,
+            'db2': lambda: iter(range(10)),
+        })
+        with self.assertRaises(ValueError):
+            list(results)
+
+    def test_stop_early(self):
+        results = iter_query_results_in_parallel({
+            'db1': lambda: iter(range(100000)),
+        }, buffer_size=100)
+        self.assertEqual(next(results), 0)
+        results.close()
+
+    def test_stopped_reader_stops_reading(self):
+        read = []
+
+        def _read():
+            for value in range(100000):
+                read.append(value)
+                yield value
+
+        results = iter_query_results_in_parallel({'db1': _read}, buffer_size=100)
+        self.assertEqual(next(results), 0)
+        results.close()
+
+        # the reader notices within a second that it was stopped
+        time.sleep(1.5)
+        count = len(read)
+        time.sleep(0.5)
+        self.assertEqual(len(read), count)
+        self.assertLess(count, 1000)
+
+    def test_worker_threads_are_reused(self):
+        def _thread_name():
+            return iter([threading.current_thread().ident])
+
+        first, = iter_query_results_in_parallel({'pool-test-db': _thread_name})
+        _wait_for(lambda: parallel._idle_workers['pool-test-db'])
+        second, = iter_query_results_in_parallel({'pool-test-db': _thread_name})
+        self.assertEqual(first, second)
+
+    def test_merge_sorted_with_key(self):
+        merged = merge_sorted([
+            [('a', 1), ('c', 3)],
+            [('b', 2), ('b', 2), ('d', 4)],
+        ], sort_key=lambda row: row[1])
+        self.assertEqual([row[0] for row in merged], ['a', 'b', 'b', 'c', 'd'])
+
+
+def _wait_for(condition, timeout=5):
+    """
+    :return: the value of ``condition()`` once it is truthy (or once ``timeout`` seconds have passed)
+    """
+    end = time.time() + timeout
+    value = condition()
+    while not value and time.time() < end:
+        time.sleep(0.05)
+        value = condition()
+    return value
@@ -12,12 +12,14 @@ except ImportError:
 from django.conf import settings
 from django import db
 from django.db.utils import InterfaceError as DjangoInterfaceError
-from functools import wraps
+from functools import partial, wraps
+from operator import attrgetter, itemgetter
 from psycopg2._psycopg import InterfaceError as Psycopg2InterfaceError
 import six
 from memoized import memoized
 
 from corehq.sql_db.config import partition_config
+from corehq.sql_db.parallel import iter_query_results_in_parallel, merge_sorted
 from corehq.util.quickcache import quickcache
 
 
@@ -25,7 +27,8 @@ ACCEPTABLE_STANDBY_DELAY_SECONDS = 3
 STALE_CHECK_FREQUENCY = 30
 
 
-def run_query_across_partitioned_databases(model_class, q_expression, values=None, annotate=None):
+def run_query_across_partitioned_databases(model_class, q_expression, values=None, annotate=None,
+                                           order_by=None, parallel=False):
     """
     Runs a query across all partitioned databases and produces a generator
     with the results.
@@ -43,6 +46,12 @@ def run_query_across_partitioned_databases(model_class, q_expression, values=Non
     :param annotate: (optional) If specified, should by a dictionary of annotated fields
     and their calculations. The dictionary will be splatted into the `.annotate` function
 
+    :param order_by: (optional) The name of a field to sort the results by (ascending).
+    If `values` is given it must include this field.
+
+    :param parallel: (optional) If True, query all of the databases at the same time. Unless
+    `order_by` is given, results are then yielded in the order they are received.
+
     :return: A generator with the results
     """
     db_names = get_db_aliases_for_partitioned_query()
@@ -50,23 +59,50 @@ def run_query_across_partitioned_databases(model_class, q_expression, values=Non
     if values and not isinstance(values, (list, tuple)):
         raise ValueError("Expected a list or tuple")
 
-    for db_name in db_names:
+    if order_by and values and order_by not in values:
+        raise ValueError("order_by must be one of the values")
+
+    def _get_queryset(db_name):
         qs = model_class.objects.using(db_name)
         if annotate:
             qs = qs.annotate(**annotate)
 
         qs = qs.filter(q_expression)
+        if order_by:
+            qs = qs.order_by(order_by)
         if values:
             if len(values) == 1:
                 qs = qs.values_list(*values, flat=True)
             else:
                 qs = qs.values_list(*values)
+        return qs
+
+    sort_key = _get_sort_key(order_by, values) if order_by else None
+    if parallel:
+        results = iter_query_results_in_parallel(
+            {db_name: _get_queryset(db_name).iterator for db_name in db_names},
+            sort_key=sort_key,
+        )
+    elif sort_key:
+        results = merge_sorted([_get_queryset(db_name).iterator() for db_name in db_names], sort_key)
+    else:
+        results = (result for db_name in db_names for result in _get_queryset(db_name).iterator())
+
+    for result in results:
+        yield result
 
-        for result in qs.iterator():
-            yield result
 
+def _get_sort_key(order_by, values):
+    if not values:
+        return attrgetter(order_by)
+    elif len(values) == 1:
+        return lambda value: value
+    else:
+        return itemgetter(values.index(order_by))
 
-def paginate_query_across_partitioned_databases(model_class, q_expression, annotate=None, query_size=5000):
+
+def paginate_query_across_partitioned_databases(model_class, q_expression, annotate=None, query_size=5000,
+                                                parallel=False):
     """
     Runs a query across all partitioned databases in small chunks and produces a generator
     with the results.
@@ -81,11 +117,14 @@ def paginate_query_across_partitioned_databases(model_class, q_expression, annot
     :param annotate: (optional) If specified, should by a dictionary of annotated fields
     and their calculations. The dictionary will be splatted into the `.annotate` function
 
+    :param parallel: (optional) If True, query all of the databases at the same time and
+    yield results in the order they are received.
+
     :return: A generator with the results
     """
     db_names = get_db_aliases_for_partitioned_query()
 
-    for db_name in db_names:
+    def _paginate(db_name):
         qs = model_class.objects.using(db_name)
         if annotate:
             qs = qs.annotate(**annotate)
@@ -102,6 +141,16 @@ def paginate_query_across_partitioned_databases(model_class, q_expression, annot
                     value = row.pk
                     yield row
 
+    if parallel:
+        results = iter_query_results_in_parallel({
+            db_name: partial(_paginate, db_name) for db_name in db_names
+        })
+    else:
+        results = (row for db_name in db_names for row in _paginate(db_name))
+
+    for row in results:
+        yield row
+
 
 def split_list_by_db_partition(partition_values):
     """
@@ -671,6 +671,48 @@ LIVEQUERY_SYNC = StaticToggle(
     namespaces=[NAMESPACE_DOMAIN]
 )
 
+CASE_XML_CACHE = StaticToggle(
+    'case_xml_cache',
+    'Reuse serialized case XML across restores for cases that have not changed',
+    TAG_INTERNAL,
+    namespaces=[NAMESPACE_DOMAIN]
+)
+
+BATCH_REPEAT_RECORDS = StaticToggle(
+    'batch_repeat_records',
+    'Send repeat records to each repeater in concurrent batches',
+    TAG_INTERNAL,
+    namespaces=[NAMESPACE_DOMAIN]
+)
+
+BATCH_OUTBOUND_SMS = StaticToggle(
+    'batch_outbound_sms',
+    'Send queued outbound SMS in rate limited batches per backend',
+    TAG_INTERNAL,
+    namespaces=[NAMESPACE_DOMAIN]
+)
+
+BATCH_SCHEDULE_INSTANCES = StaticToggle(
+    'batch_schedule_instances',
+    'Handle due messaging schedule instances in batches instead of one task per instance',
+    TAG_INTERNAL,
+    namespaces=[NAMESPACE_DOMAIN]
+)
+
+SQL_CASE_RULE_CRITERIA = StaticToggle(
+    'sql_case_rule_criteria',
+    'Check the criteria of automatic case update rules in the database before loading cases',
+    TAG_INTERNAL,
+    namespaces=[NAMESPACE_DOMAIN]
+)
+
+LOCATION_FIXTURE_CACHE = StaticToggle(
+    'location_fixture_cache',
+    'Share serialized location fixtures between restores of users with the same locations',
+    TAG_INTERNAL,
+    namespaces=[NAMESPACE_DOMAIN]
+)
+
 NO_VELLUM = StaticToggle(
     'no_vellum',
     'Allow disabling Form Builder per form '
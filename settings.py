@@ -759,6 +759,14 @@ PL_PROXY_CLUSTER_NAME = 'commcarehq'
 
 USE_PARTITIONED_DATABASE = False
 
+# fetch forms and cases by ID straight from the shard databases (querying all the
+# shards at once) instead of through the proxy. Only used with USE_PARTITIONED_DATABASE.
+BULK_FETCH_FROM_SHARDS = False
+
+# query location ancestors and descendants with SQLLocation.ancestor_ids instead
+# of recursive queries. Run the populate_location_ancestor_ids command first.
+USE_LOCATION_ANCESTOR_IDS = False
+
 # number of days since last access after which a saved export is considered unused
 SAVED_EXPORT_ACCESS_CUTOFF = 35
 